@@ -1,12 +1,246 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Header, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import AfterValidator, BaseModel, Field
+from sqlalchemy.exc import IntegrityError
+from typing import Annotated, Callable, Dict, Iterator, List, Literal, Mapping, Optional, Tuple
+from contextlib import asynccontextmanager, suppress
+from dotenv import load_dotenv
 import uvicorn
-import json
-from datetime import datetime
+import asyncio
+import os
+import time
+from datetime import date, datetime
+from repository import Repository
+from search import SearchIndex
+from geo import GeoIndex, record_coordinates
+from availability import (AvailabilityIndex, BLOCKING_STATUSES, decode_working_hours, encode_working_hours, parse_slot,
+                          parse_time)
+from provider_stats import ProviderStatsIndex, to_cents
+from reviews import DuplicateReview, ReviewStore
+from billing import ACTIVE, BillingScheduler
+from ledger import Ledger, consumer_account, provider_account
+from payments import LocalGateway, PaymentDeclined, Payments
+from reports import FORMATS, REPORTS, booking_rows, export_report, revenue_rows, user_rows
+from jobs import SUCCEEDED, JobFailed, JobRunner
+from database import (storage_from_env, services_table, bookings_table, reviews_table, subscriptions_table,
+                      ledger_table, jobs_table, revocations_table, users_table)
+from loader import StartupLoader, iter_records, parse_records
+from journal import JournalStorage, journal_from_env
+from passwords import HashingBusy, PasswordHasher
+from auth import InvalidToken, RevocationList, TokenService
+from cache import MemoryBackend, ResponseCache
+from events import EventBus
+from responses import FastJSONResponse, dumps, stream_json, wants_ndjson
+from push import PushHub, sse_frame
+from models.ratings import RatingAggregator, check_review_rating
+from models.validation import (validate_description, validate_email, validate_phone, validate_price, validate_rating,
+                               validate_review_description, validate_review_title, validate_service_type, validate_text,
+                               validate_title)
+from models.Notification import Notification
+from notifications import InboxStore, NotificationPipeline
+from controllers.NotificationController import (deleteNotification, getNotifications, markAllNotificationsRead,
+                                                markNotificationRead, sendNotification)
+from booking_state import (INITIAL_STATUSES, PROVIDER_STATUSES, InvalidTransition, KeyedLocks, check_transition,
+                           make_etag, parse_etag)
 
-app = FastAPI()
+load_dotenv()
+
+# Persistent storage is used when DATABASE_URL is set, e.g.
+# DATABASE_URL=sqlite+aiosqlite:///hustlr.db. Otherwise JOURNAL_DIR keeps the in-memory
+# store durable with a write-ahead log and snapshots (see journal.py); without either,
+# data lives in memory only.
+storage = storage_from_env() or journal_from_env()
+repo = Repository()
+search_index = SearchIndex()
+geo_index = GeoIndex()
+availability = AvailabilityIndex()
+# per-provider booking counts, revenue and upcoming jobs, kept current by the booking routes
+provider_stats = ProviderStatsIndex()
+reviews = ReviewStore()
+# review rating aggregates and Bayesian-ranked services per category
+ratings = RatingAggregator(prior_mean=float(os.getenv("RATING_PRIOR_MEAN", 3.0)),
+                           prior_weight=float(os.getenv("RATING_PRIOR_WEIGHT", 5)))
+# per-account notification inboxes (capped ring buffers), filled by background writers
+inbox_store = InboxStore(int(os.getenv("NOTIFICATION_INBOX_SIZE", 200)))
+notification_pipeline = NotificationPipeline(inbox_store, batch_size=int(os.getenv("NOTIFICATION_BATCH", 1000)))
+# open WebSocket/SSE connections by user; PUSH_OVERFLOW is drop_oldest or disconnect
+hub = PushHub(int(os.getenv("PUSH_QUEUE_SIZE", 100)), os.getenv("PUSH_OVERFLOW", "drop_oldest"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", 15))
+# recurring subscriptions, renewed by a background task every BILLING_INTERVAL_SECONDS
+BILLING_BATCH = int(os.getenv("BILLING_BATCH", 500))
+BILLING_CONCURRENCY = int(os.getenv("BILLING_CONCURRENCY", 20))
+BILLING_INTERVAL_SECONDS = float(os.getenv("BILLING_INTERVAL_SECONDS", 60))
+# stand-in payment gateway; GATEWAY_LOG keeps its own record of operations for reconciliation
+gateway = LocalGateway(latency=float(os.getenv("GATEWAY_LATENCY_MS", 0)) / 1000, log_path=os.getenv("GATEWAY_LOG"))
+# platform fee in basis points; providers are paid out in one transfer per PAYOUT_INTERVAL_SECONDS
+PLATFORM_FEE_BPS = int(os.getenv("PLATFORM_FEE_BPS", 0))
+PAYOUT_MINIMUM = to_cents(os.getenv("PAYOUT_MINIMUM", 0))
+PAYOUT_INTERVAL_SECONDS = float(os.getenv("PAYOUT_INTERVAL_SECONDS", 3600))
+# background jobs (reports, rebuilds, imports); JOB_PROCESSES > 0 moves their CPU-heavy parts to a process pool
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 2))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", 5))
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", 0))
+# finished jobs, and the files of finished report jobs, are deleted this long after they finish
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+# report jobs write their files here; import jobs only read files from JOB_IMPORT_DIR
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "job_output")
+JOB_IMPORT_DIR = os.getenv("JOB_IMPORT_DIR", "imports")
+# serialises booking writes per provider so check-then-write sequences cannot interleave
+provider_locks = KeyedLocks()
+# bcrypt runs in a bounded worker pool; BCRYPT_ROUNDS sets the cost factor
+passwords = PasswordHasher.from_env()
+# JWT keys are read once here; see TokenService.from_env for the settings
+tokens = TokenService.from_env()
+bearer = HTTPBearer(auto_error=False)
+# admins are users of type "admin" (generate_test_data.py writes one, admin@hustlr.dev) and the
+# ids listed here, comma separated, e.g. to make an existing account an admin
+ADMIN_USER_IDS = frozenset(filter(None, (i.strip() for i in os.getenv("ADMIN_USER_IDS", "").split(","))))
+# domain events, e.g. "service.changed" evicts cached catalogue responses
+events = EventBus()
+response_cache = ResponseCache(MemoryBackend(int(os.getenv("RESPONSE_CACHE_SIZE", 1024))),
+                               ttl=float(os.getenv("RESPONSE_CACHE_TTL", 30)))
+
+# test_data.json-shaped document, or a directory of users/services/bookings.ndjson
+DATA_PATH = os.getenv("DATA_PATH", "test_data.json")
+# BACKGROUND_LOAD=1 starts serving immediately; /api/health reports 503 until data is loaded
+BACKGROUND_LOAD = os.getenv("BACKGROUND_LOAD") == "1"
+# optional file that gets one JSON line of load time and peak memory per startup
+STARTUP_METRICS_PATH = os.getenv("STARTUP_METRICS_PATH")
+loader = StartupLoader()
+
+def test_data_records():
+    try:
+        yield from iter_records(DATA_PATH)
+    except FileNotFoundError:
+        print(f"Warning: {DATA_PATH} not found. Using empty data.")
+
+def index_service_location(service: dict) -> None:
+    # services without their own coordinates fall back to the provider's city
+    provider = repo.get_user(service['provider_id'])
+    point = record_coordinates(service, provider.get('location') if provider else None)
+    if point:
+        geo_index.add(service['id'], point[0], point[1], service['category'])
+
+def index_record(kind: str, record: dict) -> None:
+    """Adds one loaded record to the repository and every derived index."""
+    if kind == 'users':
+        repo.add_user(record)
+    elif kind == 'services':
+        repo.add_service(record)
+        search_index.add(record)
+        index_service_location(record)
+        ratings.track(record['id'], record['category'])
+    elif kind == 'bookings':
+        repo.add_booking(record)
+        availability.add_booking(record)
+        provider_stats.add_booking(record)
+    elif kind == 'reviews':
+        reviews.add(record)
+        ratings.add(record['target_id'], record['rating'])
+    elif kind == 'subscriptions':
+        billing.add(record)
+    elif kind == 'ledger':
+        payments.restore(record)
+    elif kind == 'jobs':
+        job_runner.restore(record)
+    elif kind == 'revocations':
+        # ones that expired while the server was down are skipped
+        tokens.revoked.revoke(record['jti'], record['exp'])
+    elif kind == 'hours':
+        availability.set_working_hours(record['provider_id'], decode_working_hours(record['hours']))
+
+async def load_data() -> None:
+    if storage:
+        await storage.create_all()
+        if await storage.count(users_table) > 0:
+            records = storage.stream_records()
+        else:
+            records = storage.seed_stream(test_data_records())
+    else:
+        records = test_data_records()
+    # the rating rankings are sorted once at the end instead of per service and review
+    ratings.defer()
+    try:
+        await loader.run(records, index_record, STARTUP_METRICS_PATH)
+    finally:
+        ratings.rank()
+    if storage:
+        await storage.delete_expired_revocations(time.time())
+    if isinstance(storage, JournalStorage):
+        storage.start(snapshot_records)
+
+def snapshot_records():
+    """The live state as (kind, record) pairs in loader order, for journal snapshots."""
+    # copies of the collections, since writes continue while a snapshot is written
+    for user in list(repo.users.values()):
+        yield 'users', user
+    for service in list(repo.services.values()):
+        yield 'services', service.to_dict()
+    for booking in list(repo.bookings.values()):
+        yield 'bookings', booking.to_dict()
+    for review in list(reviews.reviews.values()):
+        yield 'reviews', review
+    for subscription in list(billing.subscriptions.values()):
+        yield 'subscriptions', subscription
+    ledger = payments.ledger
+    for entry in ledger.entries[:len(ledger)]:
+        yield 'ledger', entry.to_dict()
+    for job in list(job_runner.jobs.values()):
+        yield 'jobs', JobRunner.to_dict(job)
+    for jti, exp in tokens.revoked.items():
+        yield 'revocations', {'jti': jti, 'exp': exp}
+    for provider_id, hours in availability.custom_working_hours():
+        yield 'hours', {'provider_id': provider_id, 'hours': encode_working_hours(hours)}
+
+async def load_data_in_background() -> None:
+    try:
+        await load_data()
+    except Exception as e:
+        print(f"Error: loading data failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global repo, search_index, geo_index, availability, provider_stats, reviews, ratings, billing, payments, job_runner
+    repo = Repository()
+    search_index = SearchIndex()
+    geo_index = GeoIndex()
+    availability = AvailabilityIndex()
+    provider_stats = ProviderStatsIndex()
+    reviews = ReviewStore()
+    ratings = RatingAggregator(ratings.prior_mean, ratings.prior_weight)
+    billing = new_billing_scheduler()
+    payments = new_payments()
+    job_runner = new_job_runner()
+    tokens.revoked = RevocationList()
+    response_cache.backend.clear()
+    inbox_store.inboxes.clear()
+    notification_pipeline.start()
+    load_task = None
+    if BACKGROUND_LOAD:
+        load_task = asyncio.create_task(load_data_in_background())
+    else:
+        await load_data()
+    billing.start(BILLING_INTERVAL_SECONDS, time.time)
+    payments.start(PAYOUT_INTERVAL_SECONDS)
+    job_runner.start()
+    yield
+    if load_task and not load_task.done():
+        load_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await load_task
+    await billing.stop()
+    await payments.stop()
+    await job_runner.stop()
+    hub.close_all()
+    await notification_pipeline.stop()
+    passwords.close()
+    if storage:
+        await storage.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -15,39 +249,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Load test data
-try:
-    with open('test_data.json', 'r') as f:
-        test_data = json.load(f)
-        users = test_data['users']
-        services = test_data['services']
-        bookings = test_data['bookings']
-except FileNotFoundError:
-    print("Warning: test_data.json not found. Using empty data.")
-    users = []
-    services = []
-    bookings = []
-
 # Models
+def checked(validator: Callable) -> AfterValidator:
+    """Runs a shared validator from models/validation.py on a field; its ValueError becomes a 422."""
+    def check(value):
+        if value is not None:
+            validator(value)
+        return value
+    return AfterValidator(check)
+
 class User(BaseModel):
     id: str
-    email: str
+    email: Annotated[str, checked(validate_email)]
     name: str
-    type: str  # "consumer" or "business"
-    phone: Optional[str] = None
+    type: str  # "consumer", "business" or "admin" (see ADMIN_USER_IDS)
+    phone: Annotated[Optional[str], checked(validate_phone)] = None
     location: Optional[str] = None
 
 class Service(BaseModel):
     id: str
     name: str
-    description: str
-    price: float
+    description: Annotated[str, checked(validate_description)]
+    price: Annotated[float, checked(validate_price)]
     provider_id: str
-    category: str
+    category: Annotated[str, checked(validate_service_type)]
     image_url: Optional[str] = None
-    rating: Optional[float] = None
+    rating: Annotated[Optional[float], checked(validate_rating)] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+class ServiceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Annotated[Optional[str], checked(validate_description)] = None
+    price: Annotated[Optional[float], checked(validate_price)] = None
+    category: Annotated[Optional[str], checked(validate_service_type)] = None
+    image_url: Optional[str] = None
+    # no rating: it is the average of the service's reviews
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 class Booking(BaseModel):
     id: str
@@ -57,91 +299,1079 @@ class Booking(BaseModel):
     date: str
     time: str
     status: str
-    price: float
+    # ignored; a booking costs what its service costs
+    price: Annotated[Optional[float], checked(validate_price)] = None
+    version: int = 1
+
+class RefreshRequest(BaseModel):
+    refreshToken: str
+
+class LogoutRequest(BaseModel):
+    refreshToken: Optional[str] = None
+
+class ReviewCreate(BaseModel):
+    target_type: Literal["service", "user"]
+    target_id: str
+    rating: Annotated[int, checked(check_review_rating)]
+    title: Annotated[str, checked(validate_review_title)]
+    comment: Annotated[str, checked(validate_review_description)]
+
+class ReviewUpdate(BaseModel):
+    rating: Annotated[Optional[int], checked(check_review_rating)] = None
+    title: Annotated[Optional[str], checked(validate_review_title)] = None
+    comment: Annotated[Optional[str], checked(validate_review_description)] = None
+
+class ProviderUpdate(BaseModel):
+    title: Annotated[str, checked(validate_title)]
+    description: Annotated[str, checked(validate_text)]
+
+class SubscriptionCreate(BaseModel):
+    service_id: str
+    interval_days: int = Field(30, ge=1, le=366)
+    # first charge; defaults to now
+    start: Optional[datetime] = None
+
+class JobCreate(BaseModel):
+    kind: str
+    params: dict = {}
+
+class WorkingHours(BaseModel):
+    # weekday (0 = Monday) -> ("9:00", "18:00"); missing weekdays are closed
+    hours: Dict[int, Tuple[str, str]]
+
+# Pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# unpaged lists longer than this are streamed in chunks instead of encoded in one piece
+STREAM_THRESHOLD = int(os.getenv("STREAM_THRESHOLD", 1000))
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Turns a comma separated `fields=` value into a projection list that always keeps `id`."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    return names if 'id' in names else ['id'] + names
+
+def record_encoder(fields: Optional[List[str]]) -> Callable[[Mapping], dict]:
+    # repository records are compact objects; to_dict() gives the JSON shape
+    if not fields:
+        return lambda r: r if isinstance(r, dict) else r.to_dict()
+    return lambda r: {k: r[k] for k in fields if k in r}
+
+def project(records: List[Mapping], fields: Optional[List[str]]) -> List[dict]:
+    return list(map(record_encoder(fields), records))
+
+def paged(page_fn, limit: Optional[int], after: Optional[str], fields: Optional[str], **filters) -> dict:
+    try:
+        items, next_cursor, total = page_fn(limit=limit or DEFAULT_PAGE_SIZE, after=after, **filters)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": project(items, parse_fields(fields)), "next_cursor": next_cursor, "total": total}
+
+def booking_start(day: str, time: str) -> int:
+    try:
+        return parse_slot(day, time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Booking date must be YYYY-MM-DD and time H:MM")
+
+def reserve_slot(booking_id: str, provider_id: str, start: int) -> None:
+    if not availability.is_open(provider_id, start):
+        raise HTTPException(status_code=409, detail="Outside provider working hours")
+    if availability.find_conflict(provider_id, start):
+        raise HTTPException(status_code=409, detail="Provider is already booked at this time")
+    availability.add(booking_id, provider_id, start)
+
+def current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)) -> dict:
+    """Dependency returning the claims of the request's bearer access token (no datastore lookup)."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return tokens.decode(credentials.credentials, "access")
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+def is_admin(claims: dict) -> bool:
+    return claims['user_type'] == 'admin' or claims['sub'] in ADMIN_USER_IDS
+
+def admin_user(claims: dict = Depends(current_user)) -> dict:
+    """Dependency for platform-wide operations; only admins (see ADMIN_USER_IDS) get past it."""
+    if not is_admin(claims):
+        raise HTTPException(status_code=403, detail="Only admins can do this")
+    return claims
+
+def stream_claims(token: Optional[str], credentials: Optional[HTTPAuthorizationCredentials] = None) -> Optional[dict]:
+    # EventSource and browser WebSockets cannot set headers, so streams also accept ?token=
+    if credentials is not None:
+        token = credentials.credentials
+    if not token:
+        return None
+    try:
+        return tokens.decode(token, "access")
+    except InvalidToken:
+        return None
+
+def user_summary(user: dict) -> dict:
+    return {
+        "id": user['id'],
+        "email": user['email'],
+        "name": user['name'],
+        "type": user['type']
+    }
+
+# Response cache
+def service_list_tag(category: Optional[str], provider_id: Optional[str]) -> str:
+    """The tag of cached service lists with exactly these filters."""
+    if category and provider_id:
+        return f"category:{category.lower()}|provider:{provider_id}"
+    if category:
+        return f"category:{category.lower()}"
+    if provider_id:
+        return f"provider:{provider_id}"
+    return "services"
+
+def invalidate_service(service: Mapping, previous: Optional[Mapping] = None) -> None:
+    # a change shows up in the service itself and in every list filtered by
+    # its category and/or provider, before and after an edit
+    tags = {f"service:{service['id']}"}
+    for record in (service, previous):
+        if record:
+            for category in (None, record['category']):
+                for provider_id in (None, record['provider_id']):
+                    tags.add(service_list_tag(category, provider_id))
+    response_cache.invalidate(tags)
+
+events.subscribe("service.changed", invalidate_service)
+
+# Notifications
+async def notify(recipients, title: str, description: str, kind: str, related_id: Optional[str] = None) -> None:
+    """Queues a notification; delivery happens in the pipeline's writer tasks."""
+    await sendNotification(notification_pipeline, recipients, Notification(title, description), kind, related_id)
+
+# Push
+def push_booking(booking: Mapping) -> None:
+    # keyed by booking, so a client that falls behind only gets the latest status
+    data = {key: booking[key] for key in ('id', 'service_id', 'date', 'time', 'status', 'version')}
+    hub.publish_many((booking['consumer_id'], booking['provider_id']), "booking", data, key=f"booking:{booking['id']}")
+
+def push_notifications(recipients: List[str], payload: dict, ids: List[int]) -> None:
+    for account_id, seq in zip(recipients, ids):
+        if account_id in hub.connections:
+            hub.publish(account_id, "notification", dict(payload, id=str(seq), read=False))
+
+events.subscribe("booking.changed", push_booking)
+notification_pipeline.on_delivered = push_notifications
+
+# Payments
+async def save_ledger_entry(entry) -> None:
+    if storage:
+        await storage.insert(ledger_table, entry.to_dict())
+
+def new_payments() -> Payments:
+    manager = Payments(Ledger(), gateway, fee_bps=PLATFORM_FEE_BPS, payout_minimum=PAYOUT_MINIMUM)
+    manager.on_entry = save_ledger_entry
+    return manager
+
+payments = new_payments()
+
+async def capture_booking_payment(booking: Mapping) -> None:
+    """Charges the consumer for a completed booking; a decline is reported to them rather than undoing the booking."""
+    if booking.get('booked_by') != booking['consumer_id']:
+        # e.g. imported bookings; only a booking the consumer made themselves is charged to them
+        return
+    try:
+        await payments.charge(f"booking:{booking['id']}", "booking_payment", booking['id'], booking['consumer_id'],
+                              booking['provider_id'], to_cents(booking['price']))
+    except PaymentDeclined as e:
+        await notify([booking['consumer_id']], "Payment failed", str(e), "payment", booking['id'])
+
+# Billing
+async def charge_subscription(subscription: dict, key: str) -> bool:
+    """Bills one subscription period; `key` is unique per period, so a retried run is charged once."""
+    service = repo.get_service(subscription['service_id'])
+    name = service['name'] if service else "a service"
+    try:
+        await payments.charge(key, "subscription", subscription['id'], subscription['consumer_id'],
+                              subscription['provider_id'], to_cents(subscription['amount']))
+    except PaymentDeclined as e:
+        await notify([subscription['consumer_id']], "Payment failed",
+                     f"Renewing your subscription to {name} failed: {e}", "subscription", subscription['id'])
+        return False
+    await notify([subscription['consumer_id']], "Subscription renewed",
+                 f"Your subscription to {name} was renewed for {subscription['amount']:.2f}.",
+                 "subscription", subscription['id'])
+    return True
+
+async def save_subscription(subscription: dict) -> None:
+    if storage:
+        await storage.update_subscription(subscription['id'], status=subscription['status'],
+                                          next_due=subscription['next_due'],
+                                          periods_billed=subscription['periods_billed'],
+                                          attempts=subscription['attempts'])
+
+def new_billing_scheduler() -> BillingScheduler:
+    scheduler = BillingScheduler(charge_subscription, batch_size=BILLING_BATCH, concurrency=BILLING_CONCURRENCY)
+    scheduler.on_change = save_subscription
+    return scheduler
+
+billing = new_billing_scheduler()
+
+# Ratings
+async def apply_service_rating(service_id: str) -> None:
+    """Copies a service's aggregated review average into its `rating` field after a review change."""
+    service = repo.get_service(service_id)
+    if not service:
+        return
+    average = ratings.summary(service_id).mean
+    rating = round(average, 2) if average is not None else None
+    if rating == service.get('rating'):
+        return
+    previous = service.to_dict()
+    if storage:
+        await storage.update_service(service_id, rating=rating)
+    repo.update_service(service_id, rating=rating)
+    search_index.set_rating(service_id, rating)
+    events.publish("service.changed", service=service, previous=previous)
 
 # Routes
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Service Booking API"}
 
+@app.get("/api/health")
+async def health(response: Response):
+    # 503 until the startup load has finished, so load balancers hold traffic back
+    if not loader.ready:
+        response.status_code = 503
+    return loader.report()
+
 @app.post("/api/auth/login")
 async def login(email: str, password: str):
     # Find user by email
-    user = next((u for u in users if u['email'] == email), None)
-    if not user:
+    user = repo.get_user_by_email(email)
+    try:
+        valid = await passwords.verify(password, user.get('password_hash') if user else None)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Too many login attempts, retry shortly",
+                            headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # In a real app, we would verify the password here
+
+    # upgrade hashes made with an older cost factor while the plain password is at hand
+    if passwords.needs_rehash(user['password_hash']):
+        with suppress(HashingBusy):
+            password_hash = await passwords.hash(password)
+            if storage:
+                await storage.update_user(user['id'], password_hash=password_hash)
+            user['password_hash'] = password_hash
+    access_token, refresh_token = tokens.issue(user)
     return {
-        "token": "dummy_token",
-        "user": {
-            "id": user['id'],
-            "email": user['email'],
-            "name": user['name'],
-            "type": user['type']
-        }
+        "token": access_token,
+        "refreshToken": refresh_token,
+        "user": user_summary(user)
     }
 
+async def revoke_token(claims: dict) -> None:
+    # revoked in memory before the write, so a concurrent refresh with the same token already fails
+    if tokens.revoke(claims) and storage:
+        await storage.insert(revocations_table, {'jti': claims['jti'], 'exp': claims['exp']})
+
+@app.post("/api/auth/refresh")
+async def refresh(request: RefreshRequest):
+    # refresh tokens are single use: each refresh revokes the old one and issues a new pair
+    try:
+        claims = tokens.decode(request.refreshToken, "refresh")
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    user = repo.get_user(claims['sub'])
+    if not user:
+        raise HTTPException(status_code=401, detail="User no longer exists")
+    await revoke_token(claims)
+    access_token, refresh_token = tokens.issue(user)
+    return {"token": access_token, "refreshToken": refresh_token}
+
+@app.post("/api/auth/logout")
+async def logout(request: LogoutRequest = LogoutRequest(), claims: dict = Depends(current_user)):
+    await revoke_token(claims)
+    if request.refreshToken:
+        with suppress(InvalidToken):
+            refresh_claims = tokens.decode(request.refreshToken, "refresh")
+            if refresh_claims['sub'] == claims['sub']:
+                await revoke_token(refresh_claims)
+    return {"message": "Logged out"}
+
+@app.get("/api/auth/me")
+async def me(claims: dict = Depends(current_user)):
+    user = repo.get_user(claims['sub'])
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_summary(user)
+
 @app.get("/api/services")
-async def get_services(category: Optional[str] = None, provider_id: Optional[str] = None):
-    filtered_services = services
-    
-    if category:
-        filtered_services = [s for s in filtered_services if s['category'].lower() == category.lower()]
-    
-    if provider_id:
-        filtered_services = [s for s in filtered_services if s['provider_id'] == provider_id]
-    
-    return filtered_services
+async def get_services(category: Optional[str] = None, provider_id: Optional[str] = None,
+                       limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                       after: Optional[str] = None, fields: Optional[str] = None,
+                       if_none_match: Optional[str] = Header(None), accept: Optional[str] = Header(None)):
+    # Without limit/after the full list is returned as before; with them the
+    # response is a page envelope {items, next_cursor, total}.
+    # Accept: application/x-ndjson streams the full list one service per line.
+    projection = parse_fields(fields)
+    if limit is None and after is None and wants_ndjson(accept):
+        return stream_json(repo.list_services(category=category, provider_id=provider_id),
+                           record_encoder(projection), ndjson=True)
+    key = response_cache.key("services", category=category.lower() if category else None, provider_id=provider_id,
+                             limit=limit, after=after, fields=",".join(projection) if projection else None)
+    entry = response_cache.get(key)
+    if entry is None:
+        if limit is None and after is None:
+            payload = project(repo.list_services(category=category, provider_id=provider_id), projection)
+        else:
+            payload = paged(repo.page_services, limit, after, fields, category=category, provider_id=provider_id)
+        entry = response_cache.put(key, payload, [service_list_tag(category, provider_id)])
+    return response_cache.respond(entry, if_none_match)
+
+@app.get("/api/services/top")
+async def top_services(category: Optional[str] = None, n: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+                       fields: Optional[str] = None):
+    # ranked by Bayesian-smoothed review score, so a single 5-star review does not top the list
+    items = [dict(repo.get_service(service_id).to_dict(), score=round(score, 4))
+             for service_id, score in ratings.top(category, n)]
+    return FastJSONResponse({"items": project(items, parse_fields(fields))})
+
+@app.get("/api/services/search")
+async def search_services(q: str, category: Optional[str] = None,
+                          limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+                          fields: Optional[str] = None):
+    # The last word of q is prefix-matched so the route can back type-ahead.
+    results = search_index.search(q, limit=limit, category=category)
+    items = [dict(repo.get_service(service_id).to_dict(), score=round(score, 4)) for service_id, score in results]
+    return FastJSONResponse({"items": project(items, parse_fields(fields))})
+
+@app.get("/api/services/nearby")
+async def nearby_services(lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180),
+                          radius: float = Query(10.0, gt=0, le=500), k: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                          category: Optional[str] = None,
+                          limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                          fields: Optional[str] = None):
+    # radius is in km; with k the k nearest services inside the radius are returned
+    if k:
+        results = geo_index.nearest(lat, lng, k, radius, category=category)
+    else:
+        results = geo_index.within(lat, lng, radius, category=category, limit=limit)
+    items = [dict(repo.get_service(service_id).to_dict(), distance_km=round(distance, 3)) for service_id, distance in results]
+    return FastJSONResponse({"items": project(items, parse_fields(fields))})
 
 @app.get("/api/services/{service_id}")
-async def get_service(service_id: str):
-    service = next((s for s in services if s['id'] == service_id), None)
-    if not service:
+async def get_service(service_id: str, if_none_match: Optional[str] = Header(None)):
+    key = response_cache.key("service", id=service_id)
+    entry = response_cache.get(key)
+    if entry is None:
+        service = repo.get_service(service_id)
+        if not service:
+            raise HTTPException(status_code=404, detail="Service not found")
+        entry = response_cache.put(key, service.to_dict(), [f"service:{service_id}"])
+    return response_cache.respond(entry, if_none_match)
+
+@app.get("/api/services/{service_id}/rating")
+async def get_service_rating(service_id: str):
+    if not repo.get_service(service_id):
         raise HTTPException(status_code=404, detail="Service not found")
-    return service
+    return {"service_id": service_id, **ratings.summary(service_id).to_dict(),
+            "score": round(ratings.score(service_id), 4)}
 
 @app.post("/api/services")
-async def create_service(service: Service):
-    services.append(service.dict())
+async def create_service(service: Service, claims: dict = Depends(current_user)):
+    if claims['sub'] != service.provider_id:
+        raise HTTPException(status_code=403, detail="Providers can only add their own services")
+    record = service.dict()
+    if repo.get_service(record['id']) is not None:
+        raise HTTPException(status_code=409, detail="A service with this id already exists")
+    if storage:
+        try:
+            await storage.insert(services_table, record)
+        except IntegrityError:
+            # another request stored the same id while this one was writing
+            raise HTTPException(status_code=409, detail="A service with this id already exists")
+    repo.add_service(record)
+    search_index.add(record)
+    index_service_location(record)
+    ratings.track(record['id'], record['category'])
+    events.publish("service.changed", service=record)
     return service
 
+@app.put("/api/services/{service_id}")
+async def update_service(service_id: str, update: ServiceUpdate, claims: dict = Depends(current_user)):
+    service = repo.get_service(service_id)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+    if claims['sub'] != service['provider_id']:
+        raise HTTPException(status_code=403, detail="Providers can only change their own services")
+    changes = update.dict(exclude_unset=True)
+    if any(changes.get(field, '') is None for field in ('name', 'description', 'price', 'category')):
+        raise HTTPException(status_code=400, detail="name, description, price and category cannot be null")
+    previous = service.to_dict()
+    if storage and changes:
+        await storage.update_service(service_id, **changes)
+    repo.update_service(service_id, **changes)
+    search_index.add(service)
+    geo_index.remove(service_id)
+    index_service_location(service)
+    ratings.track(service_id, service['category'])
+    events.publish("service.changed", service=service, previous=previous)
+    return service.to_dict()
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return response_cache.stats()
+
 @app.get("/api/bookings")
-async def get_bookings(user_id: str, user_type: str):
-    if user_type == 'consumer':
-        user_bookings = [b for b in bookings if b['consumer_id'] == user_id]
-    else:  # business user
-        user_bookings = [b for b in bookings if b['provider_id'] == user_id]
-    return user_bookings
+async def get_bookings(user_id: str, user_type: str,
+                       limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                       after: Optional[str] = None, fields: Optional[str] = None,
+                       accept: Optional[str] = Header(None)):
+    # Long unpaged lists are streamed, as a JSON array or with
+    # Accept: application/x-ndjson one booking per line.
+    if limit is None and after is None:
+        bookings = repo.bookings_for_user(user_id, user_type)
+        encode = record_encoder(parse_fields(fields))
+        ndjson = wants_ndjson(accept)
+        if ndjson or len(bookings) > STREAM_THRESHOLD:
+            return stream_json(bookings, encode, ndjson=ndjson)
+        return FastJSONResponse(list(map(encode, bookings)))
+    return FastJSONResponse(paged(repo.page_bookings, limit, after, fields, user_id=user_id, user_type=user_type))
 
 @app.post("/api/bookings")
-async def create_booking(booking: Booking):
+async def create_booking(booking: Booking, claims: dict = Depends(current_user)):
+    # completing a booking charges its consumer, so only they can make it
+    if claims['sub'] != booking.consumer_id:
+        raise HTTPException(status_code=403, detail="Consumers can only book for themselves")
     # Verify service exists
-    service = next((s for s in services if s['id'] == booking.service_id), None)
+    service = repo.get_service(booking.service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
+    if booking.provider_id != service['provider_id']:
+        raise HTTPException(status_code=400, detail="The service is not offered by this provider")
     
     # Verify consumer exists
-    consumer = next((u for u in users if u['id'] == booking.consumer_id), None)
+    consumer = repo.get_user(booking.consumer_id)
     if not consumer:
         raise HTTPException(status_code=404, detail="Consumer not found")
     
     # Verify provider exists
-    provider = next((u for u in users if u['id'] == booking.provider_id), None)
+    provider = repo.get_user(booking.provider_id)
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
     
-    bookings.append(booking.dict())
-    return booking
+    if booking.status not in INITIAL_STATUSES:
+        raise HTTPException(status_code=400, detail="New bookings must be pending or confirmed")
+    start = booking_start(booking.date, booking.time)
+    
+    async with provider_locks.hold(booking.provider_id):
+        if repo.get_booking(booking.id):
+            raise HTTPException(status_code=409, detail="Booking already exists")
+        # Reserve the slot before any await so a concurrent request sees it taken
+        reserve_slot(booking.id, booking.provider_id, start)
+        record = booking.dict()
+        record.update(price=service['price'], version=1, booked_by=claims['sub'])
+        if storage:
+            try:
+                await storage.insert(bookings_table, record)
+            except Exception:
+                availability.remove(booking.id)
+                raise
+        repo.add_booking(record)
+        provider_stats.add_booking(record)
+    events.publish("booking.changed", booking=record)
+    await notify([booking.provider_id], "New booking",
+                 f"{consumer['name']} booked {service['name']} on {booking.date} at {booking.time}.",
+                 "booking", booking.id)
+    return record
+
+@app.get("/api/bookings/{booking_id}")
+async def get_booking(booking_id: str, response: Response):
+    booking = repo.get_booking(booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    response.headers["ETag"] = make_etag(booking['version'])
+    return booking.to_dict()
 
 @app.put("/api/bookings/{booking_id}")
-async def update_booking(booking_id: str, status: str):
-    booking = next((b for b in bookings if b['id'] == booking_id), None)
+async def update_booking(booking_id: str, status: str, response: Response, version: Optional[int] = None,
+                         if_match: Optional[str] = Header(None), claims: dict = Depends(current_user)):
+    # Optimistic concurrency: pass the version (or its ETag in If-Match) that was read;
+    # the update is refused with 412 if the booking changed since.
+    booking = repo.get_booking(booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    
-    booking['status'] = status
-    return booking
+    if claims['sub'] not in (booking['consumer_id'], booking['provider_id']):
+        raise HTTPException(status_code=403, detail="Only the consumer or provider can change a booking")
+    if status in PROVIDER_STATUSES and claims['sub'] != booking['provider_id']:
+        raise HTTPException(status_code=403, detail=f"Only the provider can mark a booking {status}")
+    expected = version if version is not None else parse_etag(if_match)
+    async with provider_locks.hold(booking['provider_id']):
+        current = booking['version']
+        if expected is not None and expected != current:
+            raise HTTPException(status_code=412, detail="Booking was modified, reload and retry")
+        try:
+            check_transition(booking['status'], status)
+        except InvalidTransition as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        if storage and not await storage.update_booking(booking_id, expected_version=current,
+                                                        status=status, version=current + 1):
+            raise HTTPException(status_code=412, detail="Booking was modified, reload and retry")
+        repo.update_booking(booking_id, status=status, version=current + 1)
+        provider_stats.update_booking(booking)
+        events.publish("booking.changed", booking=booking)
+        # cancelled is final, so a freed slot never has to be won back
+        if status not in BLOCKING_STATUSES:
+            availability.remove(booking_id)
+    if status == 'completed':
+        await capture_booking_payment(booking)
+    # the consumer hears about every change; the provider only about cancellations
+    recipients = [booking['consumer_id']] + ([booking['provider_id']] if status == 'cancelled' else [])
+    await notify(recipients, f"Booking {status}", f"Booking on {booking['date']} at {booking['time']} is now {status}.",
+                 "booking", booking_id)
+    response.headers["ETag"] = make_etag(booking['version'])
+    return booking.to_dict()
+
+@app.post("/api/bookings/{booking_id}/refund")
+async def refund_booking(booking_id: str, claims: dict = Depends(current_user)):
+    booking = repo.get_booking(booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    if booking['provider_id'] != claims['sub']:
+        raise HTTPException(status_code=403, detail="Only the provider can refund a booking")
+    try:
+        entry = await payments.refund(f"booking:{booking_id}")
+    except PaymentDeclined as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Booking has not been paid")
+    await notify([booking['consumer_id']], "Booking refunded",
+                 f"Your booking on {booking['date']} at {booking['time']} was refunded.", "payment", booking_id)
+    return entry.view(consumer_account(booking['consumer_id']))
+
+@app.get("/api/wallet")
+async def get_wallet(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[int] = None,
+                     claims: dict = Depends(current_user)):
+    # providers see what they are owed, consumers what they have paid (negative) and been refunded
+    account = provider_account(claims['sub']) if claims['user_type'] == 'business' else consumer_account(claims['sub'])
+    entries, next_cursor = payments.ledger.history(account, limit, after)
+    return FastJSONResponse({"account": account, "balance": payments.ledger.balance(account) / 100,
+                             "items": [entry.view(account) for entry in entries], "next_cursor": next_cursor})
+
+@app.post("/api/payouts/settle")
+async def settle_payouts(claims: dict = Depends(admin_user)):
+    return await payments.settle()
+
+@app.get("/api/ledger/reconcile")
+async def reconcile_ledger(claims: dict = Depends(admin_user)):
+    return payments.ledger.reconcile(gateway.operations.keys())
+
+# Reports
+def report_source(kind: str) -> Tuple[int, Iterator[tuple]]:
+    """The number of rows of a report and the rows themselves."""
+    # copies of the collections (one reference a row), since the routes keep writing while the export is read
+    if kind == 'bookings':
+        bookings = list(repo.bookings.values())
+        return len(bookings), booking_rows(bookings)
+    if kind == 'users':
+        users = list(repo.users.values())
+        return len(users), user_rows(users)
+    providers = list(provider_stats.providers.items())
+    return len(providers), revenue_rows(providers, payments.ledger)
+
+@app.get("/api/reports/{kind}")
+async def download_report(kind: Literal["bookings", "revenue", "users"],
+                          format: Literal["csv", "ndjson", "columnar"] = "csv", claims: dict = Depends(admin_user)):
+    """Streams a platform report as a chunked download; rows are encoded as the client reads them."""
+    report_format = FORMATS[format]
+    filename = f"{kind}-{date.today().isoformat()}.{report_format.extension}"
+    _, rows = report_source(kind)
+    return StreamingResponse(export_report(kind, rows, format), media_type=report_format.media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# Jobs
+JOB_CHUNK = 5000
+# kinds that read or change platform-wide data; other users get a 403 on submit
+ADMIN_JOB_KINDS = frozenset({'report', 'rebuild_provider_stats', 'import_services'})
+
+def check_report_job(params: dict) -> None:
+    if params.get('kind') not in REPORTS:
+        raise ValueError(f"Report kind must be one of {', '.join(REPORTS)}.")
+    if params.get('format', 'csv') not in FORMATS:
+        raise ValueError(f"Report format must be one of {', '.join(FORMATS)}.")
+
+async def report_job(context, params: dict) -> dict:
+    """Writes a report to JOB_OUTPUT_DIR; the file only appears under its final name once complete."""
+    kind, report_format = params['kind'], params.get('format', 'csv')
+    total, rows = report_source(kind)
+    written = 0
+
+    def counted():
+        nonlocal written
+        for row in rows:
+            written += 1
+            yield row
+
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(JOB_OUTPUT_DIR, f"{context.job['id']}.{FORMATS[report_format].extension}")
+    size = 0
+    with open(path + ".part", "wb") as file:
+        for chunk in export_report(kind, counted(), report_format):
+            file.write(chunk)
+            size += len(chunk)
+            await context.progress(written, total)
+    os.replace(path + ".part", path)
+    return {"file": os.path.basename(path), "rows": written, "bytes": size,
+            "download": f"/api/jobs/{context.job['id']}/result"}
+
+async def rebuild_stats_job(context, params: dict) -> dict:
+    """Recounts the provider stats in chunks, then swaps the rebuilt index in whole."""
+    global provider_stats
+    changed = {}
+
+    def track(booking: Mapping) -> None:
+        changed[booking['id']] = booking
+
+    # bookings created or updated while the rebuild runs are applied again at the end
+    events.subscribe("booking.changed", track)
+    try:
+        rebuilt = ProviderStatsIndex()
+        bookings = list(repo.bookings.values())
+        for start in range(0, len(bookings), JOB_CHUNK):
+            for booking in bookings[start:start + JOB_CHUNK]:
+                rebuilt.add_booking(booking)
+            await context.progress(min(start + JOB_CHUNK, len(bookings)), len(bookings))
+        for booking in changed.values():
+            rebuilt.update_booking(booking)
+    finally:
+        events.unsubscribe("booking.changed", track)
+    provider_stats = rebuilt
+    return {"providers": len(rebuilt.providers), "bookings": len(bookings), "changed_during_rebuild": len(changed)}
+
+def check_import_job(params: dict) -> None:
+    name = params.get('file')
+    if not isinstance(name, str) or not name or os.path.basename(name) != name or name.startswith("."):
+        raise ValueError(f"'file' must be the name of an NDJSON file in {JOB_IMPORT_DIR}.")
+
+async def import_services_job(context, params: dict) -> dict:
+    """
+    Adds the services of an NDJSON file in JOB_IMPORT_DIR, one chunk of lines at a time.
+
+    Lines are decoded and validated in the job worker pool. Services whose
+    id exists already are skipped, so a retried import carries on where
+    the failed attempt stopped.
+    """
+    path = os.path.join(JOB_IMPORT_DIR, params['file'])
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        raise JobFailed(f"{params['file']} not found in {JOB_IMPORT_DIR}.") from None
+    imported = skipped = rejected = line_number = 0
+    errors = {}
+    with file:
+        total = os.fstat(file.fileno()).st_size
+        while True:
+            lines = file.readlines(1 << 20)
+            if not lines:
+                break
+            records, invalid = await context.run_in_executor(parse_records, lines, 'services')
+            rejected += len(invalid)
+            for position, problems in invalid.items():
+                if len(errors) < 100:
+                    errors[str(line_number + position + 1)] = problems
+            line_number += len(lines)
+            fresh = []
+            for record in records:
+                if repo.get_service(record['id']) is not None:
+                    skipped += 1
+                    continue
+                record = {field: record.get(field) for field in Service.model_fields}
+                repo.add_service(record)
+                search_index.add(record)
+                index_service_location(record)
+                ratings.track(record['id'], record['category'])
+                fresh.append(record)
+            if storage:
+                await asyncio.gather(*(storage.insert(services_table, record) for record in fresh))
+            for record in fresh:
+                events.publish("service.changed", service=record)
+            imported += len(fresh)
+            await context.progress(file.tell(), total)
+    return {"imported": imported, "skipped": skipped, "invalid": rejected, "errors": errors}
+
+async def insert_job(job: dict) -> None:
+    if storage:
+        await storage.insert(jobs_table, JobRunner.to_dict(job))
+
+async def save_job(job: dict) -> None:
+    if storage:
+        record = JobRunner.to_dict(job)
+        await storage.update_job(job['id'], **{field: record[field] for field in (
+            'status', 'progress', 'done', 'total', 'attempts', 'error', 'result', 'run_at', 'started_at',
+            'finished_at')})
+
+async def delete_job(job: dict) -> None:
+    name = (job['result'] or {}).get('file') if job['status'] == SUCCEEDED else None
+    if name:
+        try:
+            os.remove(os.path.join(JOB_OUTPUT_DIR, name))
+        except FileNotFoundError:
+            pass
+    if storage:
+        await storage.delete_job(job['id'])
+
+def new_job_runner() -> JobRunner:
+    runner = JobRunner(JOB_CONCURRENCY, JOB_MAX_ATTEMPTS, JOB_BACKOFF_SECONDS, processes=JOB_PROCESSES,
+                       retention_seconds=JOB_RETENTION_SECONDS)
+    runner.register("report", report_job, check_report_job)
+    runner.register("rebuild_provider_stats", rebuild_stats_job)
+    runner.register("import_services", import_services_job, check_import_job)
+    runner.on_submit = insert_job
+    runner.on_change = save_job
+    runner.on_prune = delete_job
+    return runner
+
+job_runner = new_job_runner()
+
+def own_job(job_id: str, claims: dict) -> dict:
+    job = job_runner.get(job_id)
+    if job is None or job['owner_id'] != claims['sub']:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/jobs/stats")
+async def job_stats(claims: dict = Depends(admin_user)):
+    return job_runner.stats()
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobCreate, response: Response, claims: dict = Depends(current_user)):
+    """Queues heavy work; poll GET /api/jobs/{id} for its progress and result."""
+    if request.kind in ADMIN_JOB_KINDS and not is_admin(claims):
+        raise HTTPException(status_code=403, detail=f"Only admins can run {request.kind} jobs")
+    try:
+        job = await job_runner.submit(request.kind, request.params, claims['sub'])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, claims: dict = Depends(current_user)):
+    return own_job(job_id, claims)
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str, claims: dict = Depends(current_user)):
+    own_job(job_id, claims)
+    return await job_runner.cancel(job_id)
+
+@app.get("/api/jobs/{job_id}/result")
+async def download_job_result(job_id: str, claims: dict = Depends(current_user)):
+    job = own_job(job_id, claims)
+    if job['status'] != SUCCEEDED or not (job['result'] or {}).get('file'):
+        raise HTTPException(status_code=404, detail="This job has no file to download")
+    name = job['result']['file']
+    return FileResponse(os.path.join(JOB_OUTPUT_DIR, name), filename=name)
+
+@app.get("/api/reviews")
+async def get_reviews(target_id: Optional[str] = None, author_id: Optional[str] = None,
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None):
+    # newest first; pass next_cursor as `after` for the following page
+    if (target_id is None) == (author_id is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of target_id or author_id")
+    try:
+        if target_id is not None:
+            items, next_cursor, total = reviews.page_for_target(target_id, limit, after)
+        else:
+            items, next_cursor, total = reviews.page_by_author(author_id, limit, after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = {"items": items, "next_cursor": next_cursor, "total": total}
+    if target_id is not None:
+        page["summary"] = ratings.summary(target_id).to_dict()
+    return FastJSONResponse(page)
+
+@app.get("/api/reviews/{review_id}")
+async def get_review(review_id: str):
+    review = reviews.get(review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review
+
+async def review_rating_changed(review: dict) -> None:
+    if review['target_type'] == 'service':
+        await apply_service_rating(review['target_id'])
+
+def own_review(review_id: str, claims: dict) -> dict:
+    review = reviews.get(review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    if review['author_id'] != claims['sub']:
+        raise HTTPException(status_code=403, detail="Only the author can change a review")
+    return review
+
+@app.post("/api/reviews", status_code=201)
+async def create_review(review: ReviewCreate, claims: dict = Depends(current_user)):
+    # the author is whoever holds the access token
+    target = repo.get_service(review.target_id) if review.target_type == 'service' else repo.get_user(review.target_id)
+    if not target:
+        raise HTTPException(status_code=404, detail="Review target not found")
+    if review.target_id == claims['sub'] or (review.target_type == 'service' and target['provider_id'] == claims['sub']):
+        raise HTTPException(status_code=400, detail="You cannot review yourself")
+    record = ReviewStore.new_record(claims['sub'], review.target_type, review.target_id,
+                                    review.rating, review.title, review.comment)
+    # indexed before any await so a concurrent request already sees it
+    try:
+        record = reviews.add(record)
+    except DuplicateReview as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    ratings.add(record['target_id'], record['rating'])
+    if storage:
+        try:
+            await storage.insert(reviews_table, record)
+        except Exception:
+            reviews.delete(record['id'])
+            ratings.remove(record['target_id'], record['rating'])
+            raise
+    await review_rating_changed(record)
+    await notify([target['provider_id'] if review.target_type == 'service' else review.target_id],
+                 "New review", f"{record['rating']} stars: {record['title']}", "review", record['id'])
+    return record
+
+@app.put("/api/reviews/{review_id}")
+async def update_review(review_id: str, update: ReviewUpdate, claims: dict = Depends(current_user)):
+    review = own_review(review_id, claims)
+    changes = {field: value for field, value in update.dict(exclude_unset=True).items() if value is not None}
+    if not changes:
+        return review
+    old_rating = review['rating']
+    review = reviews.update(review_id, **changes)
+    if review['rating'] != old_rating:
+        ratings.replace(review['target_id'], old_rating, review['rating'])
+    if storage:
+        await storage.update_review(review_id, **changes, updated_at=review['updated_at'])
+    if review['rating'] != old_rating:
+        await review_rating_changed(review)
+    return review
+
+@app.delete("/api/reviews/{review_id}", status_code=204)
+async def delete_review(review_id: str, claims: dict = Depends(current_user)):
+    own_review(review_id, claims)
+    review = reviews.delete(review_id)
+    ratings.remove(review['target_id'], review['rating'])
+    if storage:
+        await storage.delete_review(review_id)
+    await review_rating_changed(review)
+    return Response(status_code=204)
+
+@app.get("/api/notifications")
+async def get_notifications(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None,
+                            unread_only: bool = False, claims: dict = Depends(current_user)):
+    # newest first; pass next_cursor as `after` for the following page
+    try:
+        return FastJSONResponse(getNotifications(inbox_store, claims['sub'], limit, after, unread_only))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.post("/api/notifications/read-all", status_code=204)
+async def read_all_notifications(claims: dict = Depends(current_user)):
+    markAllNotificationsRead(inbox_store, claims['sub'])
+    return Response(status_code=204)
+
+@app.put("/api/notifications/{notification_id}/read", status_code=204)
+async def read_notification(notification_id: str, claims: dict = Depends(current_user)):
+    if not markNotificationRead(inbox_store, claims['sub'], notification_id):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return Response(status_code=204)
+
+@app.delete("/api/notifications/{notification_id}", status_code=204)
+async def delete_notification(notification_id: str, claims: dict = Depends(current_user)):
+    if not deleteNotification(inbox_store, claims['sub'], notification_id):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return Response(status_code=204)
+
+@app.post("/api/providers/{provider_id}/updates", status_code=202)
+async def post_provider_update(provider_id: str, update: ProviderUpdate, claims: dict = Depends(current_user)):
+    # sent to every consumer who has booked this provider; delivery continues after the response
+    if claims['sub'] != provider_id:
+        raise HTTPException(status_code=403, detail="Providers can only post their own updates")
+    recipients = {booking['consumer_id'] for booking in repo.booking_bucket(provider_id, 'business')}
+    await notify(recipients, update.title, update.description, "provider_update", provider_id)
+    return {"recipients": len(recipients)}
+
+@app.get("/api/subscriptions")
+async def get_subscriptions(claims: dict = Depends(current_user)):
+    return FastJSONResponse(billing.for_consumer(claims['sub']))
+
+@app.post("/api/subscriptions", status_code=201)
+async def create_subscription(subscription: SubscriptionCreate, claims: dict = Depends(current_user)):
+    # the subscriber is whoever holds the access token; it pays the service's current price each period
+    service = repo.get_service(subscription.service_id)
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found")
+    if service['provider_id'] == claims['sub']:
+        raise HTTPException(status_code=400, detail="You cannot subscribe to your own service")
+    now = time.time()
+    start = subscription.start.timestamp() if subscription.start else now
+    if start < now - 60:
+        # a past start would bill every missed period at once
+        raise HTTPException(status_code=400, detail="Subscriptions cannot start in the past")
+    record = BillingScheduler.new_record(claims['sub'], service['id'], service['provider_id'], service['price'],
+                                         subscription.interval_days, start)
+    if storage:
+        await storage.insert(subscriptions_table, record)
+    return billing.add(record)
+
+@app.delete("/api/subscriptions/{subscription_id}")
+async def cancel_subscription(subscription_id: str, claims: dict = Depends(current_user)):
+    subscription = billing.get(subscription_id)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    if subscription['consumer_id'] != claims['sub']:
+        raise HTTPException(status_code=403, detail="Only the subscriber can cancel a subscription")
+    if subscription['status'] != ACTIVE:
+        return subscription
+    # takes effect before any await, so a billing run starting meanwhile skips it
+    billing.cancel(subscription_id)
+    if storage:
+        await storage.update_subscription(subscription_id, status=subscription['status'])
+    return subscription
+
+@app.get("/api/billing/stats")
+async def billing_stats():
+    return billing.stats()
+
+@app.get("/api/events")
+async def event_stream(request: Request, token: Optional[str] = None,
+                       credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)):
+    # Server-sent events: "booking", "notification" and "overflow" (messages were dropped; reload).
+    # The stream ends when the access token expires; EventSource then reconnects with a fresh one.
+    claims = stream_claims(token, credentials)
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    connection = hub.connect(claims['sub'])
+
+    async def frames():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                remaining = claims['exp'] - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(connection.get(), min(SSE_KEEPALIVE_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:
+                    break
+                event, data = message
+                yield sse_frame(event, dumps(data).decode("utf-8"))
+        finally:
+            hub.disconnect(connection)
+
+    return StreamingResponse(frames(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/api/ws")
+async def websocket_stream(websocket: WebSocket, token: Optional[str] = None):
+    # Same messages as /api/events, as {"event": ..., "data": ...} text frames; client messages are ignored.
+    claims = stream_claims(token)
+    if claims is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    connection = hub.connect(claims['sub'])
+
+    async def send():
+        while (message := await connection.get()) is not None:
+            event, data = message
+            await websocket.send_text(dumps({"event": event, "data": data}).decode("utf-8"))
+
+    async def receive():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender, receiver = asyncio.create_task(send()), asyncio.create_task(receive())
+    client_left = False
+    try:
+        await asyncio.wait({sender, receiver}, timeout=max(0.0, claims['exp'] - time.time()),
+                           return_when=asyncio.FIRST_COMPLETED)
+        client_left = receiver.done()
+    finally:
+        hub.disconnect(connection)
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+    if not client_left:
+        # token expired (1008), or the server dropped the stream (1001: shutdown or a client too slow to keep up)
+        with suppress(Exception):
+            await websocket.close(code=1008 if time.time() >= claims['exp'] else 1001)
+
+@app.get("/api/journal/stats")
+async def journal_stats():
+    if not isinstance(storage, JournalStorage):
+        raise HTTPException(status_code=404, detail="No journal configured")
+    return storage.stats()
+
+@app.post("/api/journal/snapshot")
+async def write_snapshot(claims: dict = Depends(admin_user)):
+    # snapshots are also written automatically every SNAPSHOT_EVERY operations or SNAPSHOT_INTERVAL_SECONDS
+    if not isinstance(storage, JournalStorage):
+        raise HTTPException(status_code=404, detail="No journal configured")
+    return await storage.snapshot(snapshot_records())
+
+@app.get("/api/push/stats")
+async def push_stats():
+    return hub.stats()
+
+@app.get("/api/providers/{provider_id}/availability")
+async def get_availability(provider_id: str, from_date: date = Query(..., alias="from"),
+                           to_date: date = Query(..., alias="to")):
+    if not repo.get_user(provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
+    if to_date < from_date or (to_date - from_date).days > 92:
+        raise HTTPException(status_code=400, detail="Range must be forward and at most 92 days")
+    return {"provider_id": provider_id, "slots": availability.free_slots(provider_id, from_date, to_date)}
+
+@app.get("/api/providers/{provider_id}/stats")
+async def get_provider_stats(provider_id: str):
+    if not repo.get_user(provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
+    return {"provider_id": provider_id, **provider_stats.get(provider_id)}
+
+@app.post("/api/stats/providers/rebuild")
+async def rebuild_provider_stats(claims: dict = Depends(admin_user)):
+    # recounts every booking; the index is swapped in whole so readers never see a partial rebuild
+    global provider_stats
+    provider_stats = ProviderStatsIndex.from_bookings(repo.bookings.values())
+    return {"providers": len(provider_stats.providers), "bookings": len(repo.bookings)}
+
+@app.get("/api/stats/providers/check")
+async def check_provider_stats(claims: dict = Depends(admin_user)):
+    # compares the incrementally maintained stats with a fresh recount
+    differing = provider_stats.check(repo.bookings.values())
+    return {"consistent": not differing, "differing_providers": differing}
+
+@app.put("/api/providers/{provider_id}/hours")
+async def set_working_hours(provider_id: str, working_hours: WorkingHours, claims: dict = Depends(current_user)):
+    if claims['sub'] != provider_id:
+        raise HTTPException(status_code=403, detail="Providers can only set their own hours")
+    if not repo.get_user(provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
+    hours = {}
+    for weekday, (opening, closing) in working_hours.hours.items():
+        try:
+            opening_minute, closing_minute = parse_time(opening), parse_time(closing)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Hours must be H:MM")
+        if not 0 <= weekday <= 6 or opening_minute >= closing_minute:
+            raise HTTPException(status_code=400, detail="Invalid working hours")
+        hours[weekday] = (opening_minute, closing_minute)
+    if storage:
+        await storage.put_working_hours(provider_id, encode_working_hours(hours))
+    availability.set_working_hours(provider_id, hours)
+    return working_hours
 
 if __name__ == "__main__":
     uvicorn.run("Main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,197 @@
+import hashlib
+import heapq
+import os
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from jose import jwk, jwt
+from jose.exceptions import JWTError
+
+ACCESS_TOKEN_SECONDS = 15 * 60
+REFRESH_TOKEN_SECONDS = 7 * 24 * 60 * 60
+CLAIMS_CACHE_SIZE = 10_000
+
+
+class InvalidToken(Exception):
+    """Raised when a token is malformed, badly signed, expired, revoked or of the wrong type."""
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti) until their tokens expire.
+
+    Every check first consults a Bloom filter; only a possible hit falls
+    through to the exact set, so the common case of a valid token costs a
+    few bit tests. Entries are pruned once their token would have expired
+    anyway. Their bits stay set, which only costs a few extra exact-set
+    lookups, until the pruned ids outnumber the live ones (and at least
+    `rebuild_after`); only then is the filter rebuilt from the remaining
+    ids, so pruning costs O(1) amortised per revocation.
+
+    Attributes:
+        bits (int): size of the Bloom filter in bits.
+        hashes (int): bit positions set per id.
+        rebuild_after (int): pruned ids still in the filter before it may be rebuilt.
+    """
+
+    def __init__(self, bits: int = 1 << 20, hashes: int = 4, rebuild_after: int = 1024):
+        self.bits = bits
+        self.hashes = hashes
+        self.rebuild_after = rebuild_after
+        self._stale = 0  # pruned ids whose bits are still set
+        self._filter = bytearray(bits // 8)
+        self._revoked: Dict[str, int] = {}  # jti -> exp
+        self._expiries: List[Tuple[int, str]] = []
+
+    def _positions(self, jti: str):
+        digest = hashlib.blake2b(jti.encode("utf-8"), digest_size=8 * self.hashes).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[8 * i:8 * i + 8], "little") % self.bits
+
+    def _set_bits(self, jti: str) -> None:
+        for position in self._positions(jti):
+            self._filter[position >> 3] |= 1 << (position & 7)
+
+    def revoke(self, jti: str, exp: int) -> bool:
+        """Adds an id until `exp`; returns False if it was already revoked or has expired."""
+        self.prune()
+        if jti in self._revoked or exp <= time.time():
+            return False
+        self._revoked[jti] = exp
+        heapq.heappush(self._expiries, (exp, jti))
+        self._set_bits(jti)
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        for position in self._positions(jti):
+            if not self._filter[position >> 3] & (1 << (position & 7)):
+                return False
+        return jti in self._revoked
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Forgets ids whose tokens have expired; rebuilds the filter once stale bits dominate it."""
+        now = time.time() if now is None else now
+        while self._expiries and self._expiries[0][0] <= now:
+            _, jti = heapq.heappop(self._expiries)
+            del self._revoked[jti]
+            self._stale += 1
+        if self._stale >= self.rebuild_after and self._stale > len(self._revoked):
+            self._filter = bytearray(self.bits // 8)
+            for jti in self._revoked:
+                self._set_bits(jti)
+            self._stale = 0
+
+    def items(self) -> List[Tuple[str, int]]:
+        """(jti, exp) of every live revocation, e.g. to write them to a snapshot."""
+        return list(self._revoked.items())
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+class TokenService:
+    """
+    Issues and checks signed JWT access and refresh tokens.
+
+    The signing and verification keys are built once. Decoded claims are
+    kept in an LRU cache keyed by the SHA-256 of the token, so repeat
+    requests with the same token skip signature verification; expiry and
+    revocation are still checked on every call.
+
+    Attributes:
+        algorithm (str): JWS algorithm, e.g. "HS256" or "RS256".
+        access_seconds (int): lifetime of access tokens.
+        refresh_seconds (int): lifetime of refresh tokens.
+        revoked (RevocationList): ids of tokens revoked by logout or refresh; the
+            API stores each one and adds them back at startup, so they survive restarts.
+    """
+
+    def __init__(self, signing_key: str, verifying_key: Optional[str] = None, algorithm: str = "HS256",
+                 access_seconds: int = ACCESS_TOKEN_SECONDS, refresh_seconds: int = REFRESH_TOKEN_SECONDS,
+                 cache_size: int = CLAIMS_CACHE_SIZE):
+        self.algorithm = algorithm
+        self.access_seconds = access_seconds
+        self.refresh_seconds = refresh_seconds
+        self.revoked = RevocationList()
+        self._signing_key = jwk.construct(signing_key, algorithm)
+        self._verifying_key = jwk.construct(verifying_key, algorithm) if verifying_key else self._signing_key
+        self._cache: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._cache_size = cache_size
+
+    @classmethod
+    def from_env(cls) -> "TokenService":
+        """
+        Reads the keys once at startup.
+
+        JWT_PRIVATE_KEY_PATH and JWT_PUBLIC_KEY_PATH select RS256 with PEM
+        files; otherwise JWT_SECRET is used with HS256. Without either a
+        random secret is generated, so tokens do not survive a restart.
+        """
+        access_seconds = int(os.getenv("ACCESS_TOKEN_MINUTES", ACCESS_TOKEN_SECONDS // 60)) * 60
+        refresh_seconds = int(os.getenv("REFRESH_TOKEN_DAYS", REFRESH_TOKEN_SECONDS // 86400)) * 86400
+        private_key_path = os.getenv("JWT_PRIVATE_KEY_PATH")
+        if private_key_path:
+            with open(private_key_path) as f:
+                private_key = f.read()
+            with open(os.environ["JWT_PUBLIC_KEY_PATH"]) as f:
+                public_key = f.read()
+            return cls(private_key, public_key, "RS256", access_seconds, refresh_seconds)
+        secret = os.getenv("JWT_SECRET")
+        if not secret:
+            print("Warning: JWT_SECRET not set. Using a random secret; tokens end with the process.")
+            secret = secrets.token_urlsafe(32)
+        return cls(secret, None, "HS256", access_seconds, refresh_seconds)
+
+    def _issue(self, user: dict, token_type: str, lifetime: int, now: int) -> str:
+        claims = {
+            "sub": user['id'],
+            "user_type": user['type'],
+            "type": token_type,
+            "iat": now,
+            "exp": now + lifetime,
+            "jti": uuid.uuid4().hex,
+        }
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm)
+
+    def issue(self, user: dict) -> Tuple[str, str]:
+        """Returns a new (access token, refresh token) pair for a user record."""
+        now = int(time.time())
+        return (self._issue(user, "access", self.access_seconds, now),
+                self._issue(user, "refresh", self.refresh_seconds, now))
+
+    def decode(self, token: str, token_type: str = "access") -> dict:
+        """
+        Returns the claims of a valid token; the dict is shared with the cache and must not be modified.
+
+        Raises:
+            InvalidToken: if the token cannot be used.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        claims = self._cache.get(key)
+        if claims is None:
+            try:
+                claims = jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+            except JWTError as e:
+                raise InvalidToken(f"Invalid token: {e}")
+            if "exp" not in claims or "jti" not in claims:
+                raise InvalidToken("Token is missing exp or jti.")
+            self._cache[key] = claims
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        if claims.get("type") != token_type:
+            raise InvalidToken(f"Wrong token type, expected {token_type}.")
+        if claims["exp"] <= time.time():
+            self._cache.pop(key, None)
+            raise InvalidToken("Token has expired.")
+        if self.revoked.is_revoked(claims["jti"]):
+            raise InvalidToken("Token has been revoked.")
+        return claims
+
+    def revoke(self, claims: dict) -> bool:
+        """Revokes a token until it expires; returns False if it already was, so callers persist it once."""
+        return self.revoked.revoke(claims["jti"], claims["exp"])
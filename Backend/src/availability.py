@@ -0,0 +1,207 @@
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SLOT_MINUTES = 60
+MINUTES_PER_DAY = 24 * 60
+BLOCKING_STATUSES = frozenset({'pending', 'confirmed', 'completed'})
+
+# weekday (0 = Monday) -> (opening minute, closing minute); every day 9:00-18:00
+DEFAULT_WORKING_HOURS: Dict[int, Tuple[int, int]] = {day: (9 * 60, 18 * 60) for day in range(7)}
+
+
+def parse_slot(day: str, time: str) -> int:
+    """
+    Converts a booking date ("YYYY-MM-DD") and time ("H:MM") to absolute minutes.
+
+    Raises:
+        ValueError: if the date or time is malformed.
+    """
+    moment = datetime.strptime(f"{day} {time}", "%Y-%m-%d %H:%M")
+    return moment.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def parse_time(time: str) -> int:
+    """
+    Converts a "H:MM" time to minutes after midnight.
+
+    Raises:
+        ValueError: if the time is malformed.
+    """
+    moment = datetime.strptime(time, "%H:%M")
+    return moment.hour * 60 + moment.minute
+
+
+def encode_working_hours(hours: Dict[int, Tuple[int, int]]) -> str:
+    """Working hours as stored: JSON of weekday -> [opening minute, closing minute]."""
+    return json.dumps({str(day): [opening, closing] for day, (opening, closing) in sorted(hours.items())})
+
+
+def decode_working_hours(text: str) -> Dict[int, Tuple[int, int]]:
+    return {int(day): (opening, closing) for day, (opening, closing) in json.loads(text).items()}
+
+
+def format_time(minute_of_day: int) -> str:
+    """Formats minutes after midnight the way bookings store times, e.g. "9:00"."""
+    return f"{minute_of_day // 60}:{minute_of_day % 60:02d}"
+
+
+class ProviderCalendar:
+    """
+    Busy intervals and working hours of one provider.
+
+    Intervals are kept as parallel arrays sorted by start minute. Because
+    every interval is SLOT_MINUTES long, the only intervals that can
+    overlap a new slot are its immediate neighbours, so a conflict check
+    is two binary searches.
+
+    Attributes:
+        starts (list): sorted interval start minutes.
+        ends (list): interval end minutes, parallel to starts.
+        booking_ids (list): booking ids, parallel to starts.
+        working_hours (dict): weekday -> (opening minute, closing minute).
+    """
+
+    __slots__ = ("starts", "ends", "booking_ids", "working_hours")
+
+    def __init__(self, working_hours: Optional[Dict[int, Tuple[int, int]]] = None):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.booking_ids: List[str] = []
+        self.working_hours = dict(working_hours or DEFAULT_WORKING_HOURS)
+
+    def find_conflict(self, start: int, end: int) -> Optional[str]:
+        """Returns the id of a booking overlapping [start, end), if any."""
+        position = bisect_left(self.starts, start)
+        if position > 0 and self.ends[position - 1] > start:
+            return self.booking_ids[position - 1]
+        if position < len(self.starts) and self.starts[position] < end:
+            return self.booking_ids[position]
+        return None
+
+    def add(self, booking_id: str, start: int, end: int) -> None:
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.booking_ids.insert(position, booking_id)
+
+    def remove(self, booking_id: str, start: int) -> None:
+        position = bisect_left(self.starts, start)
+        while position < len(self.starts) and self.starts[position] == start:
+            if self.booking_ids[position] == booking_id:
+                del self.starts[position], self.ends[position], self.booking_ids[position]
+                return
+            position += 1
+
+    def is_open(self, start: int, end: int) -> bool:
+        """Whether [start, end) lies inside the working hours of its day."""
+        day, minute = divmod(start, MINUTES_PER_DAY)
+        hours = self.working_hours.get(date.fromordinal(day).weekday())
+        return hours is not None and hours[0] <= minute and minute + (end - start) <= hours[1]
+
+    def free_slots(self, day: date, slot_minutes: int = SLOT_MINUTES) -> List[int]:
+        """
+        Returns the free slot start times (minutes after midnight) of one day.
+
+        Only the busy intervals of that day are visited, found by binary search.
+        """
+        hours = self.working_hours.get(day.weekday())
+        if hours is None:
+            return []
+        base = day.toordinal() * MINUTES_PER_DAY
+        opening, closing = base + hours[0], base + hours[1]
+        lo = bisect_left(self.starts, opening - slot_minutes + 1)
+        hi = bisect_left(self.starts, closing)
+        free = []
+        cursor = opening
+        for position in range(lo, hi + 1):
+            busy_start = self.starts[position] if position < hi else closing
+            while cursor + slot_minutes <= busy_start:
+                free.append(cursor - base)
+                cursor += slot_minutes
+            if position < hi:
+                cursor = max(cursor, self.ends[position])
+        return free
+
+
+class AvailabilityIndex:
+    """
+    Per-provider calendars of bookings that hold a slot.
+
+    Attributes:
+        calendars (dict): provider id -> ProviderCalendar.
+    """
+
+    def __init__(self):
+        self.calendars: Dict[str, ProviderCalendar] = {}
+        self._slots: Dict[str, Tuple[str, int]] = {}  # booking id -> (provider id, start)
+
+    @classmethod
+    def from_bookings(cls, bookings) -> "AvailabilityIndex":
+        """Builds the index from existing bookings; malformed or overlapping seed data is kept as is."""
+        index = cls()
+        for booking in bookings:
+            index.add_booking(booking)
+        return index
+
+    def add_booking(self, booking: dict) -> None:
+        """Indexes an existing booking record if its status holds a slot and its date parses."""
+        if booking['status'] not in BLOCKING_STATUSES:
+            return
+        try:
+            start = parse_slot(booking['date'], booking['time'])
+        except ValueError:
+            return
+        self.add(booking['id'], booking['provider_id'], start)
+
+    def calendar(self, provider_id: str) -> ProviderCalendar:
+        calendar = self.calendars.get(provider_id)
+        if calendar is None:
+            calendar = self.calendars[provider_id] = ProviderCalendar()
+        return calendar
+
+    def find_conflict(self, provider_id: str, start: int) -> Optional[str]:
+        calendar = self.calendars.get(provider_id)
+        return calendar.find_conflict(start, start + SLOT_MINUTES) if calendar else None
+
+    def is_open(self, provider_id: str, start: int) -> bool:
+        calendar = self.calendars.get(provider_id) or ProviderCalendar()
+        return calendar.is_open(start, start + SLOT_MINUTES)
+
+    def add(self, booking_id: str, provider_id: str, start: int) -> None:
+        self.calendar(provider_id).add(booking_id, start, start + SLOT_MINUTES)
+        self._slots[booking_id] = (provider_id, start)
+
+    def remove(self, booking_id: str) -> None:
+        slot = self._slots.pop(booking_id, None)
+        if slot is not None:
+            provider_id, start = slot
+            self.calendars[provider_id].remove(booking_id, start)
+
+    def holds(self, booking_id: str) -> bool:
+        return booking_id in self._slots
+
+    def set_working_hours(self, provider_id: str, hours: Dict[int, Tuple[int, int]]) -> None:
+        self.calendar(provider_id).working_hours = dict(hours)
+
+    def custom_working_hours(self) -> Iterator[Tuple[str, Dict[int, Tuple[int, int]]]]:
+        """(provider id, hours) of every provider whose hours differ from the default."""
+        for provider_id, calendar in list(self.calendars.items()):
+            if calendar.working_hours != DEFAULT_WORKING_HOURS:
+                yield provider_id, calendar.working_hours
+
+    def free_slots(self, provider_id: str, start_day: date, end_day: date) -> Dict[str, List[str]]:
+        """
+        Returns free slot times per day between two dates (inclusive).
+
+        Returns:
+            dict: "YYYY-MM-DD" -> list of "H:MM" start times.
+        """
+        calendar = self.calendars.get(provider_id) or ProviderCalendar()
+        result = {}
+        day = start_day
+        while day <= end_day:
+            result[day.isoformat()] = [format_time(minute) for minute in calendar.free_slots(day)]
+            day += timedelta(days=1)
+        return result
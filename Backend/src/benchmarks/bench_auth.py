@@ -0,0 +1,52 @@
+"""
+Per-request overhead of the auth dependency.
+
+Times Main.current_user on the same bearer tokens with the claims cache
+disabled (every call verifies the signature) and enabled, with and
+without a populated revocation list, and prints p50/p99 per call.
+
+Run from Backend/src:
+    python -m benchmarks.bench_auth [calls] [distinct tokens]
+"""
+import os
+import random
+import sys
+import time
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+import Main  # noqa: E402
+from auth import TokenService  # noqa: E402
+
+
+def measure(name: str, credentials: list, calls: int) -> None:
+    samples = []
+    for _ in range(calls):
+        pick = random.choice(credentials)
+        started = time.perf_counter()
+        Main.current_user(pick)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    p50, p99 = samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<28} p50={p50 * 1e6:>8.2f}us p99={p99 * 1e6:>8.2f}us")
+
+
+def main(calls: int, distinct: int) -> None:
+    secret = os.environ["JWT_SECRET"]
+    users = [{'id': str(uuid.uuid4()), 'type': 'consumer'} for _ in range(distinct)]
+    for name, cache_size, revoked in (("no cache", 0, 0), ("cached", 10_000, 0),
+                                      ("cached, 100k revoked ids", 10_000, 100_000)):
+        Main.tokens = TokenService(secret, cache_size=cache_size)
+        for _ in range(revoked):
+            Main.tokens.revoked.revoke(uuid.uuid4().hex, int(time.time()) + 3600)
+        credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=Main.tokens.issue(user)[0])
+                       for user in users]
+        measure(name, credentials, calls)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1_000)
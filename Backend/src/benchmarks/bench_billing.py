@@ -0,0 +1,88 @@
+"""
+Recurring billing over a simulated clock.
+
+Creates many subscriptions with staggered start times and intervals,
+cancels a share of them, then advances a virtual clock hour by hour and
+lets the scheduler renew whatever is due, with a charge stub that yields
+to the event loop like a network call would. Reports renewals per
+second, the cost of a cancellation, and checks that no period was
+charged twice.
+
+Run from Backend/src:
+    python -m benchmarks.bench_billing [subscriptions] [days]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from billing import DAY_SECONDS, BillingScheduler
+
+HOUR = 60 * 60
+INTERVALS = (7, 14, 30)
+CANCEL_SHARE = 0.1
+FAIL_SHARE = 0.01
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+async def main(count: int, days: int) -> None:
+    rng = random.Random(7)
+    charged = set()
+    duplicates = 0
+
+    async def charge(subscription: dict, key: str) -> bool:
+        nonlocal duplicates
+        await asyncio.sleep(0)
+        if rng.random() < FAIL_SHARE:
+            return False
+        if key in charged:
+            duplicates += 1
+        charged.add(key)
+        return True
+
+    scheduler = BillingScheduler(charge)
+    before = rss_mb()
+    started = time.perf_counter()
+    ids = []
+    for i in range(count):
+        record = BillingScheduler.new_record(f"consumer-{i}", f"service-{i % 1000}", f"provider-{i % 100}", 19.99,
+                                             rng.choice(INTERVALS), rng.uniform(0, 30 * DAY_SECONDS))
+        ids.append(scheduler.add(record)['id'])
+    elapsed = time.perf_counter() - started
+    memory = (rss_mb() - before) * 2**20
+    print(f"{count} subscriptions scheduled in {elapsed:.2f}s, RSS {memory / count:.0f} B/subscription")
+
+    cancelled = rng.sample(ids, int(count * CANCEL_SHARE))
+    started = time.perf_counter()
+    for subscription_id in cancelled:
+        scheduler.cancel(subscription_id)
+    elapsed = time.perf_counter() - started
+    print(f"{len(cancelled)} cancellations in {elapsed * 1000:.0f} ms ({elapsed / len(cancelled) * 1e6:.2f} us each)")
+
+    attempted = 0
+    slowest = 0.0
+    started = time.perf_counter()
+    for hour in range(1, days * 24 + 1):
+        tick = time.perf_counter()
+        attempted += await scheduler.run_due(hour * HOUR)
+        slowest = max(slowest, time.perf_counter() - tick)
+    elapsed = time.perf_counter() - started
+    print(f"{days} simulated days: {attempted} renewals attempted in {elapsed:.2f}s "
+          f"({attempted / elapsed:.0f}/s), slowest hour {slowest * 1000:.0f} ms")
+    print(f"  {scheduler.stats()}")
+    print(f"  periods charged twice: {duplicates}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 90))
@@ -0,0 +1,53 @@
+"""
+Geo index query latency with points clustered around the test-data cities.
+
+Run from Backend/src:
+    python -m benchmarks.bench_geo [size]
+"""
+import random
+import sys
+import time
+
+from geo import CITY_COORDINATES, GeoIndex
+
+CATEGORIES = ['cleaning', 'plumbing', 'electrical', 'carpentry', 'painting',
+              'gardening', 'moving', 'cooking', 'tutoring', 'fitness']
+
+
+def percentiles(samples):
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(size: int) -> None:
+    rng = random.Random(42)
+    cities = list(CITY_COORDINATES.values())
+    index = GeoIndex()
+    start = time.perf_counter()
+    for i in range(size):
+        latitude, longitude = rng.choice(cities)
+        index.add(str(i), latitude + rng.gauss(0, 0.15), longitude + rng.gauss(0, 0.15), rng.choice(CATEGORIES))
+    print(f"indexed {size} points in {time.perf_counter() - start:.1f}s")
+
+    queries = []
+    for _ in range(200):
+        latitude, longitude = rng.choice(cities)
+        queries.append((latitude + rng.gauss(0, 0.1), longitude + rng.gauss(0, 0.1)))
+    cases = {
+        'radius 2km': lambda lat, lng: index.within(lat, lng, 2, limit=50),
+        'radius 2km+category': lambda lat, lng: index.within(lat, lng, 2, category='plumbing', limit=50),
+        'k=10 nearest': lambda lat, lng: index.nearest(lat, lng, 10, 50),
+        'k=10 nearest+category': lambda lat, lng: index.nearest(lat, lng, 10, 50, category='plumbing'),
+    }
+    for name, query in cases.items():
+        samples = []
+        for latitude, longitude in queries:
+            start = time.perf_counter()
+            query(latitude, longitude)
+            samples.append((time.perf_counter() - start) * 1000)
+        p50, p99 = percentiles(samples)
+        print(f"{name:<22} p50={p50:8.3f}ms p99={p99:8.3f}ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
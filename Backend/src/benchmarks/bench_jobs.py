@@ -0,0 +1,101 @@
+"""
+Background job runner overhead and event-loop responsiveness.
+
+Exports a booking report of generated rows twice while a probe task
+measures how late the event loop wakes it: once inline, as a request
+handler would, and once as a job reporting progress per chunk. Then
+times many small jobs through the runner to show its per-job overhead.
+
+Run from Backend/src:
+    python -m benchmarks.bench_jobs [report rows] [small jobs]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_reports import bookings
+from jobs import JobRunner, SUCCEEDED
+from reports import booking_rows, export_report
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+def write_report(path: str, count: int):
+    with open(path, "wb") as file:
+        for chunk in export_report('bookings', booking_rows(bookings(count)), 'csv'):
+            file.write(chunk)
+            yield
+
+
+async def measure(name: str, work) -> None:
+    lags: list = []
+    stop = asyncio.Event()
+    probing = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probing
+    lags.sort()
+    print(f"{name:>7}: {elapsed:6.2f}s   event loop lag p99 {lags[int(len(lags) * 0.99)] * 1000:8.2f} ms   "
+          f"max {lags[-1] * 1000:8.2f} ms")
+
+
+async def main(rows: int, small: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="jobs-"), "bookings.csv")
+    print(f"{rows}-row booking report")
+
+    async def inline():
+        for _ in write_report(path, rows):
+            pass
+
+    async def as_job():
+        runner = JobRunner(concurrency=1)
+
+        async def report(context, params):
+            for done, _ in enumerate(write_report(path, rows)):
+                await context.progress(done, None)
+
+        runner.register("report", report)
+        runner.start()
+        job = await runner.submit("report", {})
+        while job['status'] != SUCCEEDED:
+            await asyncio.sleep(0.05)
+        await runner.stop()
+
+    await measure("inline", inline)
+    await measure("job", as_job)
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+    runner = JobRunner(concurrency=8)
+
+    async def noop(context, params):
+        await context.progress(1, 1)
+        return params['n']
+
+    runner.register("noop", noop)
+    runner.start()
+    started = time.perf_counter()
+    jobs = [await runner.submit("noop", {'n': i}) for i in range(small)]
+    while any(job['status'] != SUCCEEDED for job in jobs[-100:]):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - started
+    await runner.stop()
+    print(f"{small} small jobs in {elapsed:.2f}s = {small / elapsed:.0f} jobs/s "
+          f"({elapsed / small * 1e6:.0f} us each, submit to finish)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 100_000))
@@ -0,0 +1,144 @@
+"""
+Write-ahead log latency and recovery time.
+
+For each fsync policy, runs concurrent writers appending booking updates
+and reports throughput, per-write latency (p50/p99) and how many fsyncs
+group commit saved. Then writes a journal of one million operations
+over a snapshot and times a full recovery (reading the snapshot and
+folding the WAL tail in), without the in-memory indexes. Finally takes
+snapshots while writers are between logging a change and applying it,
+as the routes are, and fails loudly if recovery loses any of them.
+
+Run from Backend/src:
+    python -m benchmarks.bench_journal [writes per policy] [writers] [recovery operations]
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+from database import bookings_table
+from journal import ALWAYS, GROUP, NONE, JournalStorage
+
+SNAPSHOT_BOOKINGS = 100_000
+
+
+IDS = [str(uuid.UUID(int=i)) for i in range(1000)]
+
+
+def booking(i: int) -> dict:
+    return {'id': f"booking-{i}", 'service_id': IDS[i % 1000], 'consumer_id': IDS[i % 997],
+            'provider_id': IDS[i % 500], 'date': "2031-01-01", 'time': "10:00", 'status': 'pending',
+            'price': 80.0, 'version': 1}
+
+
+async def write_latency(policy: str, writes: int, writers: int) -> None:
+    directory = tempfile.mkdtemp(prefix="journal-")
+    journal = JournalStorage(directory, policy)
+    await journal.create_all()
+    latencies = []
+
+    async def writer(w: int) -> None:
+        for i in range(w, writes, writers):
+            started = time.perf_counter()
+            await journal.update_booking(f"booking-{i % 1000}", status='confirmed', version=2)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - started
+    syncs = journal.wal.syncs
+    await journal.dispose()
+    shutil.rmtree(directory)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{policy:>6}: {writes / elapsed:>9.0f} writes/s   p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms   "
+          f"{syncs} {'writes' if policy == NONE else 'fsyncs'} ({writes / syncs:.1f} writes each)")
+
+
+async def recovery(operations: int) -> None:
+    directory = tempfile.mkdtemp(prefix="journal-")
+    journal = JournalStorage(directory, NONE)
+    await journal.create_all()
+    started = time.perf_counter()
+    async for _ in journal.seed_stream(('bookings', booking(i)) for i in range(SNAPSHOT_BOOKINGS)):
+        pass
+    # a mix of new bookings and status changes to existing ones, as the booking routes produce
+    batch = []
+    for i in range(operations):
+        if i % 4 == 0:
+            batch.append(journal.insert(bookings_table, booking(SNAPSHOT_BOOKINGS + i)))
+        else:
+            batch.append(journal.update_booking(f"booking-{i % SNAPSHOT_BOOKINGS}", status='confirmed', version=2))
+        if len(batch) == 10_000:
+            await asyncio.gather(*batch)
+            batch = []
+    await asyncio.gather(*batch)
+    await journal.dispose()
+    print(f"wrote a {SNAPSHOT_BOOKINGS}-record snapshot and {operations} logged operations "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    journal = JournalStorage(directory, NONE)
+    await journal.create_all()
+    started = time.perf_counter()
+    records = 0
+    for _ in journal.stream_records():
+        records += 1
+    elapsed = time.perf_counter() - started
+    await journal.dispose()
+    shutil.rmtree(directory)
+    print(f"recovered {records} records in {elapsed:.2f}s = {elapsed / operations * 1_000_000:.2f}s per million operations")
+
+
+async def snapshot_race(rounds: int = 20, writers: int = 200) -> None:
+    directory = tempfile.mkdtemp(prefix="journal-")
+    journal = JournalStorage(directory, GROUP)
+    await journal.create_all()
+    state = {}
+    async for kind, record in journal.seed_stream(('bookings', booking(i)) for i in range(1000)):
+        state[record['id']] = record
+
+    async def writer(w: int) -> None:
+        for i in range(1000 + w, 1000 + rounds * writers, writers):
+            record = booking(i)
+            await journal.insert(bookings_table, record)
+            # like a route: the record reaches memory only after the log has it
+            state[record['id']] = record
+
+    async def snapshots() -> None:
+        # until the writers are done, so the last snapshot races with their last writes
+        while not all(task.done() for task in tasks):
+            await journal.snapshot(('bookings', dict(record)) for record in list(state.values()))
+            await asyncio.sleep(0)
+
+    tasks = [asyncio.create_task(writer(w)) for w in range(writers)]
+    await asyncio.gather(snapshots(), *tasks)
+    taken = journal.snapshots
+    await journal.dispose()
+
+    journal = JournalStorage(directory, GROUP)
+    await journal.create_all()
+    recovered = {record['id']: record for _, record in journal.stream_records()}
+    await journal.dispose()
+    shutil.rmtree(directory)
+    lost = [booking_id for booking_id, record in state.items() if recovered.get(booking_id) != record]
+    if lost:
+        raise SystemExit(f"snapshots during writes: {len(lost)} acknowledged writes lost, e.g. {lost[0]}")
+    print(f"{taken} snapshots during {rounds * writers} writes: recovery lost none")
+
+
+async def main(writes: int, writers: int, operations: int) -> None:
+    print(f"{writes} writes from {writers} concurrent writers")
+    for policy in (NONE, GROUP, ALWAYS):
+        await write_latency(policy, writes, writers)
+    await recovery(operations)
+    await snapshot_race()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+                     int(sys.argv[3]) if len(sys.argv) > 3 else 1_000_000))
@@ -0,0 +1,94 @@
+"""
+Payment ledger throughput.
+
+Appends booking payments (three postings each, with a platform fee)
+straight to the ledger, then through Payments and the local gateway,
+and reports appends per second and memory per entry. Compares a cached
+balance read with replaying the ledger, times a batched settlement that
+pays every provider once for all their bookings, and finishes with a
+full reconciliation.
+
+Run from Backend/src:
+    python -m benchmarks.bench_ledger [entries] [providers]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from ledger import PLATFORM_FEES, Ledger, consumer_account, provider_account
+from payments import LocalGateway, Payments
+
+FEE_BPS = 1000
+
+
+def fill(ledger: Ledger, count: int, providers: int) -> None:
+    for i in range(count):
+        amount = 1000 + i % 9000
+        fee = amount * FEE_BPS // 10_000
+        ledger.post(f"booking:{i}", "booking_payment",
+                    [(consumer_account(f"c{i % (count // 10 or 1)}"), -amount),
+                     (provider_account(f"p{i % providers}"), amount - fee), (PLATFORM_FEES, fee)], f"b{i}")
+
+
+def append_direct(count: int, providers: int) -> Ledger:
+    sample = min(count, 100_000)
+    tracemalloc.start()
+    sampled = Ledger()
+    fill(sampled, sample, providers)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sampled
+    ledger = Ledger()
+    started = time.perf_counter()
+    fill(ledger, count, providers)
+    elapsed = time.perf_counter() - started
+    print(f"ledger.post:        {count / elapsed:>10.0f} entries/s   {memory / sample:.0f} B/entry")
+    started = time.perf_counter()
+    for i in range(0, count, 10):
+        ledger.post(f"booking:{i}", "booking_payment", [], f"b{i}")
+    elapsed = time.perf_counter() - started
+    print(f"duplicate key:      {count // 10 / elapsed:>10.0f} posts/s (returns the first entry)")
+    return ledger
+
+
+def balance_reads(ledger: Ledger) -> None:
+    account = provider_account("p0")
+    started = time.perf_counter()
+    for _ in range(100_000):
+        ledger.balance(account)
+    cached = (time.perf_counter() - started) / 100_000
+    started = time.perf_counter()
+    replayed = sum(amount for entry in ledger.entries for a, amount in entry.postings if a == account)
+    replay = time.perf_counter() - started
+    assert replayed == ledger.balance(account)
+    print(f"balance read:       {cached * 1e6:>10.2f} us cached   vs {replay * 1000:.0f} ms replaying")
+
+
+async def through_payments(count: int, providers: int) -> None:
+    payments = Payments(Ledger(), LocalGateway(), fee_bps=FEE_BPS)
+    started = time.perf_counter()
+    for i in range(count):
+        await payments.charge(f"booking:{i}", "booking_payment", f"b{i}", f"c{i}", f"p{i % providers}", 2500)
+    elapsed = time.perf_counter() - started
+    print(f"Payments.charge:    {count / elapsed:>10.0f} payments/s (gateway call + ledger append)")
+
+    started = time.perf_counter()
+    settled = await payments.settle()
+    elapsed = time.perf_counter() - started
+    print(f"settle:             {settled['paid']} transfers for {count} bookings in {elapsed * 1000:.0f} ms, "
+          f"{settled['amount']:.2f} paid out")
+    started = time.perf_counter()
+    report = payments.ledger.reconcile(payments.gateway.operations.keys())
+    elapsed = time.perf_counter() - started
+    print(f"reconcile:          {len(payments.ledger)} entries in {elapsed * 1000:.0f} ms, ok={report['ok']}")
+
+
+def main(count: int, providers: int) -> None:
+    ledger = append_direct(count, providers)
+    balance_reads(ledger)
+    asyncio.run(through_payments(count, providers))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,91 @@
+"""
+Login throughput under concurrent load, and what it does to the event loop.
+
+Runs the same number of concurrent logins twice: once verifying with
+bcrypt directly on the event loop (what login would do without the
+password service) and once through the real Main.login route backed by
+the worker pool. For each it prints logins/second and the event-loop lag
+seen by a 10 ms ticker, which is how long any other request would stall.
+
+Run from Backend/src:
+    python -m benchmarks.bench_login [logins] [concurrency] [rounds]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROUNDS = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+os.environ["BCRYPT_ROUNDS"] = str(ROUNDS)
+# start from an empty repository
+os.environ["DATA_PATH"] = os.path.join(tempfile.mkdtemp(), "none.json")
+os.environ.pop("DATABASE_URL", None)
+
+import Main  # noqa: E402  (settings above must be read first)
+from passwords import hash_password, hash_rounds, verify_password  # noqa: E402
+
+PASSWORD = "Password123!"
+TICK = 0.01
+
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def inline_login(email: str) -> None:
+    user = Main.repo.get_user_by_email(email)
+    if not verify_password(PASSWORD, user['password_hash']):
+        raise ValueError("login failed")
+
+
+async def run(name: str, login, emails: list, concurrency: int) -> None:
+    queue = list(emails)
+
+    async def client():
+        while queue:
+            await login(queue.pop())
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else elapsed
+    worst = lags[-1] if lags else elapsed
+    print(f"{name:<8} {len(emails) / elapsed:>8.1f} logins/s   loop lag p99={p99 * 1000:>8.1f}ms"
+          f" max={worst * 1000:>8.1f}ms   ({len(lags)} ticks)")
+
+
+async def main(logins: int, concurrency: int) -> None:
+    async with Main.lifespan(Main.app):
+        password_hash = await Main.passwords.hash(PASSWORD)
+        emails = []
+        for i in range(logins):
+            email = f"user{i}@bench.test"
+            Main.repo.add_user({'id': f"bench-{i}", 'email': email, 'name': "Bench", 'type': 'consumer',
+                                'password_hash': password_hash})
+            emails.append(email)
+
+        # a hash with an outdated cost factor is replaced on the next login
+        Main.repo.add_user({'id': "bench-old", 'email': "old@bench.test", 'name': "Bench", 'type': 'consumer',
+                            'password_hash': hash_password(PASSWORD, ROUNDS - 1)})
+        await Main.login("old@bench.test", PASSWORD)
+        assert hash_rounds(Main.repo.get_user("bench-old")['password_hash']) == ROUNDS
+
+        print(f"{logins} logins, {concurrency} concurrent clients, bcrypt cost {ROUNDS}, "
+              f"{Main.passwords.workers} workers")
+        await run("inline", inline_login, emails, concurrency)
+        await run("pool", lambda email: Main.login(email, PASSWORD), emails, concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 50))
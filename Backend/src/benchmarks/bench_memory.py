@@ -0,0 +1,88 @@
+"""
+Resident memory of service and booking records: dicts vs compact records.
+
+Each variant is measured in a fresh subprocess that builds the records
+one at a time (so only the retained form counts), and the growth of peak
+RSS is reported per million records:
+
+    dicts      plain dicts in a list, as Main.py held them before
+    compact    ServiceRecord / BookingRecord objects from a RecordStore
+    repository compact records inside a Repository, with its indexes
+
+Run from Backend/src:
+    python -m benchmarks.bench_memory [count]
+"""
+import json
+import subprocess
+import sys
+import uuid
+
+from loader import peak_rss_mb
+
+CATEGORIES = ['Cleaning', 'Plumbing', 'Electrical', 'Carpentry', 'Painting',
+              'Gardening', 'Moving', 'Cooking', 'Tutoring', 'Fitness']
+STATUSES = ['pending', 'confirmed', 'completed', 'cancelled']
+USERS = 10_000
+
+
+def user_id(i: int) -> str:
+    return str(uuid.UUID(int=i + 1))
+
+
+def make_service(i: int) -> dict:
+    category = CATEGORIES[i % len(CATEGORIES)]
+    return {'id': str(uuid.uuid4()), 'name': f"{category} Service {i}",
+            'description': f"Professional {category.lower()} service with {i % 20 + 1} years of experience.",
+            'price': 20.0 + i % 18000 / 100, 'provider_id': user_id(i % USERS), 'category': category,
+            'image_url': f"https://picsum.photos/400/300?random={i}", 'rating': (i % 41 + 10) / 10}
+
+
+def make_booking(i: int) -> dict:
+    return {'id': str(uuid.uuid4()), 'service_id': str(uuid.UUID(int=USERS + i % 100_000)),
+            'consumer_id': user_id(i % USERS), 'provider_id': user_id((i * 7) % USERS),
+            'date': f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", 'time': f"{9 + i % 9}:00",
+            'status': STATUSES[i % 4], 'price': 20.0 + i % 18000 / 100}
+
+
+def measure(variant: str, kind: str, count: int) -> float:
+    """Builds `count` records of one kind in this process and returns the RSS growth in MB."""
+    from records import RecordStore
+    from repository import Repository
+
+    generate = make_service if kind == 'services' else make_booking
+
+    def make(i: int) -> dict:
+        # round trip through JSON so every record has its own strings, as after loading
+        return json.loads(json.dumps(generate(i)))
+
+    before = peak_rss_mb()
+    if variant == 'dicts':
+        kept = [make(i) for i in range(count)]
+    elif variant == 'compact':
+        store = RecordStore()
+        convert = store.service if kind == 'services' else store.booking
+        kept = [convert(make(i)) for i in range(count)]
+    else:
+        kept = Repository()
+        add = kept.add_service if kind == 'services' else kept.add_booking
+        for i in range(count):
+            add(make(i))
+    return peak_rss_mb() - before
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{'records':<10}{'variant':<12}{'MB':>10}{'MB/1M':>10}{'B/record':>10}")
+    for kind in ('services', 'bookings'):
+        for variant in ('dicts', 'compact', 'repository'):
+            output = subprocess.run(
+                [sys.executable, '-c', f"from benchmarks.bench_memory import measure; "
+                                       f"print(measure({variant!r}, {kind!r}, {count}))"],
+                check=True, capture_output=True, text=True).stdout
+            mb = float(output.strip())
+            print(f"{kind:<10}{variant:<12}{mb:>10.1f}{mb * 1_000_000 / count:>10.1f}"
+                  f"{mb * 1024 * 1024 / count:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Notification fan-out throughput.
+
+Publishes one notification to many recipients through the pipeline and
+reports deliveries per second, the event-loop lag seen by a 10 ms ticker
+meanwhile (how long other requests would stall), and the memory the
+inboxes take, for a few batch sizes.
+
+Run from Backend/src:
+    python -m benchmarks.bench_notifications [recipients] [batch sizes...]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from notifications import InboxStore, NotificationPipeline
+
+TICK = 0.01
+
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def fan_out(recipients: list, batch_size: int, trace: bool) -> None:
+    store = InboxStore()
+    pipeline = NotificationPipeline(store, batch_size=batch_size)
+    pipeline.start()
+    # the first round creates the inboxes; the measured round delivers into existing ones
+    await pipeline.publish(recipients, NotificationPipeline.payload("Warm up", "Creates the inboxes"))
+    await pipeline.flush()
+
+    if trace:
+        tracemalloc.start()
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    started = time.perf_counter()
+    await pipeline.publish(recipients, NotificationPipeline.payload("Update", "Provider posted an update"))
+    await pipeline.flush()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    await pipeline.stop()
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else elapsed
+    line = (f"batch {batch_size:>6}   {len(recipients) / elapsed:>10.0f} deliveries/s   {elapsed * 1000:>8.1f} ms"
+            f"   loop lag p99={p99 * 1000:>6.1f}ms max={lags[-1] * 1000 if lags else elapsed * 1000:>6.1f}ms")
+    if trace:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"   {current / len(recipients):>5.0f} B/delivery"
+    print(line)
+
+
+def main(count: int, batch_sizes: list) -> None:
+    recipients = [f"account-{i}" for i in range(count)]
+    print(f"fan-out of one notification to {count} recipients")
+    for batch_size in batch_sizes:
+        asyncio.run(fan_out(recipients, batch_size, trace=False))
+    asyncio.run(fan_out(recipients, batch_sizes[-1], trace=True))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+         [int(size) for size in sys.argv[2:]] or [100, 1000, 10_000, 100_000])
@@ -0,0 +1,113 @@
+"""
+Memory per idle push connection, and broadcast latency across them.
+
+Opens many concurrent /api/events (SSE) or /api/ws (WebSocket) streams
+against the real app, driving the ASGI interface directly so the numbers
+cover the application side of each connection (route task, generator,
+queue) without kernel socket buffers. With all of them idle it reports
+memory per connection, then pushes one message to every user and
+reports how long until every stream has sent it.
+
+Run from Backend/src:
+    python -m benchmarks.bench_push [connections] [sse|ws]
+"""
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# start from an empty repository
+os.environ["DATA_PATH"] = os.path.join(tempfile.mkdtemp(), "none.json")
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("JWT_SECRET", "bench")
+
+import Main  # noqa: E402  (settings above must be read first)
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+class Client:
+    """One simulated client; counts the messages the app sends it."""
+
+    def __init__(self, mode: str, token: str):
+        self.mode = mode
+        self.token = token
+        self.messages = 0
+        self.received = asyncio.Event()
+        self.leave = asyncio.Event()
+        self._started = False
+
+    def scope(self) -> dict:
+        path = "/api/events" if self.mode == "sse" else "/api/ws"
+        scope = {"type": "http" if self.mode == "sse" else "websocket", "asgi": {"version": "3.0"},
+                 "http_version": "1.1", "scheme": "http" if self.mode == "sse" else "ws", "path": path,
+                 "raw_path": path.encode(), "query_string": f"token={self.token}".encode(), "headers": [],
+                 "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80), "root_path": ""}
+        if self.mode == "sse":
+            scope["method"] = "GET"
+        return scope
+
+    async def receive(self) -> dict:
+        if not self._started:
+            self._started = True
+            return {"type": "http.request", "body": b"", "more_body": False} if self.mode == "sse" \
+                else {"type": "websocket.connect"}
+        await self.leave.wait()
+        return {"type": "http.disconnect"} if self.mode == "sse" else {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message: dict) -> None:
+        body = message.get("body") or message.get("text")
+        if body and (b"event: " in body if isinstance(body, bytes) else True):
+            self.messages += 1
+            self.received.set()
+
+    async def run(self) -> None:
+        await Main.app(self.scope(), self.receive, self.send)
+
+
+async def main(count: int, mode: str) -> None:
+    async with Main.lifespan(Main.app):
+        users = [f"bench-user-{i}" for i in range(count)]
+        clients = [Client(mode, Main.tokens.issue({'id': user, 'type': 'consumer'})[0]) for user in users]
+        gc.collect()
+        tracemalloc.start()
+        before_traced = tracemalloc.get_traced_memory()[0]
+        before_rss = rss_mb()
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client.run()) for client in clients]
+        while Main.hub.stats()["connections"] < count:
+            await asyncio.sleep(0.05)
+        opened = time.perf_counter() - started
+        await asyncio.sleep(0.5)
+        gc.collect()
+        traced = tracemalloc.get_traced_memory()[0] - before_traced
+        rss = rss_mb() - before_rss
+        tracemalloc.stop()
+        print(f"{count} idle {mode} connections opened in {opened:.2f}s")
+        print(f"  traced {traced / count:>8.0f} B/connection   RSS +{rss:.1f} MB ({rss * 2**20 / count:.0f} B/connection)")
+
+        started = time.perf_counter()
+        Main.hub.publish_many(users, "notification", {"title": "Broadcast", "description": "to everyone"})
+        await asyncio.gather(*(client.received.wait() for client in clients))
+        print(f"  broadcast to all connections in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        for client in clients:
+            client.leave.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print(f"  after disconnect: {Main.hub.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000, sys.argv[2] if len(sys.argv) > 2 else "sse"))
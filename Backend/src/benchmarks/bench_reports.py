@@ -0,0 +1,80 @@
+"""
+Report export and import throughput and memory.
+
+Streams a booking report of generated rows through each format's writer
+into a temporary file, then reads the file back with the streaming
+reader and checks every row round-tripped. Reports rows per second each
+way, file size and how far RSS grew while a format ran; the rows are
+generated on the fly, so RSS stays flat when nothing is buffered.
+
+Run from Backend/src:
+    python -m benchmarks.bench_reports [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from reports import BOOKING_COLUMNS, FORMATS, booking_rows, export_report, import_report
+
+IDS = [str(uuid.UUID(int=i)) for i in range(10_000)]
+STATUSES = ['pending', 'confirmed', 'completed', 'cancelled']
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def bookings(count: int):
+    for i in range(count):
+        yield {'id': str(uuid.UUID(int=i + 1 << 64)), 'service_id': IDS[i % 10_000], 'consumer_id': IDS[i % 9_973],
+               'provider_id': IDS[i % 5_000], 'date': f"2031-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+               'time': f"{9 + i % 8}:00", 'status': STATUSES[i % 4], 'price': 50 + i % 200 + 0.25}
+
+
+def run(report_format: str, count: int, directory: str) -> None:
+    path = os.path.join(directory, "bookings." + FORMATS[report_format].extension)
+    before = rss_mb()
+    started = time.perf_counter()
+    with open(path, "wb") as file:
+        for chunk in export_report('bookings', booking_rows(bookings(count)), report_format):
+            file.write(chunk)
+    written = time.perf_counter() - started
+
+    names = [column.name for column in BOOKING_COLUMNS]
+    expected = booking_rows(bookings(count))
+    started = time.perf_counter()
+    read = 0
+    with open(path, "rb") as file:
+        for row in import_report(file, 'bookings', report_format):
+            if tuple(row[name] for name in names) != next(expected):
+                raise SystemExit(f"{report_format}: row {read} did not round-trip")
+            read += 1
+    imported = time.perf_counter() - started
+    size = os.path.getsize(path)
+    os.remove(path)
+    print(f"{report_format:>9}: export {count / written:>9.0f} rows/s   import {count / imported:>9.0f} rows/s   "
+          f"{size / 1e6:>7.1f} MB ({size / count:.1f} B/row)   RSS +{rss_mb() - before:.1f} MB   "
+          f"{'round-trip ok' if read == count else f'{read} rows read'}")
+
+
+def main(count: int) -> None:
+    print(f"{count} booking rows")
+    directory = tempfile.mkdtemp(prefix="reports-")
+    try:
+        for report_format in FORMATS:
+            run(report_format, count, directory)
+    finally:
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
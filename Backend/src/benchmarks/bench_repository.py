@@ -0,0 +1,91 @@
+"""
+Route lookup latency before and after the indexed repository.
+
+Compares the original list-scan lookups from Main.py against the
+Repository indexes for login, get_service, create_booking, update_booking
+and get_bookings, and prints p50/p99 latency per route.
+
+Run from Backend/src:
+    python -m benchmarks.bench_repository [sizes...]
+"""
+import random
+import sys
+import time
+import uuid
+
+from repository import Repository
+
+CATEGORIES = ['Cleaning', 'Plumbing', 'Electrical', 'Carpentry', 'Painting',
+              'Gardening', 'Moving', 'Cooking', 'Tutoring', 'Fitness']
+
+
+def make_data(size: int):
+    users = [{'id': str(uuid.UUID(int=i)), 'email': f"user{i}@example.com", 'name': f"User {i}",
+              'type': 'business' if i % 2 else 'consumer'} for i in range(size)]
+    providers = [u['id'] for u in users if u['type'] == 'business']
+    consumers = [u['id'] for u in users if u['type'] == 'consumer']
+    services = [{'id': str(uuid.UUID(int=size + i)), 'name': f"Service {i}", 'description': "",
+                 'price': 50.0, 'provider_id': providers[i % len(providers)],
+                 'category': CATEGORIES[i % len(CATEGORIES)]} for i in range(size)]
+    bookings = [{'id': str(uuid.UUID(int=2 * size + i)), 'service_id': services[i]['id'],
+                 'consumer_id': consumers[i % len(consumers)], 'provider_id': services[i]['provider_id'],
+                 'date': "2025-01-01", 'time': "9:00", 'status': 'pending', 'price': 50.0}
+                for i in range(size)]
+    return users, services, bookings
+
+
+def list_routes(users, services, bookings):
+    """The lookups exactly as the routes performed them before the repository."""
+    return {
+        'login': lambda u, s, b: next((x for x in users if x['email'] == u['email']), None),
+        'get_service': lambda u, s, b: next((x for x in services if x['id'] == s['id']), None),
+        'create_booking': lambda u, s, b: (
+            next((x for x in services if x['id'] == b['service_id']), None),
+            next((x for x in users if x['id'] == b['consumer_id']), None),
+            next((x for x in users if x['id'] == b['provider_id']), None)),
+        'update_booking': lambda u, s, b: next((x for x in bookings if x['id'] == b['id']), None),
+        'get_bookings': lambda u, s, b: [x for x in bookings if x['consumer_id'] == b['consumer_id']],
+    }
+
+
+def repo_routes(repo: Repository):
+    return {
+        'login': lambda u, s, b: repo.get_user_by_email(u['email']),
+        'get_service': lambda u, s, b: repo.get_service(s['id']),
+        'create_booking': lambda u, s, b: (
+            repo.get_service(b['service_id']), repo.get_user(b['consumer_id']), repo.get_user(b['provider_id'])),
+        'update_booking': lambda u, s, b: repo.update_booking(b['id'], status='confirmed'),
+        'get_bookings': lambda u, s, b: repo.bookings_for_user(b['consumer_id'], 'consumer'),
+    }
+
+
+def percentiles(samples):
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def run(size: int) -> None:
+    users, services, bookings = make_data(size)
+    repo = Repository.from_data(users, services, bookings)
+    # full scans are slow at large sizes, so sample fewer requests there
+    queries = max(20, min(2000, 20_000_000 // (size * 5)))
+    picks = [(random.choice(users), random.choice(services), random.choice(bookings)) for _ in range(queries)]
+    before, after = list_routes(users, services, bookings), repo_routes(repo)
+    for route in before:
+        results = []
+        for impl in (before[route], after[route]):
+            samples = []
+            for u, s, b in picks:
+                start = time.perf_counter()
+                impl(u, s, b)
+                samples.append((time.perf_counter() - start) * 1e6)
+            results.append(percentiles(samples))
+        (p50b, p99b), (p50a, p99a) = results
+        print(f"{size:>9} {route:<15} before p50={p50b:>11.1f}us p99={p99b:>11.1f}us"
+              f"  after p50={p50a:>7.2f}us p99={p99a:>7.2f}us")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 1_000_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,70 @@
+"""
+Search index build time and query latency on a generated catalogue.
+
+Services are generated like generate_test_data.py does (category names,
+random name suffixes, templated descriptions) plus a few extra words from
+a small vocabulary. Prints build time and p50/p99 per query type.
+
+Run from Backend/src:
+    python -m benchmarks.bench_search [size]
+"""
+import random
+import string
+import sys
+import time
+
+from search import SearchIndex
+
+CATEGORIES = ['Cleaning', 'Plumbing', 'Electrical', 'Carpentry', 'Painting',
+              'Gardening', 'Moving', 'Cooking', 'Tutoring', 'Fitness']
+EXTRA_WORDS = ['eco', 'friendly', 'fast', 'reliable', 'licensed', 'insured', 'weekend', 'emergency',
+               'commercial', 'residential', 'deep', 'repair', 'install', 'senior', 'garden', 'kitchen',
+               'bathroom', 'office', 'apartment', 'lessons', 'personal', 'trainer', 'chef', 'meal']
+
+
+def make_services(size: int):
+    rng = random.Random(42)
+    alphabet = string.ascii_letters + string.digits
+    for i in range(size):
+        category = rng.choice(CATEGORIES)
+        extras = ' '.join(rng.sample(EXTRA_WORDS, 3))
+        yield {
+            'id': str(i),
+            'name': f"{category} Service {''.join(rng.choices(alphabet, k=4))}",
+            'description': f"Professional {rng.choice(CATEGORIES).lower()} service, {extras}, "
+                           f"with {rng.randint(1, 20)} years of experience.",
+            'category': category,
+            'rating': round(rng.uniform(1.0, 5.0), 1),
+        }
+
+
+def measure(index: SearchIndex, queries, **kwargs):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, **kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(size: int) -> None:
+    start = time.perf_counter()
+    index = SearchIndex.from_services(make_services(size))
+    print(f"indexed {size} services in {time.perf_counter() - start:.1f}s")
+    rng = random.Random(7)
+    cases = {
+        'rare word': [f"{rng.choice(EXTRA_WORDS)} {rng.choice(string.ascii_lowercase)}{rng.choice(string.digits)}"
+                      for _ in range(50)],
+        'two words': [f"{rng.choice(EXTRA_WORDS)} {rng.choice(EXTRA_WORDS)}" for _ in range(20)],
+        'type-ahead': [rng.choice(EXTRA_WORDS)[:3] for _ in range(20)],
+        'in category': [rng.choice(EXTRA_WORDS) for _ in range(20)],
+    }
+    for name, queries in cases.items():
+        options = {'category': 'Plumbing'} if name == 'in category' else {}
+        p50, p99 = measure(index, queries, **options)
+        print(f"{name:<12} p50={p50:9.2f}ms p99={p99:9.2f}ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,68 @@
+"""
+Cost of encoding a large GET /api/bookings response.
+
+Builds one provider with many bookings and encodes the full list three
+ways: FastAPI's default path (jsonable_encoder, then JSONResponse), the
+FastJSONResponse fast path, and the chunked stream. Prints the time and
+the peak memory traced while producing each body.
+
+Run from Backend/src:
+    python -m benchmarks.bench_serialize [bookings]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import responses
+from repository import Repository
+from responses import FastJSONResponse, stream_json
+
+
+def make_repository(size: int) -> Repository:
+    repo = Repository()
+    provider = str(uuid.UUID(int=1))
+    for i in range(size):
+        repo.add_booking({'id': str(uuid.UUID(int=100 + i)), 'service_id': str(uuid.UUID(int=2)),
+                          'consumer_id': str(uuid.UUID(int=3 + i % 1000)), 'provider_id': provider,
+                          'date': "2025-01-01", 'time': f"{9 + i % 8}:00", 'status': 'confirmed',
+                          'price': 50.0 + i % 100, 'version': 1})
+    return repo
+
+
+async def drain(response) -> int:
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def measure(name: str, build) -> None:
+    # timed without tracing, which slows allocation-heavy code down severalfold
+    started = time.perf_counter()
+    size = build()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<22} {elapsed * 1000:>9.1f} ms   peak {peak / 2**20:>8.1f} MB   {size / 2**20:>7.1f} MB body")
+
+
+def main(size: int) -> None:
+    repo = make_repository(size)
+    provider = str(uuid.UUID(int=1))
+    bookings = lambda: repo.bookings_for_user(provider, "business")  # noqa: E731
+    print(f"{size} bookings, orjson {'installed' if responses.orjson else 'not installed'}")
+    measure("jsonable_encoder", lambda: len(JSONResponse(jsonable_encoder([b.to_dict() for b in bookings()])).body))
+    measure("FastJSONResponse", lambda: len(FastJSONResponse([b.to_dict() for b in bookings()]).body))
+    measure("stream (JSON array)", lambda: asyncio.run(drain(stream_json(bookings(), lambda b: b.to_dict()))))
+    measure("stream (NDJSON)", lambda: asyncio.run(drain(stream_json(bookings(), lambda b: b.to_dict(), ndjson=True))))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,81 @@
+"""
+Concurrency load test for booking creation and status updates.
+
+Fires thousands of concurrent create_booking calls at one provider over a
+small set of slots, plus concurrent conflicting status updates, against
+the real route handlers backed by a temporary SQLite database (so every
+request awaits I/O and requests genuinely interleave). Fails loudly if
+any slot ends up double-booked or a stale update is accepted.
+
+Run from Backend/src:
+    python -m benchmarks.load_bookings [requests]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "load_bookings.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+import Main  # noqa: E402  (DATABASE_URL must be set first)
+from availability import BLOCKING_STATUSES  # noqa: E402
+
+
+async def attempt(coroutine) -> int:
+    try:
+        await coroutine
+        return 200
+    except HTTPException as e:
+        return e.status_code
+
+
+async def main(total: int) -> None:
+    async with Main.lifespan(Main.app):
+        provider_id, consumer_id = "load-provider", "load-consumer"
+        Main.repo.add_user({'id': provider_id, 'email': "provider@load.test", 'name': "Load", 'type': 'business'})
+        Main.repo.add_user({'id': consumer_id, 'email': "consumer@load.test", 'name': "Load", 'type': 'consumer'})
+        service = Main.repo.add_service({'id': "load-service", 'name': "Load", 'description': "Load test",
+                                         'price': 10.0, 'provider_id': provider_id, 'category': "Cleaning"})
+        times = [f"{hour}:00" for hour in range(9, 18)]
+        days = [f"2031-01-{day:02d}" for day in range(1, 6)]
+
+        requests = [Main.create_booking(Main.Booking(
+            id=f"load-{i}", service_id=service['id'], consumer_id=consumer_id, provider_id=provider_id,
+            date=days[i % len(days)], time=times[(i // len(days)) % len(times)],
+            status='pending', price=service['price']), claims={'sub': consumer_id, 'user_type': 'consumer'})
+            for i in range(total)]
+        start = time.perf_counter()
+        results = Counter(await asyncio.gather(*(attempt(r) for r in requests)))
+        elapsed = time.perf_counter() - start
+        print(f"{total} concurrent creates in {elapsed:.2f}s: {dict(results)}")
+
+        held = Counter((b['date'], b['time']) for b in Main.repo.booking_bucket(provider_id, 'business')
+                       if b['status'] in BLOCKING_STATUSES and b['id'].startswith("load-"))
+        doubles = {slot: n for slot, n in held.items() if n > 1}
+        assert not doubles, f"double bookings: {doubles}"
+        assert results[200] == len(days) * len(times), results
+        print(f"slots taken: {len(held)}, double bookings: 0")
+
+        # every winner races a confirm against a cancel on the same version
+        winners = [b for b in Main.repo.booking_bucket(provider_id, 'business') if b['id'].startswith("load-")]
+        updates = []
+        claims = {'sub': provider_id, 'user_type': 'business'}
+        for booking in winners:
+            for status in ('confirmed', 'cancelled'):
+                updates.append(Main.update_booking(booking['id'], status, Main.Response(), version=booking['version'],
+                                                   claims=claims))
+        outcomes = Counter(await asyncio.gather(*(attempt(u) for u in updates)))
+        assert outcomes[200] == len(winners), outcomes
+        stored = {row['id']: row async for row in Main.storage.stream(Main.bookings_table, provider_id=provider_id)}
+        for booking in winners:
+            assert booking['version'] == 2 and stored[booking['id']]['status'] == booking['status']
+        print(f"{len(updates)} racing updates: {dict(outcomes)}, lost updates: 0")
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import uuid
+from typing import Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+DAY_SECONDS = 24 * 60 * 60
+BATCH_SIZE = 500
+CONCURRENCY = 20
+MAX_ATTEMPTS = 3
+RETRY_SECONDS = 6 * 60 * 60
+
+ACTIVE = 'active'
+PAST_DUE = 'past_due'
+CANCELLED = 'cancelled'
+
+# charge(subscription, idempotency key) -> whether the payment went through
+Charge = Callable[[dict, str], Awaitable[bool]]
+
+
+def idempotency_key(subscription: Mapping, period: int) -> str:
+    """Identifies one billing period of one subscription; charging the same key twice must be a no-op."""
+    return f"sub:{subscription['id']}:{period}"
+
+
+class BillingScheduler:
+    """
+    Recurring billing driven by a min-heap of next due times.
+
+    Only subscriptions that are due are visited, so a run costs
+    O(k log n) for k renewals rather than a scan of every subscription.
+    Each heap entry carries a sequence number and only the latest one per
+    subscription is live, so cancelling or rescheduling just forgets it;
+    the stale entry is skipped when it surfaces, and the heap is rebuilt
+    once stale entries outnumber live ones.
+
+    Each renewal charges period `periods_billed + 1` under an idempotency
+    key derived from it, and the period only advances after a successful
+    charge, so re-running a batch (after a crash or an overlapping run)
+    cannot bill a period twice. Failed charges are retried after
+    `retry_seconds`; after `max_attempts` the subscription is past due.
+
+    Attributes:
+        subscriptions (dict): subscription id -> record.
+        batch_size (int): renewals taken from the heap per batch.
+        concurrency (int): charges in flight at once.
+        renewed (int): successful charges since start.
+        failed (int): failed charge attempts since start.
+        on_change (Callable): awaited with a subscription after a renewal changed it, e.g. to persist it.
+    """
+
+    def __init__(self, charge: Charge, batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY,
+                 max_attempts: int = MAX_ATTEMPTS, retry_seconds: float = RETRY_SECONDS):
+        self.charge = charge
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.subscriptions: Dict[str, dict] = {}
+        self.renewed = 0
+        self.failed = 0
+        self.on_change: Optional[Callable[[dict], Awaitable[None]]] = None
+        self._by_consumer: Dict[str, List[str]] = {}
+        self._heap: List[Tuple[float, int, str]] = []  # (due, seq, subscription id)
+        self._live: Dict[str, int] = {}  # subscription id -> seq of its live heap entry
+        self._seq = 0
+        self._in_flight: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def new_record(consumer_id: str, service_id: str, provider_id: str, amount: float, interval_days: int,
+                   start: float) -> dict:
+        return {
+            'id': str(uuid.uuid4()),
+            'consumer_id': consumer_id,
+            'service_id': service_id,
+            'provider_id': provider_id,
+            'amount': amount,
+            'interval_days': interval_days,
+            'status': ACTIVE,
+            'next_due': start,
+            'periods_billed': 0,
+            'attempts': 0,
+        }
+
+    def _schedule(self, subscription_id: str, due: float) -> None:
+        self._seq += 1
+        self._live[subscription_id] = self._seq
+        heapq.heappush(self._heap, (due, self._seq, subscription_id))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._live.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+    def add(self, subscription: Mapping) -> dict:
+        """Adds a new or loaded subscription; active ones are scheduled at their next_due time."""
+        record = dict(subscription)
+        if record['id'] not in self.subscriptions:
+            self._by_consumer.setdefault(record['consumer_id'], []).append(record['id'])
+        self.subscriptions[record['id']] = record
+        if record['status'] == ACTIVE:
+            self._schedule(record['id'], record['next_due'])
+        return record
+
+    def get(self, subscription_id: str) -> Optional[dict]:
+        return self.subscriptions.get(subscription_id)
+
+    def for_consumer(self, consumer_id: str) -> List[dict]:
+        return [self.subscriptions[subscription_id] for subscription_id in self._by_consumer.get(consumer_id, ())]
+
+    def cancel(self, subscription_id: str) -> Optional[dict]:
+        """Stops future renewals without touching the heap; a charge already in flight still completes."""
+        record = self.subscriptions.get(subscription_id)
+        if record is None:
+            return None
+        record['status'] = CANCELLED
+        self._live.pop(subscription_id, None)
+        return record
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest live renewal is due, if any."""
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _take_due(self, now: float) -> List[dict]:
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+            due, seq, subscription_id = heapq.heappop(self._heap)
+            if self._live.get(subscription_id) != seq:
+                continue
+            del self._live[subscription_id]
+            batch.append(self.subscriptions[subscription_id])
+        return batch
+
+    async def _renew(self, subscription: dict, now: float) -> None:
+        period = subscription['periods_billed'] + 1
+        key = idempotency_key(subscription, period)
+        if key in self._in_flight:
+            return
+        self._in_flight.add(key)
+        try:
+            try:
+                paid = await self.charge(subscription, key)
+            except Exception as e:
+                print(f"Warning: charging subscription {subscription['id']} failed: {e}")
+                paid = False
+        finally:
+            self._in_flight.discard(key)
+        if subscription['periods_billed'] >= period:
+            return
+        active = subscription['status'] == ACTIVE
+        if paid:
+            # recorded even if cancelled meanwhile: the money was taken
+            self.renewed += 1
+            subscription['periods_billed'] = period
+            subscription['attempts'] = 0
+            subscription['next_due'] += subscription['interval_days'] * DAY_SECONDS
+            if active:
+                self._schedule(subscription['id'], subscription['next_due'])
+        else:
+            self.failed += 1
+            subscription['attempts'] += 1
+            if active and subscription['attempts'] >= self.max_attempts:
+                subscription['status'] = PAST_DUE
+            elif active:
+                self._schedule(subscription['id'], now + self.retry_seconds)
+        if self.on_change is not None:
+            await self.on_change(subscription)
+
+    async def run_due(self, now: float) -> int:
+        """
+        Renews everything due at `now`, one bounded batch at a time.
+
+        Returns:
+            int: number of renewals attempted.
+        """
+        attempted = 0
+        while True:
+            batch = self._take_due(now)
+            if not batch:
+                return attempted
+            # `concurrency` workers drain the batch, rather than one task per renewal
+            pending = iter(batch)
+            await asyncio.gather(*(self._drain(pending, now) for _ in range(min(self.concurrency, len(batch)))))
+            attempted += len(batch)
+
+    async def _drain(self, pending: Iterator[dict], now: float) -> None:
+        for subscription in pending:
+            await self._renew(subscription, now)
+
+    def start(self, interval: float, clock: Callable[[], float]) -> None:
+        """Runs due renewals every `interval` seconds in a background task."""
+        self._task = asyncio.create_task(self._run(interval, clock))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float, clock: Callable[[], float]) -> None:
+        while True:
+            try:
+                await self.run_due(clock())
+            except Exception as e:
+                print(f"Error: billing run failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        statuses: Dict[str, int] = {}
+        for record in self.subscriptions.values():
+            statuses[record['status']] = statuses.get(record['status'], 0) + 1
+        return {"subscriptions": statuses, "scheduled": len(self._live), "renewed": self.renewed,
+                "failed": self.failed, "next_due": self.next_due()}
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, FrozenSet, Optional
+from weakref import WeakValueDictionary
+
+INITIAL_STATUSES: FrozenSet[str] = frozenset({'pending', 'confirmed'})
+# statuses only the booking's provider may set; either party may cancel
+PROVIDER_STATUSES: FrozenSet[str] = frozenset({'confirmed', 'completed'})
+
+# status -> statuses it may move to; completed and cancelled are final
+TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    'pending': frozenset({'confirmed', 'cancelled'}),
+    'confirmed': frozenset({'completed', 'cancelled'}),
+    'completed': frozenset(),
+    'cancelled': frozenset(),
+}
+
+
+class InvalidTransition(ValueError):
+    """Raised when a booking status change is not allowed by TRANSITIONS."""
+
+
+def check_transition(current: str, new: str) -> None:
+    """
+    Validates a booking status change.
+
+    Raises:
+        InvalidTransition: if the status is unknown or the move is not allowed.
+    """
+    if new not in TRANSITIONS:
+        raise InvalidTransition(f"Unknown booking status '{new}'.")
+    if new not in TRANSITIONS.get(current, frozenset()):
+        raise InvalidTransition(f"Booking cannot move from '{current}' to '{new}'.")
+
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_etag(value: Optional[str]) -> Optional[int]:
+    """Reads the version out of an If-Match header value such as '"3"' or 'W/"3"'."""
+    if not value:
+        return None
+    try:
+        return int(value.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        return None
+
+
+class KeyedLocks:
+    """
+    Lazily created asyncio locks, one per key (e.g. per provider).
+
+    Locks are held in a WeakValueDictionary, so a key's lock disappears
+    once no coroutine is holding or waiting for it.
+    """
+
+    def __init__(self):
+        self._locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+
+    def get(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        lock = self.get(key)
+        async with lock:
+            yield
@@ -0,0 +1,178 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import Response
+
+from responses import dumps
+
+
+class CachedResponse:
+    """
+    A JSON response body encoded once, with its ETag.
+
+    Attributes:
+        body (bytes): encoded JSON.
+        etag (str): quoted hash of the body.
+        expires (float): monotonic time after which the entry is stale.
+    """
+
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body: bytes, expires: float):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.expires = expires
+
+
+class CacheBackend:
+    """
+    Storage interface for ResponseCache.
+
+    Keys are plain strings and entries carry their own bodies, so a shared
+    backend (e.g. Redis, with a set per tag) can implement the same methods.
+    """
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Removes every entry carrying any of the tags and returns how many were removed."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU of cached responses with a tag -> keys index.
+
+    Attributes:
+        max_entries (int): entries kept before the least recently used is dropped.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Iterable[str]] = {}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self._delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._delete(key)
+        self._entries[key] = entry
+        self._key_tags[key] = tuple(tags)
+        for tag in self._key_tags[key]:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._delete(next(iter(self._entries)))
+
+    def _delete(self, key: str) -> bool:
+        if self._entries.pop(key, None) is None:
+            return False
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                removed += self._delete(key)
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Caches encoded JSON responses by normalised request key.
+
+    Entries are tagged with what they depend on (e.g. "category:cleaning")
+    and evicted by tag when a change event arrives, so a write only drops
+    the keys it can affect. Entries also expire after `ttl` seconds.
+
+    Attributes:
+        backend (CacheBackend): where entries are kept.
+        ttl (float): seconds an entry may be served.
+        hits (int): lookups answered from the cache.
+        misses (int): lookups that had to build the response.
+        evictions (int): entries removed by invalidation events.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = 30.0):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(route: str, **params) -> str:
+        """Builds a key from the route and its parameters, ignoring unset ones and their order."""
+        parts = [f"{name}={value}" for name, value in sorted(params.items()) if value is not None]
+        return f"{route}?{'&'.join(parts)}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, payload, tags: Iterable[str]) -> CachedResponse:
+        entry = CachedResponse(dumps(payload), time.monotonic() + self.ttl)
+        self.backend.set(key, entry, tags)
+        return entry
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self.evictions += self.backend.invalidate_tags(tags)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def respond(entry: CachedResponse, if_none_match: Optional[str] = None) -> Response:
+        """Returns the cached body, or an empty 304 if the client already holds this version."""
+        headers = {"ETag": entry.etag}
+        if if_none_match and (if_none_match.strip() == "*" or entry.etag in
+                              (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,9 +1,68 @@
 '''
-might be optional
+sends, lists and deletes account notifications through the notification pipeline (notifications.py)
+notification ids are the sequence numbers of the recipient's inbox, as strings
+'''
+from typing import Iterable, Optional
+
+from models.Notification import Notification
+from notifications import InboxStore, NotificationPipeline
+
+
+def parseNotificationId(notificationId: str) -> Optional[int]:
+    try:
+        return int(notificationId)
+    except (TypeError, ValueError):
+        return None
+
+
+async def sendNotification(pipeline: NotificationPipeline, accountIds: Iterable[str], notification: Notification,
+                           kind: str = "general", relatedId: Optional[str] = None) -> None:
+    """
+    Queues one notification for any number of accounts; the payload is shared by every inbox.
+
+    Args:
+        pipeline (NotificationPipeline): the running pipeline.
+        accountIds (Iterable[str]): recipients; duplicates are delivered once.
+        notification (Notification): validated title and description.
+        kind (str): what the notification is about, e.g. "booking" or "review".
+        relatedId (str): id of the booking, review or service it refers to.
+    """
+    payload = NotificationPipeline.payload(notification.title, notification.description, kind, relatedId)
+    await pipeline.publish(accountIds, payload)
+
+
+def getNotifications(store: InboxStore, accountId: str, limit: int, after: Optional[str] = None,
+                     unreadOnly: bool = False) -> dict:
+    """
+    Returns one page of an account's notifications, newest first.
+
+    Raises:
+        ValueError: if the cursor is malformed.
+    """
+    inbox = store.peek(accountId)
+    if inbox is None:
+        return {"items": [], "next_cursor": None, "total": 0, "unread": 0}
+    cursor = parseNotificationId(after) if after is not None else None
+    if after is not None and cursor is None:
+        raise ValueError("Invalid cursor")
+    items, nextCursor = inbox.page(limit, cursor, unreadOnly)
+    return {"items": items, "next_cursor": nextCursor, "total": inbox.total, "unread": inbox.unread}
+
+
+def markNotificationRead(store: InboxStore, accountId: str, notificationId: str) -> bool:
+    inbox = store.peek(accountId)
+    seq = parseNotificationId(notificationId)
+    return inbox is not None and seq is not None and inbox.mark_read(seq)
+
 
-def sendNotification(accountId: str, notification: Notification) -> None: ...
-def deleteNotification(accountId: str, notification: Notification) -> None: ...
-def getNotifications(accountId: str) -> list[Notification]: ...
+def markAllNotificationsRead(store: InboxStore, accountId: str) -> None:
+    inbox = store.peek(accountId)
+    if inbox is not None:
+        inbox.mark_all_read()
 
 
-'''
\ No newline at end of file
+def deleteNotification(store: InboxStore, accountId: str, notificationId: str) -> bool:
+    """Removes one notification in O(1); returns False if it does not exist (or was already dropped)."""
+    inbox = store.peek(accountId)
+    seq = parseNotificationId(notificationId)
+    return inbox is not None and seq is not None and inbox.delete(seq)
@@ -1,6 +1,40 @@
-'''handles reports import and export
-possible key methods:
-def exportReport(report: Report, filePath: str = "hustlrReport.txt") -> None: 
-def importReport(filePath: str = "hustlrReport.txt") -> str: 
+'''
+exports and imports reports through the streaming report engine (reports.py)
+the file format follows the extension: .csv, .ndjson or .hcol (compressed columns)
+'''
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
 
-'''
\ No newline at end of file
+from models.Report import Report
+
+
+def createReport(reportId: str, reportType: str) -> Report:
+    """
+    Starts an empty report of one of the engine's types ("Bookings", "Users" or "Revenue").
+
+    Raises:
+        ValueError: if the engine cannot export reports of this type.
+    """
+    report = Report(reportId, reportType, {}, datetime.now())
+    report.kind  # checks the type
+    return report
+
+
+def exportReport(report: Report, rows: Iterable[Sequence], filePath: str = "hustlrReport.csv") -> int:
+    """
+    Streams rows to a new file; an existing file is never overwritten.
+
+    Args:
+        report (Report): the report being exported.
+        rows (Iterable[Sequence]): rows in the report type's column order.
+        filePath (str): destination; its extension picks the format.
+
+    Returns:
+        int: the number of rows written, 0 if the file already existed.
+    """
+    return report.exportReport(rows, filePath)
+
+
+def importReport(report: Report, filePath: str = "hustlrReport.csv") -> Iterator[dict]:
+    """Yields the rows of an exported report file, read in constant memory."""
+    return report.importReport(filePath)
@@ -0,0 +1,364 @@
+import os
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (Column, Float, Index, Integer, MetaData, String, Table, Text, delete, event, func, insert, select,
+                        update)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+metadata = MetaData()
+
+users_table = Table(
+    "users", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("email", String(255), nullable=False),
+    Column("name", String(255), nullable=False),
+    Column("type", String(16), nullable=False),
+    Column("phone", String(32)),
+    Column("location", String(255)),
+    Column("password_hash", String(60)),
+    Index("ix_users_email", "email", unique=True),
+)
+
+services_table = Table(
+    "services", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("price", Float, nullable=False),
+    Column("provider_id", String(36), nullable=False),
+    Column("category", String(64), nullable=False),
+    Column("image_url", String(512)),
+    Column("rating", Float),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Index("ix_services_provider_id", "provider_id"),
+    Index("ix_services_category", "category"),
+)
+
+bookings_table = Table(
+    "bookings", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("service_id", String(36), nullable=False),
+    Column("consumer_id", String(36), nullable=False),
+    Column("provider_id", String(36), nullable=False),
+    Column("date", String(10), nullable=False),
+    Column("time", String(5), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("price", Float, nullable=False),
+    Column("version", Integer, nullable=False, default=1),
+    # the user who made the booking; only bookings made by their consumer are charged
+    Column("booked_by", String(36)),
+    Index("ix_bookings_consumer_id", "consumer_id"),
+    Index("ix_bookings_provider_id", "provider_id"),
+)
+
+reviews_table = Table(
+    "reviews", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("author_id", String(36), nullable=False),
+    Column("target_type", String(16), nullable=False),
+    Column("target_id", String(36), nullable=False),
+    Column("rating", Integer, nullable=False),
+    Column("title", String(100), nullable=False),
+    Column("comment", Text, nullable=False),
+    Column("created_at", String(32), nullable=False),
+    Column("updated_at", String(32)),
+    Index("ix_reviews_target_id", "target_id"),
+    # one review per author and target; also serves lookups by author
+    Index("ix_reviews_author_target", "author_id", "target_id", unique=True),
+)
+
+subscriptions_table = Table(
+    "subscriptions", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("consumer_id", String(36), nullable=False),
+    Column("service_id", String(36), nullable=False),
+    Column("provider_id", String(36), nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("interval_days", Integer, nullable=False),
+    Column("status", String(16), nullable=False),
+    # epoch seconds of the next renewal
+    Column("next_due", Float, nullable=False),
+    Column("periods_billed", Integer, nullable=False, default=0),
+    Column("attempts", Integer, nullable=False, default=0),
+    Index("ix_subscriptions_consumer_id", "consumer_id"),
+)
+
+# append-only: rows are inserted, never updated or deleted
+ledger_table = Table(
+    "ledger_entries", metadata,
+    Column("seq", Integer, primary_key=True, autoincrement=False),
+    Column("key", String(100), nullable=False),
+    Column("kind", String(32), nullable=False),
+    Column("ref", String(36)),
+    # JSON list of [account, cents] pairs that sum to zero
+    Column("postings", Text, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Index("ix_ledger_entries_key", "key", unique=True),
+)
+
+jobs_table = Table(
+    "jobs", metadata,
+    Column("id", String(36), primary_key=True),
+    Column("kind", String(64), nullable=False),
+    # JSON text
+    Column("params", Text, nullable=False),
+    Column("owner_id", String(36)),
+    Column("status", String(16), nullable=False),
+    Column("progress", Float, nullable=False, default=0.0),
+    Column("done", Integer, nullable=False, default=0),
+    Column("total", Integer),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("error", Text),
+    # JSON text
+    Column("result", Text),
+    # epoch seconds
+    Column("created_at", Float, nullable=False),
+    Column("run_at", Float, nullable=False),
+    Column("started_at", Float),
+    Column("finished_at", Float),
+    Index("ix_jobs_owner_id", "owner_id"),
+)
+
+# ids of revoked tokens until the tokens expire (epoch seconds)
+revocations_table = Table(
+    "revoked_tokens", metadata,
+    Column("jti", String(32), primary_key=True),
+    Column("exp", Integer, nullable=False),
+    Index("ix_revoked_tokens_exp", "exp"),
+)
+
+# providers' working hours as set through the API, JSON of weekday -> [opening minute, closing minute]
+working_hours_table = Table(
+    "working_hours", metadata,
+    Column("provider_id", String(36), primary_key=True),
+    Column("hours", Text, nullable=False),
+)
+
+
+class Storage:
+    """
+    Persistent storage engine backed by an async SQLAlchemy engine.
+
+    Works with SQLite through aiosqlite (e.g. "sqlite+aiosqlite:///hustlr.db")
+    and with Postgres through asyncpg (e.g. "postgresql+asyncpg://...").
+    All calls are coroutines, so route handlers await the database instead
+    of blocking the event loop.
+
+    Attributes:
+        url (str): SQLAlchemy database URL.
+        engine (AsyncEngine): the pooled async engine.
+    """
+
+    def __init__(self, url: str, pool_size: int = None, max_overflow: int = None,
+                 pool_timeout: float = None, pool_recycle: int = None, echo: bool = False):
+        self.url = url
+        is_sqlite = url.startswith("sqlite")
+        # SQLite allows one writer at a time, so a small pool avoids lock
+        # contention while still reusing connections instead of NullPool.
+        size = pool_size or int(os.getenv("DB_POOL_SIZE", 5 if is_sqlite else 10))
+        overflow = max_overflow if max_overflow is not None else int(
+            os.getenv("DB_MAX_OVERFLOW", 0 if is_sqlite else 20))
+        options = dict(
+            echo=echo,
+            pool_size=size,
+            max_overflow=overflow,
+            pool_timeout=pool_timeout or float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            pool_pre_ping=not is_sqlite,
+        )
+        if is_sqlite:
+            options["poolclass"] = AsyncAdaptedQueuePool
+        else:
+            options["pool_recycle"] = pool_recycle or int(os.getenv("DB_POOL_RECYCLE", 1800))
+        self.engine: AsyncEngine = create_async_engine(url, **options)
+        if is_sqlite:
+            event.listen(self.engine.sync_engine, "connect", self._configure_sqlite)
+
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async def create_all(self) -> None:
+        """Creates tables and indexes that do not exist yet."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+    async def count(self, table: Table) -> int:
+        async with self.engine.connect() as conn:
+            return (await conn.execute(select(func.count()).select_from(table))).scalar_one()
+
+    async def bulk_insert(self, table: Table, rows: Iterable[dict], chunk_size: int = 1000) -> int:
+        """
+        Inserts rows in chunks using executemany inside one transaction.
+
+        Args:
+            table (Table): target table.
+            rows (Iterable[dict]): records to insert; unknown keys are dropped.
+            chunk_size (int): rows sent per executemany batch.
+
+        Returns:
+            int: number of rows inserted.
+        """
+        columns = set(table.c.keys())
+        total = 0
+        chunk: List[dict] = []
+        async with self.engine.begin() as conn:
+            for row in rows:
+                chunk.append({k: v for k, v in row.items() if k in columns})
+                if len(chunk) >= chunk_size:
+                    await conn.execute(insert(table), chunk)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                await conn.execute(insert(table), chunk)
+                total += len(chunk)
+        return total
+
+    async def insert(self, table: Table, record: dict) -> None:
+        columns = set(table.c.keys())
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(table).values({k: v for k, v in record.items() if k in columns}))
+
+    async def update_user(self, user_id: str, **changes) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(update(users_table).where(users_table.c.id == user_id).values(**changes))
+            return result.rowcount
+
+    async def update_service(self, service_id: str, **changes) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(update(services_table).where(services_table.c.id == service_id).values(**changes))
+            return result.rowcount
+
+    async def update_review(self, review_id: str, **changes) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(update(reviews_table).where(reviews_table.c.id == review_id).values(**changes))
+            return result.rowcount
+
+    async def delete_review(self, review_id: str) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(delete(reviews_table).where(reviews_table.c.id == review_id))
+            return result.rowcount
+
+    async def update_subscription(self, subscription_id: str, **changes) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                update(subscriptions_table).where(subscriptions_table.c.id == subscription_id).values(**changes))
+            return result.rowcount
+
+    async def update_job(self, job_id: str, **changes) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(update(jobs_table).where(jobs_table.c.id == job_id).values(**changes))
+            return result.rowcount
+
+    async def delete_job(self, job_id: str) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(delete(jobs_table).where(jobs_table.c.id == job_id))
+            return result.rowcount
+
+    async def delete_expired_revocations(self, now: float) -> int:
+        async with self.engine.begin() as conn:
+            result = await conn.execute(delete(revocations_table).where(revocations_table.c.exp <= now))
+            return result.rowcount
+
+    async def put_working_hours(self, provider_id: str, hours: str) -> None:
+        """Inserts or replaces a provider's working hours."""
+        query = update(working_hours_table).where(working_hours_table.c.provider_id == provider_id).values(hours=hours)
+        async with self.engine.begin() as conn:
+            if (await conn.execute(query)).rowcount:
+                return
+        try:
+            await self.insert(working_hours_table, {'provider_id': provider_id, 'hours': hours})
+        except IntegrityError:
+            # a concurrent request inserted them first
+            async with self.engine.begin() as conn:
+                await conn.execute(query)
+
+    async def update_booking(self, booking_id: str, expected_version: int = None, **changes) -> int:
+        """
+        Updates a booking row, optionally only if it still has expected_version.
+
+        Returns:
+            int: number of rows changed; 0 means the booking is missing or the
+            version check failed because another writer got there first.
+        """
+        query = update(bookings_table).where(bookings_table.c.id == booking_id)
+        if expected_version is not None:
+            query = query.where(bookings_table.c.version == expected_version)
+        async with self.engine.begin() as conn:
+            result = await conn.execute(query.values(**changes))
+            return result.rowcount
+
+    async def stream(self, table: Table, batch_size: int = 5000, order_by: str = None,
+                     **filters) -> AsyncIterator[dict]:
+        """
+        Yields rows of a table as dicts using a server-side cursor.
+
+        Args:
+            table (Table): table to read.
+            batch_size (int): rows fetched per round trip.
+            order_by (str): column to sort by; unsorted by default.
+            **filters: column equality filters, e.g. provider_id="...".
+        """
+        query = select(table)
+        for column, value in filters.items():
+            query = query.where(table.c[column] == value)
+        if order_by is not None:
+            query = query.order_by(table.c[order_by])
+        async with self.engine.connect() as conn:
+            result = await conn.stream(query.execution_options(yield_per=batch_size))
+            async for row in result.mappings():
+                yield dict(row)
+
+    async def seed_stream(self, records: Iterable[Tuple[str, dict]],
+                          chunk_size: int = 1000) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Passes (kind, record) pairs through while bulk inserting them in chunks.
+
+        Lets an empty database be seeded from the same single pass that
+        loads the in-memory indexes, without holding the whole data set.
+        """
+        tables = {'users': users_table, 'services': services_table, 'bookings': bookings_table,
+                  'reviews': reviews_table, 'subscriptions': subscriptions_table, 'ledger': ledger_table,
+                  'jobs': jobs_table, 'revocations': revocations_table, 'hours': working_hours_table}
+        pending: List[dict] = []
+        pending_kind = None
+        for kind, record in records:
+            if pending and (kind != pending_kind or len(pending) >= chunk_size):
+                await self.bulk_insert(tables[pending_kind], pending)
+                pending = []
+            pending_kind = kind
+            pending.append(record)
+            yield kind, record
+        if pending:
+            await self.bulk_insert(tables[pending_kind], pending)
+
+    async def stream_records(self) -> AsyncIterator[Tuple[str, dict]]:
+        """Yields (kind, row) pairs for every kind in loader.KINDS, users first so references resolve."""
+        for kind, table in (('users', users_table), ('services', services_table), ('bookings', bookings_table),
+                            ('reviews', reviews_table), ('subscriptions', subscriptions_table)):
+            async for row in self.stream(table):
+                yield kind, row
+        # ledger entries must be replayed in order
+        async for row in self.stream(ledger_table, order_by='seq'):
+            yield 'ledger', row
+        async for row in self.stream(jobs_table):
+            yield 'jobs', row
+        async for row in self.stream(revocations_table):
+            yield 'revocations', row
+        async for row in self.stream(working_hours_table):
+            yield 'hours', row
+
+
+def storage_from_env() -> Optional[Storage]:
+    """Returns a Storage for DATABASE_URL, or None to run purely in memory."""
+    url = os.getenv("DATABASE_URL")
+    return Storage(url) if url else None
@@ -0,0 +1,27 @@
+from typing import Callable, Dict, List
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for domain events.
+
+    Handlers run synchronously in publish order, so state derived from an
+    event (such as evicted cache entries) is consistent before the
+    publishing request continues. A handler that needs to do I/O should
+    hand the event to a task or queue of its own.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[..., None]]] = {}
+
+    def subscribe(self, topic: str, handler: Callable[..., None]) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def unsubscribe(self, topic: str, handler: Callable[..., None]) -> None:
+        handlers = self._handlers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, topic: str, **payload) -> None:
+        for handler in self._handlers.get(topic, ()):
+            handler(**payload)
@@ -0,0 +1,292 @@
+"""
+Bulk test-data generator for load and capacity testing.
+
+Produces millions of users, services and bookings as NDJSON (one file per
+record type) or as a single test_data.json-shaped file, using vectorised
+NumPy sampling, fixed-size chunks generated in parallel worker processes,
+and streaming writes so memory stays flat regardless of the record count.
+
+Every cross-reference (a service's provider, a booking's service, provider
+and price) is a pure function of the seed and the record index, computed
+with a counter-based hash, so chunks never need to see each other's data
+and the output is identical for the same seed and chunk size whatever the
+number of workers.
+
+Usage (from Backend/src):
+    python generate_bulk_data.py --users 10000000 --services 10000000 --bookings 10000000 --out bulk_data
+"""
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from generate_test_data import DEV_PASSWORD_HASH
+
+CATEGORIES = ['Cleaning', 'Plumbing', 'Electrical', 'Carpentry', 'Painting', 'Gardening', 'Moving', 'Cooking',
+              'Tutoring', 'Fitness']
+# hot categories: a few categories take most of the catalogue
+CATEGORY_WEIGHTS = np.array([0.30, 0.18, 0.12, 0.09, 0.08, 0.07, 0.06, 0.04, 0.03, 0.03])
+CITIES = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia', 'San Antonio', 'San Diego',
+          'Dallas', 'San Jose']
+CITY_WEIGHTS = np.array([0.25, 0.16, 0.11, 0.09, 0.08, 0.07, 0.06, 0.06, 0.06, 0.06])
+DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com']
+STATUSES = ['pending', 'confirmed', 'completed', 'cancelled']
+STATUS_WEIGHTS = np.array([0.2, 0.3, 0.4, 0.1])
+ALPHABET = np.array(list("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"))
+
+BUSINESS_SHARE = 0.2
+ZIPF_EXPONENT = 1.1
+KINDS = ('users', 'services', 'bookings')
+
+# per-stream keys for the counter-based hash
+STREAM_USER_ID, STREAM_SERVICE_ID, STREAM_BOOKING_ID = 1, 2, 3
+STREAM_SERVICE_PROVIDER, STREAM_SERVICE_PRICE, STREAM_BOOKING_SERVICE = 4, 5, 6
+
+
+def splitmix64(values: np.ndarray) -> np.ndarray:
+    """Vectorised SplitMix64 finaliser; maps uint64 counters to well-mixed uint64 values."""
+    with np.errstate(over='ignore'):
+        z = values + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def hashed(seed: int, stream: int, indexes: np.ndarray) -> np.ndarray:
+    key = splitmix64(np.array([seed * 1_000_003 + stream], dtype=np.uint64))[0]
+    return splitmix64(indexes.astype(np.uint64) ^ key)
+
+
+def hashed_uniform(seed: int, stream: int, indexes: np.ndarray) -> np.ndarray:
+    """Uniform floats in [0, 1) that depend only on (seed, stream, index)."""
+    return (hashed(seed, stream, indexes) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def zipf_rank(uniform: np.ndarray, n: int, exponent: float = ZIPF_EXPONENT) -> np.ndarray:
+    """
+    Maps uniforms to ranks 0..n-1 with a (continuous) bounded Zipf distribution.
+
+    Rank 0 is the most popular; uses the inverse CDF of x ** -exponent on [1, n + 1).
+    """
+    power = 1.0 - exponent
+    ranks = ((((n + 1) ** power - 1.0) * uniform + 1.0) ** (1.0 / power)).astype(np.int64) - 1
+    return np.minimum(ranks, n - 1)
+
+
+def make_ids(seed: int, stream: int, indexes: np.ndarray) -> list:
+    """Deterministic version-4 UUID strings for record indexes."""
+    high = hashed(seed, stream, indexes)
+    low = hashed(seed, stream + 100, indexes)
+    high = (high & np.uint64(0xFFFFFFFFFFFF0FFF)) | np.uint64(0x4000)
+    low = (low & np.uint64(0x3FFFFFFFFFFFFFFF)) | np.uint64(0x8000000000000000)
+    ids = []
+    for h, l in zip(high.tolist(), low.tolist()):
+        text = f"{h:016x}{l:016x}"
+        ids.append(f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}")
+    return ids
+
+
+def random_strings(rng: np.random.Generator, count: int, length: int) -> np.ndarray:
+    return ALPHABET[rng.integers(0, len(ALPHABET), size=(count, length))].view(f'<U{length}').ravel()
+
+
+class Plan:
+    """
+    Record counts shared by every chunk, so references can be computed from indexes.
+
+    Users [0, providers) are businesses and the rest are consumers.
+    """
+
+    def __init__(self, users: int, services: int, bookings: int, seed: int, base_date: date):
+        self.users = users
+        self.services = services
+        self.bookings = bookings
+        self.seed = seed
+        self.base_date = base_date
+        self.providers = max(1, int(users * BUSINESS_SHARE))
+        self.consumers = max(1, users - self.providers)
+
+    def service_providers(self, indexes: np.ndarray) -> np.ndarray:
+        # Zipfian: a small set of providers owns most of the catalogue
+        return zipf_rank(hashed_uniform(self.seed, STREAM_SERVICE_PROVIDER, indexes), self.providers)
+
+    def service_prices(self, indexes: np.ndarray) -> np.ndarray:
+        # skewed towards cheaper services, 20.00 - 500.00
+        return np.round(20.0 + 480.0 * hashed_uniform(self.seed, STREAM_SERVICE_PRICE, indexes) ** 2.5, 2)
+
+
+def generate_users(plan: Plan, rng: np.random.Generator, start: int, count: int) -> list:
+    indexes = np.arange(start, start + count)
+    ids = make_ids(plan.seed, STREAM_USER_ID, indexes)
+    usernames = random_strings(rng, count, 8)
+    names = random_strings(rng, count, 5)
+    domains = rng.integers(0, len(DOMAINS), size=count)
+    phones = rng.integers(1_000_000_000, 9_999_999_999, size=count)
+    cities = rng.choice(len(CITIES), size=count, p=CITY_WEIGHTS)
+    lines = []
+    for i in range(count):
+        kind = 'business' if start + i < plan.providers else 'consumer'
+        # index suffix keeps emails unique across the whole data set
+        lines.append(
+            f'{{"id": "{ids[i]}", "email": "{usernames[i]}{start + i}@{DOMAINS[domains[i]]}", '
+            f'"name": "User {names[i]}", "type": "{kind}", "phone": "+1{phones[i]}", '
+            f'"location": "{CITIES[cities[i]]}", "password_hash": "{DEV_PASSWORD_HASH}"}}\n')
+    return lines
+
+
+def generate_services(plan: Plan, rng: np.random.Generator, start: int, count: int) -> list:
+    indexes = np.arange(start, start + count)
+    ids = make_ids(plan.seed, STREAM_SERVICE_ID, indexes)
+    provider_ids = make_ids(plan.seed, STREAM_USER_ID, plan.service_providers(indexes))
+    prices = plan.service_prices(indexes).tolist()
+    categories = rng.choice(len(CATEGORIES), size=count, p=CATEGORY_WEIGHTS)
+    suffixes = random_strings(rng, count, 4)
+    years = rng.integers(1, 21, size=count)
+    images = rng.integers(1, 1001, size=count)
+    # ratings cluster around 4 stars
+    ratings = np.round(1.0 + 4.0 * rng.beta(5.0, 2.0, size=count), 1).tolist()
+    lines = []
+    for i in range(count):
+        category = CATEGORIES[categories[i]]
+        lines.append(
+            f'{{"id": "{ids[i]}", "name": "{category} Service {suffixes[i]}", '
+            f'"description": "Professional {category.lower()} service with {years[i]} years of experience.", '
+            f'"price": {prices[i]:.2f}, "provider_id": "{provider_ids[i]}", "category": "{category}", '
+            f'"image_url": "https://picsum.photos/400/300?random={images[i]}", "rating": {ratings[i]}}}\n')
+    return lines
+
+
+def generate_bookings(plan: Plan, rng: np.random.Generator, start: int, count: int) -> list:
+    indexes = np.arange(start, start + count)
+    ids = make_ids(plan.seed, STREAM_BOOKING_ID, indexes)
+    # popular services take most bookings; provider and price follow the service
+    services = zipf_rank(hashed_uniform(plan.seed, STREAM_BOOKING_SERVICE, indexes), plan.services)
+    service_ids = make_ids(plan.seed, STREAM_SERVICE_ID, services)
+    provider_ids = make_ids(plan.seed, STREAM_USER_ID, plan.service_providers(services))
+    prices = plan.service_prices(services).tolist()
+    consumer_ids = make_ids(plan.seed, STREAM_USER_ID, plan.providers + rng.integers(0, plan.consumers, size=count))
+    dates = [(plan.base_date + timedelta(days=int(offset))).isoformat() for offset in rng.integers(-30, 31, size=count)]
+    hours = rng.integers(9, 18, size=count)
+    statuses = rng.choice(len(STATUSES), size=count, p=STATUS_WEIGHTS)
+    lines = []
+    for i in range(count):
+        lines.append(
+            f'{{"id": "{ids[i]}", "service_id": "{service_ids[i]}", "consumer_id": "{consumer_ids[i]}", '
+            f'"provider_id": "{provider_ids[i]}", "date": "{dates[i]}", "time": "{hours[i]}:00", '
+            f'"status": "{STATUSES[statuses[i]]}", "price": {prices[i]:.2f}}}\n')
+    return lines
+
+
+GENERATORS = {'users': generate_users, 'services': generate_services, 'bookings': generate_bookings}
+
+
+def part_path(out_dir: str, kind: str, chunk: int) -> str:
+    return os.path.join(out_dir, f"{kind}.part-{chunk:06d}.ndjson")
+
+
+def write_chunk(plan: Plan, kind: str, chunk: int, start: int, count: int, out_dir: str) -> int:
+    """Generates one chunk in a worker process and writes it to its own part file."""
+    # the chunk's own generator depends only on (seed, kind, chunk), never on the worker
+    rng = np.random.default_rng(np.random.SeedSequence([plan.seed, KINDS.index(kind), chunk]))
+    lines = GENERATORS[kind](plan, rng, start, count)
+    with open(part_path(out_dir, kind, chunk), 'w') as f:
+        f.writelines(lines)
+    return count
+
+
+def merge_ndjson(out_dir: str, kind: str, chunks: int) -> str:
+    target = os.path.join(out_dir, f"{kind}.ndjson")
+    with open(target, 'wb') as out:
+        for chunk in range(chunks):
+            path = part_path(out_dir, kind, chunk)
+            with open(path, 'rb') as part:
+                shutil.copyfileobj(part, out, 1 << 20)
+            os.remove(path)
+    return target
+
+
+def merge_json(out_dir: str, chunk_counts: dict) -> str:
+    """Streams all part files into one {"users": [...], "services": [...], "bookings": [...]} document."""
+    target = os.path.join(out_dir, "test_data.json")
+    with open(target, 'w') as out:
+        out.write('{')
+        for position, kind in enumerate(KINDS):
+            out.write(f'{", " if position else ""}"{kind}": [')
+            first = True
+            for chunk in range(chunk_counts[kind]):
+                path = part_path(out_dir, kind, chunk)
+                with open(path) as part:
+                    for line in part:
+                        out.write(line.rstrip('\n') if first else ',\n' + line.rstrip('\n'))
+                        first = False
+                os.remove(path)
+            out.write(']')
+        out.write('}\n')
+    return target
+
+
+def generate(users: int, services: int, bookings: int, out_dir: str, seed: int = 42,
+             chunk_size: int = 100_000, workers: int = None, output_format: str = 'ndjson',
+             base_date: date = None) -> dict:
+    """
+    Generates a data set into out_dir.
+
+    Args:
+        users (int): number of users.
+        services (int): number of services.
+        bookings (int): number of bookings.
+        out_dir (str): output directory, created if missing.
+        seed (int): seed for deterministic output.
+        chunk_size (int): records per chunk; bounds each worker's memory.
+        workers (int): worker processes, defaults to the CPU count.
+        output_format (str): "ndjson" for one file per kind, "json" for a test_data.json-shaped file.
+        base_date (date): bookings fall within 30 days of this date, defaults to today.
+
+    Returns:
+        dict: kind -> seconds spent generating it.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    plan = Plan(users, services, bookings, seed, base_date or date.today())
+    counts = {'users': users, 'services': services, 'bookings': bookings}
+    chunk_counts = {}
+    timings = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for kind in KINDS:
+            started = time.perf_counter()
+            jobs = []
+            for chunk, start in enumerate(range(0, counts[kind], chunk_size)):
+                jobs.append(pool.submit(write_chunk, plan, kind, chunk, start,
+                                        min(chunk_size, counts[kind] - start), out_dir))
+            for job in jobs:
+                job.result()
+            chunk_counts[kind] = len(jobs)
+            if output_format == 'ndjson':
+                merge_ndjson(out_dir, kind, len(jobs))
+            timings[kind] = time.perf_counter() - started
+    if output_format == 'json':
+        merge_json(out_dir, chunk_counts)
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate large test data sets.")
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--services', type=int, default=1_000_000)
+    parser.add_argument('--bookings', type=int, default=1_000_000)
+    parser.add_argument('--out', default='bulk_data')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--format', choices=['ndjson', 'json'], default='ndjson')
+    parser.add_argument('--base-date', type=date.fromisoformat, default=None,
+                        help="YYYY-MM-DD centre of the booking dates, for fully reproducible output")
+    args = parser.parse_args()
+    timings = generate(args.users, args.services, args.bookings, args.out, args.seed,
+                       args.chunk_size, args.workers, args.format, args.base_date)
+    for kind, seconds in timings.items():
+        print(f"{kind}: {seconds:.1f}s")
+    print(f"Test data written to {args.out}")
@@ -3,6 +3,13 @@ import string
 import json
 from datetime import datetime, timedelta
 import uuid
+from geo import CITY_COORDINATES
+
+# every generated user can log in with this password; the hash is precomputed
+# (bcrypt, cost 12) so generated files stay reproducible
+DEV_PASSWORD = "Password123!"
+DEV_PASSWORD_HASH = "$2b$12$/c1u6a8GCl55SoDrZ8akxuFI2F0C7dvR2E1mCXrN4GmoLYj0cBxeO"
+ADMIN_EMAIL = "admin@hustlr.dev"
 
 def generate_random_string(length=8):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
@@ -20,6 +27,11 @@ def generate_random_location():
     cities = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 'Philadelphia', 'San Antonio', 'San Diego', 'Dallas', 'San Jose']
     return random.choice(cities)
 
+def generate_random_coordinates(city):
+    # scatter points within roughly 20 km of the city centre
+    latitude, longitude = CITY_COORDINATES[city]
+    return round(latitude + random.uniform(-0.2, 0.2), 6), round(longitude + random.uniform(-0.2, 0.2), 6)
+
 def generate_users(count=100):
     users = []
     for _ in range(count):
@@ -30,28 +42,47 @@ def generate_users(count=100):
             'name': f"User {generate_random_string(5)}",
             'type': user_type,
             'phone': generate_random_phone(),
-            'location': generate_random_location()
+            'location': generate_random_location(),
+            'password_hash': DEV_PASSWORD_HASH
         }
         users.append(user)
     return users
 
-def generate_services(count=100, providers=None):
+def generate_admin():
+    # the platform operator; admin-only routes (reports, stats rebuilds, payouts, snapshots) need it
+    return {
+        'id': str(uuid.uuid4()),
+        'email': ADMIN_EMAIL,
+        'name': "Admin",
+        'type': 'admin',
+        'phone': generate_random_phone(),
+        'location': generate_random_location(),
+        'password_hash': DEV_PASSWORD_HASH
+    }
+
+def generate_services(count=100, providers=None, provider_locations=None):
     if not providers:
         providers = [user['id'] for user in generate_users(50) if user['type'] == 'business']
+    provider_locations = provider_locations or {}
     
     categories = ['Cleaning', 'Plumbing', 'Electrical', 'Carpentry', 'Painting', 'Gardening', 'Moving', 'Cooking', 'Tutoring', 'Fitness']
     services = []
     
     for _ in range(count):
+        provider_id = random.choice(providers)
+        latitude, longitude = generate_random_coordinates(
+            provider_locations.get(provider_id) or generate_random_location())
         service = {
             'id': str(uuid.uuid4()),
             'name': f"{random.choice(categories)} Service {generate_random_string(4)}",
             'description': f"Professional {random.choice(categories).lower()} service with {random.randint(1, 20)} years of experience.",
             'price': round(random.uniform(20.0, 500.0), 2),
-            'provider_id': random.choice(providers),
+            'provider_id': provider_id,
             'category': random.choice(categories),
             'image_url': f"https://picsum.photos/400/300?random={random.randint(1, 1000)}",
-            'rating': round(random.uniform(1.0, 5.0), 1)
+            'rating': round(random.uniform(1.0, 5.0), 1),
+            'latitude': latitude,
+            'longitude': longitude
         }
         services.append(service)
     return services
@@ -85,11 +116,12 @@ def generate_bookings(count=100, services=None, consumers=None):
 
 def save_test_data():
     users = generate_users(100)
-    services = generate_services(100, [user['id'] for user in users if user['type'] == 'business'])
+    services = generate_services(100, [user['id'] for user in users if user['type'] == 'business'],
+                                 {user['id']: user['location'] for user in users})
     bookings = generate_bookings(100, services, [user['id'] for user in users if user['type'] == 'consumer'])
     
     data = {
-        'users': users,
+        'users': users + [generate_admin()],
         'services': services,
         'bookings': bookings
     }
@@ -0,0 +1,188 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+DEFAULT_CELL_DEGREES = 0.02
+
+# Approximate centres of the cities generate_test_data.py assigns to users,
+# used when a service does not carry its own coordinates.
+CITY_COORDINATES: Dict[str, Tuple[float, float]] = {
+    'New York': (40.7128, -74.0060),
+    'Los Angeles': (34.0522, -118.2437),
+    'Chicago': (41.8781, -87.6298),
+    'Houston': (29.7604, -95.3698),
+    'Phoenix': (33.4484, -112.0740),
+    'Philadelphia': (39.9526, -75.1652),
+    'San Antonio': (29.4241, -98.4936),
+    'San Diego': (32.7157, -117.1611),
+    'Dallas': (32.7767, -96.7970),
+    'San Jose': (37.3382, -121.8863),
+}
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def record_coordinates(record: dict, location: Optional[str] = None) -> Optional[Tuple[float, float]]:
+    """
+    Returns (latitude, longitude) for a record.
+
+    Args:
+        record (dict): record that may carry latitude and longitude.
+        location (str): fallback city name, looked up in CITY_COORDINATES.
+    """
+    latitude, longitude = record.get('latitude'), record.get('longitude')
+    if latitude is not None and longitude is not None:
+        return float(latitude), float(longitude)
+    return CITY_COORDINATES.get(location) if location else None
+
+
+class GeoIndex:
+    """
+    Grid (geohash-style) spatial index of service locations.
+
+    Points are bucketed into fixed-size latitude/longitude cells, one grid
+    for all services and one per category, so radius and k-nearest queries
+    only visit the cells around the query point.
+
+    Attributes:
+        cell_degrees (float): cell edge length in degrees.
+        points (dict): service id -> (latitude, longitude, category).
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.points: Dict[str, Tuple[float, float, str]] = {}
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        self._category_cells: Dict[str, Dict[Tuple[int, int], List[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+
+    def add(self, service_id: str, latitude: float, longitude: float, category: str = '') -> None:
+        """Adds or moves a service point."""
+        if service_id in self.points:
+            self.remove(service_id)
+        category = category.lower()
+        cell = self._cell(latitude, longitude)
+        self.points[service_id] = (latitude, longitude, category)
+        self._cells.setdefault(cell, []).append(service_id)
+        self._category_cells.setdefault(category, {}).setdefault(cell, []).append(service_id)
+
+    def remove(self, service_id: str) -> None:
+        point = self.points.pop(service_id, None)
+        if point is None:
+            return
+        latitude, longitude, category = point
+        cell = self._cell(latitude, longitude)
+        for cells in (self._cells, self._category_cells[category]):
+            members = cells[cell]
+            members.remove(service_id)
+            if not members:
+                del cells[cell]
+
+    def _grid(self, category: Optional[str]) -> Dict[Tuple[int, int], List[str]]:
+        return self._category_cells.get(category.lower(), {}) if category else self._cells
+
+    def _cell_size_km(self, latitude: float, span_km: float) -> float:
+        """Smallest cell edge in km within span_km of a latitude (longitude edges shrink towards the poles)."""
+        lat = min(abs(latitude) + span_km / KM_PER_DEGREE + self.cell_degrees, 89.9)
+        return self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(lat))
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               category: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Returns services within radius_km of a point, nearest first.
+
+        Args:
+            latitude (float): query latitude.
+            longitude (float): query longitude.
+            radius_km (float): search radius in kilometres.
+            category (str): optional case-insensitive category filter.
+            limit (int): optional maximum number of results.
+
+        Returns:
+            list: (service id, distance in km) pairs.
+        """
+        grid = self._grid(category)
+        lat_span = radius_km / KM_PER_DEGREE
+        lng_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude) + lat_span, 89.9))), 1e-6))
+        lat_lo, lng_lo = self._cell(latitude - lat_span, longitude - lng_span)
+        lat_hi, lng_hi = self._cell(latitude + lat_span, longitude + lng_span)
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) > len(grid):
+            # a huge radius covers more cells than are occupied
+            members = (ids for (x, y), ids in grid.items() if lat_lo <= x <= lat_hi and lng_lo <= y <= lng_hi)
+        else:
+            members = (grid[(x, y)] for x in range(lat_lo, lat_hi + 1)
+                       for y in range(lng_lo, lng_hi + 1) if (x, y) in grid)
+        points = self.points
+        found = []
+        for ids in members:
+            for service_id in ids:
+                lat, lng, _ = points[service_id]
+                distance = haversine_km(latitude, longitude, lat, lng)
+                if distance <= radius_km:
+                    found.append((service_id, distance))
+        if limit is not None:
+            return heapq.nsmallest(limit, found, key=lambda pair: pair[1])
+        found.sort(key=lambda pair: pair[1])
+        return found
+
+    def nearest(self, latitude: float, longitude: float, k: int, max_km: float,
+                category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Returns the k services nearest to a point, searching rings of cells outwards.
+
+        The search stops once k points are known and the next ring cannot
+        hold anything closer, or when rings pass max_km.
+
+        Args:
+            latitude (float): query latitude.
+            longitude (float): query longitude.
+            k (int): number of neighbours wanted.
+            max_km (float): distance cap in kilometres.
+            category (str): optional case-insensitive category filter.
+
+        Returns:
+            list: (service id, distance in km) pairs, nearest first.
+        """
+        grid = self._grid(category)
+        if not grid or k <= 0:
+            return []
+        cx, cy = self._cell(latitude, longitude)
+        cell_km = self._cell_size_km(latitude, max_km)
+        max_ring = int(max_km / cell_km) + 1
+        points = self.points
+        heap: List[Tuple[float, str]] = []  # max-heap of the best k by negated distance
+        for ring in range(max_ring + 1):
+            if len(heap) == k and -heap[0][0] <= (ring - 1) * cell_km:
+                break
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + dx, cy + dy) for dx in range(-ring, ring + 1)
+                         for dy in (-ring, ring)]
+                cells += [(cx + dx, cy + dy) for dx in (-ring, ring)
+                          for dy in range(-ring + 1, ring)]
+            for cell in cells:
+                for service_id in grid.get(cell, ()):
+                    lat, lng, _ = points[service_id]
+                    distance = haversine_km(latitude, longitude, lat, lng)
+                    if distance > max_km:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-distance, service_id))
+                    elif distance < -heap[0][0]:
+                        heapq.heapreplace(heap, (-distance, service_id))
+        return sorted(((service_id, -negated) for negated, service_id in heap), key=lambda pair: pair[1])
@@ -0,0 +1,358 @@
+import asyncio
+import heapq
+import json
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+CONCURRENCY = 2
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 300.0
+# progress is saved at most this often per job; the in-memory record is always current
+PROGRESS_SAVE_SECONDS = 1.0
+# finished jobs are kept (and their results downloadable) this long, checked every PRUNE_INTERVAL
+RETENTION_SECONDS = 7 * 24 * 3600.0
+PRUNE_INTERVAL = 60.0
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+
+class JobFailed(Exception):
+    """Raised by a job to fail at once, without retrying, e.g. when its input does not exist."""
+
+
+class UnknownJobKind(ValueError):
+    """Raised when a job is submitted for a kind no handler is registered for."""
+
+
+class JobContext:
+    """
+    Handed to a running job to report progress and offload CPU-bound work.
+
+    Attributes:
+        job (dict): the job's record; its params are job['params'].
+    """
+
+    def __init__(self, runner: "JobRunner", job: dict):
+        self.job = job
+        self._runner = runner
+        self._saved_at = 0.0
+
+    async def progress(self, done: int, total: Optional[int] = None) -> None:
+        """
+        Records how far the job has got and lets other tasks run.
+
+        Jobs run on the event loop, so a long job should call this every
+        few thousand items; it is also where a cancelled job stops.
+        """
+        job = self.job
+        job['done'] = done
+        if total is not None:
+            job['total'] = total
+        if job['total']:
+            job['progress'] = min(1.0, done / job['total'])
+        now = time.monotonic()
+        if now - self._saved_at >= PROGRESS_SAVE_SECONDS:
+            self._saved_at = now
+            await self._runner._changed(job)
+        await asyncio.sleep(0)
+
+    async def run_in_executor(self, fn: Callable, *args) -> Any:
+        """Runs a picklable function in the runner's worker pool (processes when configured)."""
+        return await asyncio.get_running_loop().run_in_executor(self._runner.executor(), fn, *args)
+
+
+# handler(context, params) -> JSON-shaped result stored on the job
+Handler = Callable[[JobContext, dict], Awaitable[Any]]
+
+
+class JobRunner:
+    """
+    In-process background jobs with retries, progress and cancellation.
+
+    Jobs are records kept in memory and persisted through `on_change`, so
+    they survive a restart: restore() puts queued jobs back in line, and
+    jobs that were running when the process stopped are run again. A fixed
+    number of worker tasks take jobs from a min-heap ordered by the time
+    each may next run, which is how retries wait out their backoff
+    (`backoff_seconds` doubling per attempt, up to `max_backoff_seconds`).
+
+    Handlers are coroutines on the event loop and must await
+    JobContext.progress() regularly; CPU-heavy pieces go through
+    JobContext.run_in_executor(), which uses a process pool when
+    `processes` is set and a thread pool otherwise.
+
+    Finished jobs are forgotten `retention_seconds` after they finished:
+    a min-heap by finish time lets each sweep pop only the expired ones,
+    and `on_prune` is awaited with each so its stored record goes too.
+
+    Attributes:
+        jobs (dict): job id -> record.
+        concurrency (int): jobs running at once.
+        max_attempts (int): runs per job before it fails.
+        processes (int): size of the process pool; 0 for a thread pool.
+        retention_seconds (float): how long finished jobs are kept.
+        on_submit (Callable): awaited with a new job before it is queued, e.g. to insert it.
+        on_change (Callable): awaited with a job whenever it changed afterwards, e.g. to persist it.
+        on_prune (Callable): awaited with a finished job as it is forgotten, e.g. to delete it.
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY, max_attempts: int = MAX_ATTEMPTS,
+                 backoff_seconds: float = BACKOFF_SECONDS, max_backoff_seconds: float = MAX_BACKOFF_SECONDS,
+                 processes: int = 0, retention_seconds: float = RETENTION_SECONDS):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.processes = processes
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, dict] = {}
+        self.on_submit: Optional[Callable[[dict], Awaitable[None]]] = None
+        self.on_change: Optional[Callable[[dict], Awaitable[None]]] = None
+        self.on_prune: Optional[Callable[[dict], Awaitable[None]]] = None
+        self._handlers: Dict[str, Handler] = {}
+        self._checks: Dict[str, Callable[[dict], None]] = {}
+        self._ready: List[Tuple[float, int, str]] = []  # (run at, seq, job id)
+        self._finished: List[Tuple[float, str]] = []  # (finished at, job id)
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: set = set()  # ids of running jobs cancelled through cancel()
+        self._workers: List[asyncio.Task] = []
+        self._pruner: Optional[asyncio.Task] = None
+        self._executor: Optional[Executor] = None
+
+    def register(self, kind: str, handler: Handler, check: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Makes a kind of job available.
+
+        Args:
+            check (Callable): validates the params on submit, raising ValueError.
+        """
+        self._handlers[kind] = handler
+        if check is not None:
+            self._checks[kind] = check
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        return self._executor
+
+    @staticmethod
+    def to_dict(job: Mapping) -> dict:
+        """The stored form of a job; params and result are JSON text."""
+        record = dict(job)
+        record['params'] = json.dumps(job['params'])
+        record['result'] = json.dumps(job['result']) if job['result'] is not None else None
+        return record
+
+    def _schedule(self, job: dict, run_at: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._ready, (run_at, self._seq, job['id']))
+        self._wakeup.set()
+
+    async def _changed(self, job: dict) -> None:
+        if self.on_change is not None:
+            await self.on_change(job)
+
+    def _finish(self, job: dict, status: str) -> None:
+        job['status'] = status
+        job['finished_at'] = time.time()
+        heapq.heappush(self._finished, (job['finished_at'], job['id']))
+
+    async def submit(self, kind: str, params: dict, owner_id: Optional[str] = None) -> dict:
+        """
+        Queues a job and returns its record.
+
+        Raises:
+            UnknownJobKind: if no handler is registered for `kind`.
+            ValueError: if the kind's check rejects the params.
+        """
+        if kind not in self._handlers:
+            raise UnknownJobKind(f"Unknown job kind '{kind}'; use one of {', '.join(self.kinds)}.")
+        check = self._checks.get(kind)
+        if check is not None:
+            check(params)
+        now = time.time()
+        job = {
+            'id': str(uuid.uuid4()),
+            'kind': kind,
+            'params': params,
+            'owner_id': owner_id,
+            'status': QUEUED,
+            'progress': 0.0,
+            'done': 0,
+            'total': None,
+            'attempts': 0,
+            'error': None,
+            'result': None,
+            'created_at': now,
+            'run_at': now,
+            'started_at': None,
+            'finished_at': None,
+        }
+        if self.on_submit is not None:
+            await self.on_submit(job)
+        self.jobs[job['id']] = job
+        self._schedule(job, now)
+        return job
+
+    def restore(self, record: Mapping) -> dict:
+        """Adds a stored job; queued jobs, and ones interrupted while running, are scheduled again."""
+        job = dict(record)
+        for field in ('params', 'result'):
+            if isinstance(job.get(field), str):
+                job[field] = json.loads(job[field])
+        self.jobs[job['id']] = job
+        if job['status'] == RUNNING:
+            job['status'] = QUEUED
+        if job['status'] == QUEUED:
+            self._schedule(job, job['run_at'])
+        elif job['status'] in FINISHED:
+            heapq.heappush(self._finished, (job['finished_at'] or job['created_at'], job['id']))
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancels a queued or running job; finished jobs are returned unchanged.
+
+        A running job stops at its next await, normally its next progress report.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job['status'] in FINISHED:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+            return job
+        # its heap entry is skipped when it comes up
+        self._finish(job, CANCELLED)
+        await self._changed(job)
+        return job
+
+    async def prune(self, now: Optional[float] = None) -> int:
+        """Forgets jobs that finished more than `retention_seconds` ago; returns how many."""
+        cutoff = (time.time() if now is None else now) - self.retention_seconds
+        pruned = 0
+        while self._finished and self._finished[0][0] <= cutoff:
+            job = self.jobs.pop(heapq.heappop(self._finished)[1], None)
+            if job is None:
+                continue
+            pruned += 1
+            if self.on_prune is not None:
+                await self.on_prune(job)
+        return pruned
+
+    async def _prune_regularly(self) -> None:
+        while True:
+            try:
+                await self.prune()
+            except Exception as e:
+                print(f"Error: finished jobs could not be pruned: {e}")
+            await asyncio.sleep(PRUNE_INTERVAL)
+
+    async def _next(self) -> dict:
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._ready and self._ready[0][0] <= now:
+                job = self.jobs.get(heapq.heappop(self._ready)[2])
+                if job is not None and job['status'] == QUEUED:
+                    return job
+            timeout = self._ready[0][0] - now if self._ready else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._next()
+            try:
+                await self._run(job)
+            except Exception as e:
+                print(f"Error: job {job['id']} could not be updated: {e}")
+
+    async def _run(self, job: dict) -> None:
+        handler = self._handlers.get(job['kind'])
+        if handler is None:
+            # restored from storage after its kind was removed
+            job['error'] = f"Unknown job kind '{job['kind']}'."
+            self._finish(job, FAILED)
+            await self._changed(job)
+            return
+        job['status'] = RUNNING
+        job['attempts'] += 1
+        job['started_at'] = time.time()
+        job['error'] = None
+        await self._changed(job)
+        task = asyncio.ensure_future(handler(JobContext(self, job), job['params']))
+        self._running[job['id']] = task
+        try:
+            job['result'] = await task
+        except asyncio.CancelledError:
+            if job['id'] not in self._cancelled:
+                # the worker itself is being stopped; the job runs again after a restart
+                task.cancel()
+                raise
+            job['status'] = CANCELLED
+        except Exception as e:
+            job['error'] = str(e) or type(e).__name__
+            if isinstance(e, JobFailed) or job['attempts'] >= self.max_attempts:
+                job['status'] = FAILED
+            else:
+                job['status'] = QUEUED
+                job['run_at'] = time.time() + min(self.max_backoff_seconds,
+                                                  self.backoff_seconds * 2 ** (job['attempts'] - 1))
+                self._schedule(job, job['run_at'])
+        else:
+            job['status'] = SUCCEEDED
+            job['progress'] = 1.0
+        finally:
+            del self._running[job['id']]
+            self._cancelled.discard(job['id'])
+        if job['status'] in FINISHED:
+            self._finish(job, job['status'])
+        await self._changed(job)
+
+    def start(self) -> None:
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._pruner = asyncio.create_task(self._prune_regularly())
+
+    async def stop(self) -> None:
+        if self._pruner is not None:
+            self._pruner.cancel()
+            await asyncio.gather(self._pruner, return_exceptions=True)
+            self._pruner = None
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job['status']] = statuses.get(job['status'], 0) + 1
+        return {"jobs": statuses, "running": len(self._running), "waiting": len(self._ready),
+                "concurrency": self.concurrency, "kinds": self.kinds}
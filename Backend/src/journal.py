@@ -0,0 +1,620 @@
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table
+
+from loader import KINDS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Record = Tuple[str, dict]
+
+ALWAYS = "always"
+GROUP = "group"
+NONE = "none"
+GROUP_WINDOW = 0.002
+MAX_BATCH = 1000
+SNAPSHOT_EVERY = 100_000
+SNAPSHOT_INTERVAL = 600.0
+SNAPSHOT_CHUNK = 5000
+
+SNAPSHOT_FILE = "snapshot.ndjson"
+FOOTER = "__end__"
+SEGMENT_PREFIX = "wal-"
+
+# journal kind of each table, and the field that identifies its records
+TABLE_KINDS = {'users': 'users', 'services': 'services', 'bookings': 'bookings', 'reviews': 'reviews',
+               'subscriptions': 'subscriptions', 'ledger_entries': 'ledger', 'jobs': 'jobs',
+               'revoked_tokens': 'revocations', 'working_hours': 'hours'}
+KEY_FIELDS = {'ledger': 'seq', 'revocations': 'jti', 'hours': 'provider_id'}
+
+
+def encode(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+decode = orjson.loads if orjson is not None else json.loads
+
+
+def fsync_directory(path: str) -> None:
+    # makes a rename or a new file in the directory itself durable (not possible on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def segment_name(first_lsn: int) -> str:
+    return f"{SEGMENT_PREFIX}{first_lsn:020d}.log"
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """(first lsn, path) of every WAL segment, oldest first."""
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(".log"):
+            segments.append((int(name[len(SEGMENT_PREFIX):-4]), os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """
+    Yields the operations in one segment. Stops at a torn last line (no
+    newline, or not valid JSON), which is what a crash mid-write leaves.
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            try:
+                yield decode(line)
+            except ValueError:
+                return
+
+
+def segment_tail(path: str, window: int = 1 << 20) -> Tuple[Optional[int], int]:
+    """
+    Finds the last complete operation of a segment.
+
+    Appends only ever tear at the end, so only the tail is read: lines
+    are checked from the end until one is whole and parses.
+
+    Returns:
+        tuple: (LSN of the last complete operation or None, length of the
+        segment up to the end of it).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = max(0, size - window)
+        f.seek(start)
+        data = f.read()
+    end = len(data)
+    while end > 0:
+        newline = data.rfind(b"\n", 0, end)
+        if newline < 0:
+            break
+        line_start = data.rfind(b"\n", 0, newline) + 1
+        if line_start == 0 and start > 0:
+            # the window starts mid-line; look further back
+            return segment_tail(path, window * 4)
+        try:
+            return decode(data[line_start:newline + 1])['lsn'], start + newline + 1
+        except ValueError:
+            end = line_start
+    if start > 0:
+        return segment_tail(path, window * 4)
+    return None, 0
+
+
+class WriteAheadLog:
+    """
+    Append-only log of mutations, split into segments named by first LSN.
+
+    Each operation is one JSON line with a log sequence number (LSN).
+    append() returns once the operation is as durable as the fsync policy
+    makes it:
+        "always": written and fsynced on its own, one at a time.
+        "group":  group commit; operations arriving within `group_window`
+                  seconds (or up to `max_batch` of them) share one write
+                  and one fsync, so throughput no longer depends on the
+                  disk's fsync latency.
+        "none":   written to the OS page cache only; survives the process
+                  crashing but not the machine.
+    Writes and fsyncs run in a worker thread so the event loop keeps
+    serving requests while the disk catches up. Callers apply a change to
+    memory when append() returns, before their next await; until then the
+    operation counts as unacknowledged, and rotate() keeps it in the range
+    a snapshot replays.
+
+    Attributes:
+        directory (str): where the segments live.
+        policy (str): "always", "group" or "none".
+        next_lsn (int): LSN the next operation will get.
+        appended (int): operations appended since the log was opened.
+        syncs (int): fsyncs (or writes, under "none") since the log was opened.
+    """
+
+    def __init__(self, directory: str, policy: str = GROUP, group_window: float = GROUP_WINDOW,
+                 max_batch: int = MAX_BATCH):
+        if policy not in (ALWAYS, GROUP, NONE):
+            raise ValueError(f"Unknown fsync policy '{policy}'.")
+        self.directory = directory
+        self.policy = policy
+        self.group_window = group_window if policy == GROUP else 0.0
+        self.max_batch = max_batch if policy != ALWAYS else 1
+        self.next_lsn = 1
+        self.appended = 0
+        self.syncs = 0
+        self._fd: Optional[int] = None
+        self._buffer: List[Tuple[bytes, asyncio.Future]] = []
+        self._unacknowledged: Dict[int, None] = {}  # LSNs whose append() has not returned, oldest first
+        self._flusher: Optional[asyncio.Task] = None
+        self._io = asyncio.Lock()
+
+    def open(self) -> None:
+        """Opens the newest segment for appending, cutting off a torn tail left by a crash."""
+        os.makedirs(self.directory, exist_ok=True)
+        segments = list_segments(self.directory)
+        if not segments:
+            self._open_segment(self.next_lsn)
+            return
+        first, path = segments[-1]
+        last, length = segment_tail(path)
+        self.next_lsn = last + 1 if last is not None else first
+        if length != os.path.getsize(path):
+            print(f"Warning: discarding a torn write at the end of {path}")
+            os.truncate(path, length)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+
+    def _open_segment(self, first_lsn: int) -> None:
+        self._fd = os.open(os.path.join(self.directory, segment_name(first_lsn)),
+                           os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        fsync_directory(self.directory)
+
+    def _write(self, fd: int, data: bytes) -> None:
+        os.write(fd, data)
+        if self.policy != NONE:
+            os.fsync(fd)
+
+    async def append(self, op: dict) -> int:
+        """Logs one operation and waits until it is durable; returns its LSN."""
+        lsn = self.next_lsn
+        self.next_lsn += 1
+        self.appended += 1
+        done = asyncio.get_running_loop().create_future()
+        self._buffer.append((encode(dict(op, lsn=lsn)) + b"\n", done))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        self._unacknowledged[lsn] = None
+        try:
+            await done
+        finally:
+            del self._unacknowledged[lsn]
+        return lsn
+
+    async def _flush_loop(self) -> None:
+        while self._buffer:
+            if self.group_window:
+                # let concurrent writers join this batch
+                await asyncio.sleep(self.group_window)
+            async with self._io:
+                await self._flush_locked(self.max_batch)
+
+    async def _flush_locked(self, count: Optional[int] = None) -> None:
+        """Writes the first `count` buffered operations (default: all buffered now), max_batch per write."""
+        remaining = len(self._buffer) if count is None else min(count, len(self._buffer))
+        while remaining > 0:
+            batch = self._buffer[:min(self.max_batch, remaining)]
+            del self._buffer[:len(batch)]
+            remaining -= len(batch)
+            try:
+                await asyncio.to_thread(self._write, self._fd, b"".join(line for line, _ in batch))
+            except Exception as e:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            self.syncs += 1
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+    async def flush(self) -> None:
+        """Waits until everything appended so far is written."""
+        async with self._io:
+            await self._flush_locked()
+
+    async def rotate(self) -> int:
+        """
+        Starts a new segment and returns the LSN a snapshot taken now must
+        replay from: the first LSN of the new segment, or an earlier one
+        whose append() has not returned yet, since its change is not in
+        memory and so not in the snapshot.
+        """
+        async with self._io:
+            await self._flush_locked()
+            # operations appended during the flush are still buffered and go to the new segment
+            first = decode(self._buffer[0][0])['lsn'] if self._buffer else self.next_lsn
+            os.close(self._fd)
+            self._open_segment(first)
+        # nothing awaits between here and the snapshot reading memory
+        return min(next(iter(self._unacknowledged), first), first)
+
+    def drop_before(self, lsn: int) -> int:
+        """Deletes segments whose operations all precede `lsn`; returns how many."""
+        segments = list_segments(self.directory)
+        dropped = 0
+        for (first, path), (next_first, _) in zip(segments, segments[1:]):
+            if next_first <= lsn:
+                os.remove(path)
+                dropped += 1
+        return dropped
+
+    def replay(self, from_lsn: int, until_lsn: Optional[int] = None) -> Iterator[dict]:
+        """Yields the logged operations with from_lsn <= lsn < until_lsn, in order."""
+        segments = list_segments(self.directory)
+        for (_, path), (next_first, _) in zip(segments, segments[1:] + [(None, None)]):
+            if next_first is not None and next_first <= from_lsn:
+                continue
+            for op in read_segment(path):
+                if until_lsn is not None and op['lsn'] >= until_lsn:
+                    return
+                if op['lsn'] >= from_lsn:
+                    yield op
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class PendingChange:
+    """What the WAL tail does to one record: replace it, patch it, or delete it."""
+
+    __slots__ = ("record", "changes", "deleted")
+
+    def __init__(self):
+        self.record: Optional[dict] = None  # set by a put; later patches apply to it
+        self.changes: Dict = {}  # patches to the snapshot's copy when there was no put
+        self.deleted = False
+
+    def apply(self, op: dict) -> None:
+        if op['op'] == 'put':
+            self.record, self.changes, self.deleted = dict(op['record']), {}, False
+        elif op['op'] == 'patch':
+            if self.record is not None:
+                self.record.update(op['changes'])
+            elif not self.deleted:
+                self.changes.update(op['changes'])
+        elif op['op'] == 'delete':
+            self.record, self.changes, self.deleted = None, {}, True
+
+    def merge(self, base: dict) -> Optional[dict]:
+        if self.deleted:
+            return None
+        if self.record is not None:
+            return self.record
+        return dict(base, **self.changes)
+
+
+class JournalStorage:
+    """
+    Durable storage for the in-memory store without a database.
+
+    Has the same coroutine interface as database.Storage, so routes persist
+    through either unchanged. Every write becomes one operation in a
+    write-ahead log (put, patch or delete of a record); nothing is ever
+    rewritten in place. Periodically the live state is written out as a
+    compacted snapshot, atomically (temporary file, fsync, rename), and the
+    WAL segments it covers are deleted.
+
+    Snapshots are fuzzy: the store keeps serving writes while one is
+    written, so it may include some operations logged after its starting
+    LSN. That is safe because operations are idempotent (a put replaces
+    the record, a patch sets fields), so replaying the WAL from the
+    snapshot's starting LSN always ends in the same state.
+
+    Recovery streams the snapshot through the same loader as test data,
+    with the WAL tail folded in per record, so it never holds the data set
+    twice; only the tail is kept in memory while loading.
+
+    Attributes:
+        directory (str): where the snapshot and WAL segments live.
+        wal (WriteAheadLog): the log.
+        snapshot_every (int): operations logged before a new snapshot is due.
+        snapshot_interval (float): seconds before a new snapshot is due, if anything changed.
+        snapshots (int): snapshots written since start.
+    """
+
+    def __init__(self, directory: str, policy: str = GROUP, group_window: float = GROUP_WINDOW,
+                 snapshot_every: int = SNAPSHOT_EVERY, snapshot_interval: float = SNAPSHOT_INTERVAL):
+        self.directory = directory
+        self.wal = WriteAheadLog(directory, policy, group_window)
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.snapshots = 0
+        self.last_snapshot: Optional[dict] = None
+        self._header: Optional[dict] = None
+        self._recover_until = 1
+        self._logged_at_snapshot = 0
+        self._task: Optional[asyncio.Task] = None
+        self._snapshotting = asyncio.Lock()
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    # Storage interface
+
+    async def create_all(self) -> None:
+        self.wal.open()
+        self._recover_until = self.wal.next_lsn
+        self._header = None
+        if os.path.exists(self.snapshot_path):
+            self._header = read_snapshot_header(self.snapshot_path)
+
+    async def dispose(self) -> None:
+        await self.stop()
+        await self.wal.close()
+
+    async def count(self, table: Table) -> int:
+        """Records of a table in the last snapshot; 0 means there is no snapshot to recover from."""
+        if self._header is None:
+            return 0
+        return self._header['counts'].get(TABLE_KINDS[table.name], 0)
+
+    async def insert(self, table: Table, record: dict) -> None:
+        columns = table.c.keys()
+        await self.wal.append({'op': 'put', 'kind': TABLE_KINDS[table.name],
+                               'record': {k: v for k, v in record.items() if k in columns}})
+
+    async def _patch(self, kind: str, key, changes: dict) -> int:
+        await self.wal.append({'op': 'patch', 'kind': kind, 'id': key, 'changes': changes})
+        return 1
+
+    async def update_user(self, user_id: str, **changes) -> int:
+        return await self._patch('users', user_id, changes)
+
+    async def update_service(self, service_id: str, **changes) -> int:
+        return await self._patch('services', service_id, changes)
+
+    async def update_review(self, review_id: str, **changes) -> int:
+        return await self._patch('reviews', review_id, changes)
+
+    async def update_subscription(self, subscription_id: str, **changes) -> int:
+        return await self._patch('subscriptions', subscription_id, changes)
+
+    async def update_job(self, job_id: str, **changes) -> int:
+        return await self._patch('jobs', job_id, changes)
+
+    async def update_booking(self, booking_id: str, expected_version: int = None, **changes) -> int:
+        # the in-memory store is the only writer and has checked the version under the provider lock
+        return await self._patch('bookings', booking_id, changes)
+
+    async def delete_review(self, review_id: str) -> int:
+        await self.wal.append({'op': 'delete', 'kind': 'reviews', 'id': review_id})
+        return 1
+
+    async def delete_job(self, job_id: str) -> int:
+        await self.wal.append({'op': 'delete', 'kind': 'jobs', 'id': job_id})
+        return 1
+
+    async def delete_expired_revocations(self, now: float) -> int:
+        # snapshots only hold live revocations, so expired ones go with the next snapshot
+        return 0
+
+    async def put_working_hours(self, provider_id: str, hours: str) -> None:
+        # a put replaces the provider's earlier hours
+        await self.wal.append({'op': 'put', 'kind': 'hours', 'record': {'provider_id': provider_id, 'hours': hours}})
+
+    def stream_records(self) -> Iterator[Record]:
+        """
+        Yields the recovered state: the last snapshot with the WAL tail applied.
+        Unlike Storage's this is a plain iterator (nothing in it awaits),
+        which the startup loader takes as well.
+        """
+        return self._recover(self._snapshot_records(), self._header['lsn'])
+
+    async def seed_stream(self, records: Iterable[Record]) -> AsyncIterator[Record]:
+        """
+        Passes the initial records through, writing them as the first
+        snapshot. Anything already in the WAL (e.g. written before a crash
+        during the first load) is applied on top.
+        """
+        writer = SnapshotWriter(self.directory, 1)
+        try:
+            for kind, record in self._recover(records, 1, writer.add):
+                yield kind, record
+            await writer.commit()
+        finally:
+            writer.discard()
+        self.snapshots += 1
+
+    # recovery
+
+    def _snapshot_records(self) -> Iterator[Record]:
+        with open(self.snapshot_path, "rb") as f:
+            f.readline()
+            for line in f:
+                kind, record = decode(line)
+                if kind == FOOTER:
+                    return
+                yield kind, record
+
+    def _recover(self, base: Iterable[Record], from_lsn: int,
+                 on_base: Optional[Callable[[str, dict], None]] = None) -> Iterator[Record]:
+        started = time.perf_counter()
+        pending: Dict[str, Dict] = {kind: {} for kind in KINDS}
+        replayed = 0
+        for op in self.wal.replay(from_lsn, self._recover_until):
+            kind = op['kind']
+            key = op['record'][KEY_FIELDS.get(kind, 'id')] if op['op'] == 'put' else op['id']
+            change = pending[kind].get(key)
+            if change is None:
+                change = pending[kind][key] = PendingChange()
+            change.apply(op)
+            replayed += 1
+
+        def created(kind: str) -> Iterator[Record]:
+            # records first put in the WAL tail come after the base records of their kind
+            for change in pending[kind].values():
+                if change.record is not None:
+                    yield kind, change.record
+            pending[kind].clear()
+
+        current = None
+        for kind, record in base:
+            if kind != current:
+                if current is not None:
+                    yield from created(current)
+                current = kind
+            if on_base is not None:
+                on_base(kind, record)
+            change = pending[kind].pop(record[KEY_FIELDS.get(kind, 'id')], None)
+            if change is not None:
+                record = change.merge(record)
+                if record is None:
+                    continue
+            yield kind, record
+        for kind in KINDS:
+            yield from created(kind)
+        print(f"Recovered {replayed} logged operations in {time.perf_counter() - started:.2f}s")
+
+    # snapshots
+
+    async def snapshot(self, records: Iterable[Record]) -> dict:
+        """
+        Writes a compacted snapshot of `records` (the live state) and drops
+        the WAL segments it makes redundant.
+        """
+        async with self._snapshotting:
+            started = time.perf_counter()
+            first_lsn = await self.wal.rotate()
+            self._logged_at_snapshot = self.wal.appended
+            writer = SnapshotWriter(self.directory, first_lsn)
+            try:
+                for count, (kind, record) in enumerate(records, 1):
+                    writer.add(kind, record)
+                    if count % SNAPSHOT_CHUNK == 0:
+                        await writer.write_pending()
+                await writer.commit()
+            finally:
+                writer.discard()
+            # keeps the older segment while unacknowledged operations in it are still to be replayed
+            dropped = self.wal.drop_before(first_lsn)
+            self.snapshots += 1
+            self.last_snapshot = {"lsn": first_lsn, "counts": writer.counts, "segments_dropped": dropped,
+                                  "seconds": round(time.perf_counter() - started, 3)}
+            return self.last_snapshot
+
+    def start(self, source: Callable[[], Iterable[Record]]) -> None:
+        """Writes a snapshot of `source()` whenever one is due, in a background task."""
+        self._task = asyncio.create_task(self._run(source))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, source: Callable[[], Iterable[Record]]) -> None:
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(1)
+            logged = self.wal.appended - self._logged_at_snapshot
+            if logged >= self.snapshot_every or (logged and time.monotonic() - last >= self.snapshot_interval):
+                try:
+                    await self.snapshot(source())
+                except Exception as e:
+                    print(f"Error: writing a snapshot failed: {e}")
+                last = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"policy": self.wal.policy, "next_lsn": self.wal.next_lsn, "appended": self.wal.appended,
+                "syncs": self.wal.syncs, "segments": len(list_segments(self.directory)),
+                "snapshots": self.snapshots, "last_snapshot": self.last_snapshot}
+
+
+class SnapshotWriter:
+    """
+    Streams one snapshot to a temporary file and renames it into place on
+    commit, so a crash leaves either the old snapshot or the new one.
+
+    The file is a header line with the LSN to replay the WAL from, one
+    [kind, record] line per record, and a footer with the record counts.
+    """
+
+    def __init__(self, directory: str, first_lsn: int):
+        self.directory = directory
+        self.path = os.path.join(directory, SNAPSHOT_FILE)
+        self.tmp_path = self.path + ".tmp"
+        self.counts: Dict[str, int] = {}
+        self._lines: List[bytes] = [encode({"lsn": first_lsn, "created_at": time.time()})]
+        self._file = open(self.tmp_path, "wb")
+
+    def add(self, kind: str, record: dict) -> None:
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        self._lines.append(encode([kind, record]))
+        if len(self._lines) >= SNAPSHOT_CHUNK:
+            self._file.write(self._take())
+
+    def _take(self) -> bytes:
+        lines, self._lines = self._lines, []
+        return b"\n".join(lines) + b"\n" if lines else b""
+
+    async def write_pending(self) -> None:
+        # records are encoded on the loop; the disk write happens in a thread
+        await asyncio.to_thread(self._file.write, self._take())
+
+    async def commit(self) -> None:
+        self._lines.append(encode([FOOTER, {"counts": self.counts}]))
+        await asyncio.to_thread(self._finish, self._take())
+
+    def _finish(self, tail: bytes) -> None:
+        self._file.write(tail)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        fsync_directory(self.directory)
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def read_snapshot_header(path: str) -> dict:
+    """The header of a snapshot, with the counts from its footer."""
+    with open(path, "rb") as f:
+        header = decode(f.readline())
+        f.seek(max(0, os.path.getsize(path) - 64 * 1024))
+        kind, footer = decode(f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1])
+    if kind != FOOTER:
+        raise ValueError(f"Snapshot {path} is incomplete.")
+    return dict(header, counts=footer['counts'])
+
+
+def journal_from_env() -> Optional[JournalStorage]:
+    """Returns a JournalStorage for JOURNAL_DIR, or None when no journal is configured."""
+    directory = os.getenv("JOURNAL_DIR")
+    if not directory:
+        return None
+    return JournalStorage(directory, os.getenv("WAL_FSYNC", GROUP),
+                          group_window=float(os.getenv("WAL_GROUP_WINDOW_MS", GROUP_WINDOW * 1000)) / 1000,
+                          snapshot_every=int(os.getenv("SNAPSHOT_EVERY", SNAPSHOT_EVERY)),
+                          snapshot_interval=float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", SNAPSHOT_INTERVAL)))
@@ -0,0 +1,217 @@
+import json
+import time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+Posting = Tuple[str, int]  # (account, amount in cents; positive credits the account)
+
+PLATFORM_FEES = "platform:fees"
+PAYOUTS = "bank:payouts"
+
+
+def consumer_account(user_id: str) -> str:
+    return f"consumer:{user_id}"
+
+
+def provider_account(user_id: str) -> str:
+    return f"provider:{user_id}"
+
+
+class UnbalancedEntry(ValueError):
+    """Raised when an entry's postings do not sum to zero."""
+
+
+class Entry(NamedTuple):
+    seq: int
+    key: str  # idempotency key; posting the same key twice returns the first entry
+    kind: str  # e.g. "booking_payment", "subscription", "refund", "payout"
+    ref: Optional[str]  # id of the booking, subscription or payout it records
+    postings: Tuple[Posting, ...]
+    created_at: float
+
+    def to_dict(self) -> dict:
+        return {
+            'seq': self.seq,
+            'key': self.key,
+            'kind': self.kind,
+            'ref': self.ref,
+            'postings': json.dumps(self.postings),
+            'created_at': self.created_at,
+        }
+
+    @staticmethod
+    def from_dict(record: Mapping) -> "Entry":
+        postings = record['postings']
+        if isinstance(postings, str):
+            postings = json.loads(postings)
+        return Entry(record['seq'], record['key'], record['kind'], record.get('ref'),
+                     tuple((account, int(amount)) for account, amount in postings), record['created_at'])
+
+    def view(self, account: Optional[str] = None) -> dict:
+        """JSON-ready form; with `account`, also the amount this entry moved for it."""
+        data = {'seq': self.seq, 'kind': self.kind, 'ref': self.ref, 'created_at': self.created_at,
+                'postings': [{'account': a, 'amount': amount / 100} for a, amount in self.postings]}
+        if account is not None:
+            data['amount'] = sum(amount for a, amount in self.postings if a == account) / 100
+        return data
+
+
+def check_postings(postings: Sequence[Posting]) -> None:
+    if not postings:
+        raise UnbalancedEntry("An entry needs at least one posting.")
+    for account, amount in postings:
+        if not isinstance(amount, int) or isinstance(amount, bool):
+            raise UnbalancedEntry(f"Posting to '{account}' must be whole cents.")
+    total = sum(amount for _, amount in postings)
+    if total:
+        raise UnbalancedEntry(f"Postings sum to {total} cents, not zero.")
+
+
+class Ledger:
+    """
+    Append-only, double-entry ledger of money movements in whole cents.
+
+    Every entry is a set of postings that sum to zero, so money only ever
+    moves between accounts and the sum of all balances stays zero. Entries
+    are never changed or removed; a refund is a new entry in the opposite
+    direction. Account balances are kept up to date as entries are
+    appended, so reading one is a dictionary lookup rather than a replay;
+    reconcile() replays everything to prove the cache right.
+
+    Attributes:
+        entries (list): every entry, in seq order.
+        balances (dict): account -> balance in cents.
+    """
+
+    def __init__(self):
+        self.entries: List[Entry] = []
+        self.balances: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}  # idempotency key -> index in entries
+        self._history: Dict[str, List[int]] = {}  # account -> indexes of its entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _append(self, entry: Entry) -> Entry:
+        index = len(self.entries)
+        self.entries.append(entry)
+        self._keys[entry.key] = index
+        balances = self.balances
+        for account, amount in entry.postings:
+            balances[account] = balances.get(account, 0) + amount
+            history = self._history.get(account)
+            if history is None:
+                self._history[account] = [index]
+            elif history[-1] != index:
+                history.append(index)
+        return entry
+
+    def post(self, key: str, kind: str, postings: Sequence[Posting], ref: Optional[str] = None) -> Entry:
+        """
+        Appends one balanced entry, unless an entry with this key exists already.
+
+        Returns:
+            Entry: the new entry, or the earlier one with the same key.
+
+        Raises:
+            UnbalancedEntry: if the postings do not sum to zero.
+        """
+        index = self._keys.get(key)
+        if index is not None:
+            return self.entries[index]
+        check_postings(postings)
+        seq = self.entries[-1].seq + 1 if self.entries else 1
+        return self._append(Entry(seq, key, kind, ref, tuple(postings), time.time()))
+
+    def restore(self, record: Mapping) -> Entry:
+        """Appends a stored entry as is; stored entries must be restored in seq order."""
+        return self._append(Entry.from_dict(record))
+
+    def get(self, key: str) -> Optional[Entry]:
+        index = self._keys.get(key)
+        return self.entries[index] if index is not None else None
+
+    def last(self, account: str, kind: str) -> Optional[Entry]:
+        """The account's newest entry of `kind`, found by walking back through its entries."""
+        entries = self.entries
+        for index in reversed(self._history.get(account, ())):
+            if entries[index].kind == kind:
+                return entries[index]
+        return None
+
+    def balance(self, account: str) -> int:
+        return self.balances.get(account, 0)
+
+    def history(self, account: str, limit: int, after: Optional[int] = None) -> Tuple[List[Entry], Optional[int]]:
+        """
+        Returns one page of an account's entries, newest first.
+
+        Args:
+            limit (int): maximum entries to return.
+            after (int): seq of the last entry of the previous page.
+
+        Returns:
+            tuple: (entries, seq to pass as `after` for the next page or None).
+        """
+        indexes = self._history.get(account, [])
+        end = len(indexes)
+        if after is not None:
+            # entries are appended in seq order, so seqs are sorted by index
+            low, high = 0, end
+            while low < high:
+                middle = (low + high) // 2
+                if self.entries[indexes[middle]].seq < after:
+                    low = middle + 1
+                else:
+                    high = middle
+            end = low
+        start = max(0, end - limit)
+        page = [self.entries[i] for i in reversed(indexes[start:end])]
+        return page, (page[-1].seq if start > 0 and page else None)
+
+    def reconcile(self, external: Optional[Iterable[str]] = None) -> dict:
+        """
+        Replays the whole ledger and reports anything that does not add up.
+
+        Args:
+            external (Iterable[str]): idempotency keys the payment gateway
+                says it processed. Every entry is made after exactly one
+                gateway operation with the same key, so the two sets
+                should be equal.
+
+        Returns:
+            dict: counts, the replayed total (always 0 when consistent) and
+            lists of unbalanced entries, balance mismatches and, when
+            `external` is given, keys missing on either side.
+        """
+        replayed: Dict[str, int] = {}
+        unbalanced = []
+        previous = 0
+        out_of_order = []
+        get = replayed.get
+        for entry in self.entries:
+            total = 0
+            for account, amount in entry.postings:
+                replayed[account] = get(account, 0) + amount
+                total += amount
+            if total:
+                unbalanced.append(entry.seq)
+            if entry.seq <= previous:
+                out_of_order.append(entry.seq)
+            previous = entry.seq
+        mismatched = sorted(account for account in set(replayed) | set(self.balances)
+                            if replayed.get(account, 0) != self.balances.get(account, 0))
+        report = {
+            "entries": len(self.entries),
+            "accounts": len(replayed),
+            "total": sum(replayed.values()),
+            "unbalanced": unbalanced,
+            "out_of_order": out_of_order,
+            "mismatched_balances": mismatched,
+        }
+        if external is not None:
+            external = set(external)
+            report["missing_in_ledger"] = sorted(external - self._keys.keys())
+            report["missing_at_gateway"] = sorted(self._keys.keys() - external)
+        report["ok"] = not (report["total"] or unbalanced or out_of_order or mismatched
+                            or report.get("missing_in_ledger") or report.get("missing_at_gateway"))
+        return report
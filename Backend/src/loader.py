@@ -0,0 +1,245 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import AsyncIterable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from models.validation import validate_many
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+KINDS = ('users', 'services', 'bookings', 'reviews', 'subscriptions', 'ledger', 'jobs', 'revocations', 'hours')
+READ_SIZE = 1 << 20
+YIELD_EVERY = 5000
+
+Record = Tuple[str, dict]
+
+
+def iter_ndjson(path: str) -> Iterator[dict]:
+    """Yields one record per non-empty line of an NDJSON file."""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_records(lines: List[Union[str, bytes]], kind: str) -> Tuple[List[dict], Dict[int, dict]]:
+    """
+    Decodes and validates a chunk of NDJSON lines against SCHEMAS[kind].
+
+    Needs nothing but its arguments, so bulk imports can run it in a
+    worker process.
+
+    Returns:
+        tuple: (valid records, position in `lines` -> {field: error message}).
+    """
+    records, positions, invalid = [], [], {}
+    for position, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            invalid[position] = {'line': f"Invalid JSON: {e}"}
+            continue
+        if not isinstance(record, dict):
+            invalid[position] = {'line': "Expected a JSON object."}
+            continue
+        records.append(record)
+        positions.append(position)
+    for index, errors in validate_many(records, kind).items():
+        invalid[positions[index]] = errors
+    return [record for index, record in enumerate(records) if positions[index] not in invalid], invalid
+
+
+def iter_json_sections(path: str, read_size: int = READ_SIZE) -> Iterator[Record]:
+    """
+    Incrementally parses a {"users": [...], "services": [...], ...} document.
+
+    Only one read buffer and one record are held at a time: each array
+    element is decoded with JSONDecoder.raw_decode as soon as it is fully
+    buffered, so memory does not grow with the file size.
+
+    Yields:
+        tuple: (section name, record dict).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, eof
+            if eof:
+                return False
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[position:] + chunk
+            position = 0
+            return True
+
+        def skip_whitespace() -> None:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n':
+                    position += 1
+                if position < len(buffer) or not fill():
+                    return
+
+        def expect(*characters: str) -> str:
+            nonlocal position
+            skip_whitespace()
+            if position >= len(buffer) or buffer[position] not in characters:
+                found = buffer[position:position + 20] or 'end of file'
+                raise ValueError(f"Expected one of {characters} in {path}, found {found!r}")
+            position += 1
+            return buffer[position - 1]
+
+        def decode():
+            nonlocal position
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # a number could be cut off at the buffer edge; make sure it ended
+                if end == len(buffer) and fill():
+                    continue
+                position = end
+                return value
+
+        expect('{')
+        skip_whitespace()
+        if buffer[position:position + 1] == '}':
+            return
+        while True:
+            section = decode()
+            expect(':')
+            expect('[')
+            skip_whitespace()
+            if buffer[position:position + 1] == ']':
+                position += 1
+            else:
+                while True:
+                    yield section, decode()
+                    if expect(',', ']') == ']':
+                        break
+            if expect(',', '}') == '}':
+                return
+
+
+def iter_records(path: str) -> Iterator[Record]:
+    """
+    Yields (kind, record) pairs from a data source on disk.
+
+    Args:
+        path (str): a test_data.json-shaped document, or a directory with
+            users.ndjson, services.ndjson, bookings.ndjson and optionally
+            reviews.ndjson (as written by generate_bulk_data.py), plus
+            any of subscriptions.ndjson, ledger.ndjson, jobs.ndjson,
+            revocations.ndjson and hours.ndjson.
+    """
+    if os.path.isdir(path):
+        for kind in KINDS:
+            file_path = os.path.join(path, f"{kind}.ndjson")
+            if os.path.exists(file_path):
+                for record in iter_ndjson(file_path):
+                    yield kind, record
+        return
+    for section, record in iter_json_sections(path):
+        if section in KINDS:
+            yield section, record
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, where the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StartupLoader:
+    """
+    Streams records into the application indexes and tracks readiness.
+
+    Attributes:
+        status (str): "idle", "loading", "ready" or "failed".
+        counts (dict): records loaded per kind.
+        load_seconds (float): wall time of the last completed load.
+        peak_rss_mb (float): process peak RSS after the load.
+        error (str): error message if the load failed.
+    """
+
+    def __init__(self):
+        self.status = 'idle'
+        self.counts: Dict[str, int] = {}
+        self.load_seconds: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+
+    async def run(self, records: Union[Iterable[Record], AsyncIterable[Record]],
+                  add: Callable[[str, dict], None], metrics_path: Optional[str] = None) -> None:
+        """
+        Feeds every (kind, record) pair to `add`, yielding to the event loop regularly.
+
+        Args:
+            records: sync or async iterable of (kind, record) pairs.
+            add: callback that indexes one record.
+            metrics_path (str): optional file to append a JSON line of load metrics to.
+        """
+        self.status = 'loading'
+        self.counts = {}
+        self.error = None
+        started = time.perf_counter()
+        try:
+            if hasattr(records, '__aiter__'):
+                async for kind, record in records:
+                    self._add(add, kind, record)
+            else:
+                loaded = 0
+                for kind, record in records:
+                    self._add(add, kind, record)
+                    loaded += 1
+                    if loaded % YIELD_EVERY == 0:
+                        # let health checks and other requests run during a background load
+                        await asyncio.sleep(0)
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+            raise
+        self.load_seconds = time.perf_counter() - started
+        self.peak_rss_mb = peak_rss_mb()
+        self.status = 'ready'
+        print(f"Loaded {self.counts} in {self.load_seconds:.2f}s, peak RSS {self.peak_rss_mb} MB")
+        if metrics_path:
+            with open(metrics_path, 'a') as f:
+                f.write(json.dumps(dict(self.report(), timestamp=time.time())) + '\n')
+
+    def _add(self, add: Callable[[str, dict], None], kind: str, record: dict) -> None:
+        add(kind, record)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "counts": self.counts,
+            "load_seconds": self.load_seconds,
+            "peak_rss_mb": self.peak_rss_mb,
+            "error": self.error,
+        }
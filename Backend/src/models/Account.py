@@ -1,8 +1,17 @@
-import re
+import os
 import bcrypt
+from collections import deque
 from datetime import datetime
-from Review import Review
-from Notification import Notification
+from typing import Dict
+from database import Storage, bookings_table, services_table, subscriptions_table
+from models.Review import Review
+from models.Notification import Notification
+from models.ratings import RatingSummary
+from models.validation import (validate_address, validate_dob, validate_email, validate_name, validate_password,
+                               validate_phone, validate_username)
+
+# notifications kept per account; older ones are dropped as new ones arrive
+MAX_NOTIFICATIONS = 200
 
 
 class Account:
@@ -19,9 +28,10 @@ class Account:
         email (str): email address of the user.
         username (str): account username.
         password (str): hashed password.
-        communityRating (float): user community rating.
-        notifications (list): list of Notification objects.
-        reviews (list): list of Review objects.
+        communityRating (float): average rating of the account's reviews, 0.0 without reviews.
+        ratingSummary (RatingSummary): running count, sum and histogram of review ratings.
+        notifications (deque): the latest MAX_NOTIFICATIONS Notification objects.
+        reviews (list): Review objects in the order they were added.
     """
 
     def __init__(self, accountId: str, firstName: str, lastName: str, dob: datetime,
@@ -35,9 +45,10 @@ class Account:
         self.__email = email
         self.__username = username
         self.__password = password
-        self.__communityRating = 0.0
-        self.__notifications = []
-        self.__reviews = []
+        self.__ratingSummary = RatingSummary()
+        self.__notifications = deque(maxlen=MAX_NOTIFICATIONS)
+        # id(review) -> Review, so a review is found and removed without scanning
+        self.__reviews: Dict[int, Review] = {}
 
     # property read only
     @property
@@ -50,7 +61,7 @@ class Account:
 
     @firstName.setter
     def firstName(self, name: str) -> None:
-        self.__validateName(name)
+        validate_name(name)
         self.__firstName = name
 
     @property
@@ -59,7 +70,7 @@ class Account:
 
     @lastName.setter
     def lastName(self, name: str) -> None:
-        self.__validateName(name)
+        validate_name(name)
         self.__lastName = name
 
     @property
@@ -68,8 +79,7 @@ class Account:
 
     @dob.setter
     def dob(self, dob: datetime) -> None:
-        if not isinstance(dob, datetime):
-            raise TypeError("Date of birth must be a datetime object.")
+        validate_dob(dob)
         self.__dob = dob
 
     @property
@@ -78,8 +88,7 @@ class Account:
 
     @address.setter
     def address(self, address: str) -> None:
-        if not isinstance(address, str) or not address.strip():
-            raise ValueError("Address must be a non-empty string.")
+        validate_address(address)
         self.__address = address
 
     @property
@@ -88,8 +97,7 @@ class Account:
 
     @phoneNumber.setter
     def phoneNumber(self, phone: str) -> None:
-        if not re.match(r"^\+?[0-9\s\-]{7,15}$", phone):
-            raise ValueError("Invalid phone number format.")
+        validate_phone(phone)
         self.__phoneNumber = phone
 
     @property
@@ -98,8 +106,7 @@ class Account:
 
     @email.setter
     def email(self, email: str) -> None:
-        if not re.match(r"^[\w\.-]+@[\w\.-]+\.\w+$", email):
-            raise ValueError("Invalid email format.")
+        validate_email(email)
         self.__email = email
 
     @property
@@ -108,8 +115,7 @@ class Account:
 
     @username.setter
     def username(self, username: str) -> None:
-        if not re.match(r"^[A-Za-z0-9_.-]{3,20}$", username):
-            raise ValueError("Username must be 3–20 characters and valid.")
+        validate_username(username)
         self.__username = username
 
     @property
@@ -118,22 +124,27 @@ class Account:
 
     @password.setter
     def password(self, password: str) -> None:
-        self.__validatePassword(password)
-        hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+        validate_password(password)
+        # same cost factor as the API's password service
+        hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(int(os.getenv("BCRYPT_ROUNDS", 12))))
         self.__password = hashed.decode("utf-8")
 
     # property read only
     @property
     def communityRating(self) -> float:
-        return self.__communityRating
+        return self.__ratingSummary.mean or 0.0
+
+    @property
+    def ratingSummary(self) -> RatingSummary:
+        return self.__ratingSummary
 
     @property
-    def notifications(self) -> list:
+    def notifications(self) -> deque:
         return self.__notifications
 
     @property
     def reviews(self) -> list:
-        return self.__reviews
+        return list(self.__reviews.values())
 
     def updateUserDetails(self):
         """
@@ -152,7 +163,7 @@ class Account:
             f"Email: {self.__email}\n"
             f"Phone: {self.__phoneNumber}\n"
             f"Address: {self.__address}\n"
-            f"Community Rating: {self.__communityRating}\n"
+            f"Community Rating: {self.communityRating}\n"
             f"Notifications: {len(self.__notifications)}\n"
             f"Reviews: {len(self.__reviews)}"
         )
@@ -166,11 +177,14 @@ class Account:
         """
         if not isinstance(review, Review):
             raise TypeError("Review must be an instance of Review.")
-        self.__reviews.append(review)
+        if id(review) in self.__reviews:
+            raise ValueError("Review is already on this account.")
+        self.__ratingSummary.add(review.rating)
+        self.__reviews[id(review)] = review
 
     def editReview(self, index: int, newReview: 'Review') -> None:
         """
-        Edits an existing review by index.
+        Edits an existing review by index; the new review takes the old one's place.
 
         Args:
             index (int): index of the review to edit.
@@ -180,7 +194,15 @@ class Account:
             raise TypeError("Review must be an instance of Review.")
         if index < 0 or index >= len(self.__reviews):
             raise IndexError("Invalid review index.")
-        self.__reviews[index] = newReview
+        reviews = list(self.__reviews.values())
+        review = reviews[index]
+        if newReview is not review and id(newReview) in self.__reviews:
+            raise ValueError("Review is already on this account.")
+        self.__ratingSummary.remove(review.rating)
+        self.__ratingSummary.add(newReview.rating)
+        reviews[index] = newReview
+        # rebuilt to keep the order; the rating summary is still updated in O(1)
+        self.__reviews = {id(review): review for review in reviews}
 
     def deleteReview(self, review: 'Review') -> None:
         """
@@ -189,7 +211,10 @@ class Account:
         Args:
             review (Review): a Review object to remove.
         """
-        pass
+        if self.__reviews.get(id(review)) is not review:
+            raise ValueError("Review not found on this account.")
+        self.__ratingSummary.remove(review.rating)
+        del self.__reviews[id(review)]
 
     def deleteNotification(self, notification: 'Notification') -> None:
         """
@@ -198,41 +223,23 @@ class Account:
         Args:
             notification (Notification): a Notification object to remove.
         """
-        pass
-
-    # validation methods
-    @staticmethod
-    def __validateName(name: str) -> None:
-        if not isinstance(name, str):
-            raise TypeError("Name must be a string.")
-        if not name.strip():
-            raise ValueError("Name cannot be empty.")
-        if not re.match(r"^[A-Za-z' -]+$", name):
-            raise ValueError("Name contains invalid characters.")
-
-    @staticmethod
-    def __validatePassword(password: str) -> None:
-        if not isinstance(password, str):
-            raise TypeError("Password must be a string.")
-        if len(password) < 8:
-            raise ValueError("Password must be at least 8 characters.")
-        if not re.search(r"[A-Z]", password):
-            raise ValueError("Password must contain an uppercase letter.")
-        if not re.search(r"[a-z]", password):
-            raise ValueError("Password must contain a lowercase letter.")
-        if not re.search(r"[0-9]", password):
-            raise ValueError("Password must contain a number.")
-        if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
-            raise ValueError("Password must contain a special character.")
+        for index, existing in enumerate(self.__notifications):
+            if existing is notification:
+                del self.__notifications[index]
+                return
+        raise ValueError("Notification not found on this account.")
 
 class Provider(Account):
     """
     Represents a service provider who can offer and manage services.
+
+    Attributes:
+        availableServices (list): the provider's service records, filled by loadServicesFromDatabase.
     """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.availableServices: list = self.loadServicesFromDatabase()
+        self.availableServices: list = []
 
     def createService(self, serviceData: dict) -> None:
         # TODO: Create and save a Service object to DB
@@ -259,19 +266,30 @@ class Provider(Account):
         # TODO: Finalize request in DB and notify Consumer
         print("Service request completed and notification sent.")
 
-    def loadServicesFromDatabase(self) -> list:
-        # TODO: Fetch services from DB
-        return []
+    async def loadServicesFromDatabase(self, storage: Storage) -> list:
+        """
+        Reads the provider's services from the database into availableServices.
+
+        Args:
+            storage (Storage): the API's database storage.
+        """
+        self.availableServices = [service async for service in
+                                  storage.stream(services_table, provider_id=self.accountId)]
+        return self.availableServices
 
 class Consumer(Account):
     """
     Represents a consumer who can apply and subscribe to services.
+
+    Attributes:
+        serviceList (list): the consumer's booking records, filled by loadServiceRequestsFromDatabase.
+        subList (list): the consumer's subscription records, filled by loadSubscriptionsFromDatabase.
     """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.serviceList: list = self.loadServiceRequestsFromDatabase()
-        self.subList: list = self.loadSubscriptionsFromDatabase()
+        self.serviceList: list = []
+        self.subList: list = []
 
     def applyForService(self, service) -> None:
         # TODO: Create and store ServiceRequest in DB
@@ -289,10 +307,24 @@ class Consumer(Account):
         # TODO: Cancel and delete subscription and related ServiceRequest
         print(f"Subscription {subscriptionId} cancelled.")
 
-    def loadServiceRequestsFromDatabase(self) -> list:
-        # TODO: Fetch service requests
-        return []
+    async def loadServiceRequestsFromDatabase(self, storage: Storage) -> list:
+        """
+        Reads the consumer's bookings from the database into serviceList, oldest first.
 
-    def loadSubscriptionsFromDatabase(self) -> list:
-        # TODO: Fetch subscriptions
-        return []
+        Args:
+            storage (Storage): the API's database storage.
+        """
+        self.serviceList = [booking async for booking in
+                            storage.stream(bookings_table, order_by="date", consumer_id=self.accountId)]
+        return self.serviceList
+
+    async def loadSubscriptionsFromDatabase(self, storage: Storage) -> list:
+        """
+        Reads the consumer's subscriptions from the database into subList.
+
+        Args:
+            storage (Storage): the API's database storage.
+        """
+        self.subList = [subscription async for subscription in
+                        storage.stream(subscriptions_table, consumer_id=self.accountId)]
+        return self.subList
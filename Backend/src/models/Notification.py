@@ -1,4 +1,5 @@
 from datetime import datetime
+from models.validation import validate_text, validate_title
 
 class Notification:
     """
@@ -21,12 +22,7 @@ class Notification:
 
     @title.setter
     def title(self, title: str) -> None:
-        if not isinstance(title, str):
-            raise TypeError("Title must be a string.")
-        if not title.strip():
-            raise ValueError("Title cannot be empty.")
-        if len(title) > 100:
-            raise ValueError("Title is too long. Must be less than 100 characters.")
+        validate_title(title)
         self.__title = title
 
     @property
@@ -35,12 +31,7 @@ class Notification:
 
     @description.setter
     def description(self, description: str) -> None:
-        if not isinstance(description, str):
-            raise TypeError("Description must be a string.")
-        if not description.strip():
-            raise ValueError("Description cannot be empty.")
-        if len(description) > 500:
-            raise ValueError("Description is too long. Must be less than 500 characters.")
+        validate_text(description)
         self.__description = description
 
     @property
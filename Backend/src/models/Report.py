@@ -1,5 +1,7 @@
-import re
 from datetime import datetime
+from typing import Iterable, Iterator, Sequence
+from reports import FORMATS, REPORTS, format_for_path, import_report
+from models.validation import validate_report_data, validate_report_type
 
 class Report:
     """
@@ -28,7 +30,7 @@ class Report:
 
     @reportType.setter
     def reportType(self, reportType: str) -> None:
-        self.__validateReportType(reportType)
+        validate_report_type(reportType)
         self.__reportType = reportType
 
     @property
@@ -37,46 +39,71 @@ class Report:
 
     @data.setter
     def data(self, data: dict) -> None:
-        if not isinstance(data, dict):
-            raise TypeError("Data must be a dictionary.")
+        validate_report_data(data)
         self.__data = data
 
     @property
     def timestamp(self) -> datetime:
         return self.__timestamp
 
-    def importReport(self, filePath: str = "hustlrReport.txt") -> None:
+    @property
+    def kind(self) -> str:
+        """The report engine's name for this report type, e.g. "bookings" for "Bookings"."""
+        kind = self.__reportType.strip().lower()
+        if kind not in REPORTS:
+            raise ValueError(f"Reports of type '{self.__reportType}' cannot be exported; "
+                             f"use one of {', '.join(sorted(REPORTS))}.")
+        return kind
+
+    def importReport(self, filePath: str = "hustlrReport.csv") -> Iterator[dict]:
         """
-        Imports report content from a file.
+        Reads an exported report back one row at a time.
+
+        The format follows the file extension (.csv, .ndjson or .hcol) and
+        the file is read with the same streaming reader whichever way it was
+        written, so a report of any size is imported in constant memory.
 
         Args:
-            filePath (str): Path to the file to read. Default is "hustlrReport.txt".
+            filePath (str): Path to the file to read. Default is "hustlrReport.csv".
+
+        Returns:
+            Iterator[dict]: the rows, keyed by column name.
         """
+        kind, reportFormat = self.kind, format_for_path(filePath)
         try:
-            with open(filePath, "r") as file:
-                print(file.read())
+            with open(filePath, "rb") as file:
+                yield from import_report(file, kind, reportFormat)
         except FileNotFoundError:
             print(f"File '{filePath}' not found.")
 
-    def exportReport(self, filePath: str = "hustlrReport.txt") -> None:
+    def exportReport(self, rows: Iterable[Sequence], filePath: str = "hustlrReport.csv") -> int:
         """
-        Exports report content to a file.
+        Streams report rows to a new file in the format of its extension.
+
+        The rows' count and format are recorded in the report's data.
 
         Args:
-            filePath (str): Path to the file to write. Default is "hustlrReport.txt".
+            rows (Iterable[Sequence]): rows in the report type's column order, e.g. from reports.booking_rows.
+            filePath (str): Path to the file to write. Default is "hustlrReport.csv".
+
+        Returns:
+            int: the number of rows written.
         """
+        kind, reportFormat = self.kind, format_for_path(filePath)
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
         try:
-            with open(filePath, "x") as file:
-                file.write(str(self.data))
+            with open(filePath, "xb") as file:
+                for chunk in FORMATS[reportFormat].write(REPORTS[kind], counted()):
+                    file.write(chunk)
         except FileExistsError:
             print(f"File '{filePath}' already exists. Export aborted.")
-
-    # static validation helper
-    @staticmethod
-    def __validateReportType(reportType: str) -> None:
-        if not isinstance(reportType, str):
-            raise TypeError("Report type must be a string.")
-        if not reportType.strip():
-            raise ValueError("Report type cannot be empty.")
-        if not re.fullmatch(r"[A-Za-z\s]+", reportType):
-            raise ValueError("Report type must contain only letters and spaces.")
+            return 0
+        self.data.update(rows=count, format=reportFormat, path=filePath)
+        return count
@@ -1,4 +1,6 @@
 from datetime import datetime
+from models.ratings import check_review_rating
+from models.validation import validate_review_description, validate_review_title
 
 class Review:
     """
@@ -23,12 +25,7 @@ class Review:
 
     @title.setter
     def title(self, title: str) -> None:
-        if not isinstance(title, str):
-            raise TypeError("Title must be a string.")
-        if not title.strip():
-            raise ValueError("Title cannot be empty.")
-        if len(title) > 100:
-            raise ValueError("Title is too long. Must be less than 100 characters.")
+        validate_review_title(title)
         self.__title = title
 
     @property
@@ -37,12 +34,7 @@ class Review:
 
     @description.setter
     def description(self, description: str) -> None:
-        if not isinstance(description, str):
-            raise TypeError("Description must be a string.")
-        if not description.strip():
-            raise ValueError("Description cannot be empty.")
-        if len(description) > 500:
-            raise ValueError("Description is too long. Must be less than 500 characters.")
+        validate_review_description(description)
         self.__description = description
 
     @property
@@ -51,10 +43,7 @@ class Review:
 
     @rating.setter
     def rating(self, rating: int) -> None:
-        if not isinstance(rating, int):
-            raise TypeError("Rating must be an integer.")
-        if rating < 1 or rating > 5:
-            raise ValueError("Rating must be between 1 and 5.")
+        check_review_rating(rating)
         self.__rating = rating
 
     @property
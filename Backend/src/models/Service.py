@@ -1,5 +1,5 @@
-import re
 from datetime import date
+from models.validation import validate_description, validate_price_range, validate_service_type
 
 class Service:
     """
@@ -35,7 +35,7 @@ class Service:
 
     @serviceType.setter
     def serviceType(self, serviceType: str) -> None:
-        self.__validateServiceType(serviceType)
+        validate_service_type(serviceType)
         self.__serviceType = serviceType
 
     # property read only
@@ -49,7 +49,7 @@ class Service:
 
     @description.setter
     def description(self, description: str) -> None:
-        self.__validateDescription(description)
+        validate_description(description)
         self.__description = description
 
     @property
@@ -68,34 +68,20 @@ class Service:
 
     @price.setter
     def price(self, priceRange: tuple[float, float]) -> None:
+        validate_price_range(priceRange)
         minPrice, maxPrice = priceRange
-        if not (isinstance(minPrice, (float, int)) and isinstance(maxPrice, (float, int))):
-            raise TypeError("Prices must be numeric values.")
-        if minPrice < 0 or maxPrice < 0:
-            raise ValueError("Prices must be non-negative.")
-        if minPrice > maxPrice:
-            raise ValueError("Minimum price cannot exceed maximum price.")
         self.__price = (float(minPrice), float(maxPrice))
 
-    def confirmPayment(self) -> None:
-        """Confirms that payment has been made."""
-        print("Payment confirmed.")
-
-    # validation methods
-    @staticmethod
-    def __validateServiceType(serviceType: str) -> None:
-        if not isinstance(serviceType, str):
-            raise TypeError("Service type must be a string.")
-        if not serviceType.strip():
-            raise ValueError("Service type cannot be empty.")
-        if not re.match(r"^[A-Za-z\s]+$", serviceType):
-            raise ValueError("Service type must contain only letters and spaces.")
-
-    @staticmethod
-    def __validateDescription(description: str) -> None:
-        if not isinstance(description, str):
-            raise TypeError("Description must be a string.")
-        if not description.strip():
-            raise ValueError("Description cannot be empty.")
-        if len(description) > 300:
-            raise ValueError("Description is too long. Must be less than 300 characters.")
+    def confirmPayment(self, ledger, paymentKey: str) -> bool:
+        """
+        Confirms that payment has been made.
+
+        Args:
+            ledger (Ledger): the payment ledger (ledger.py).
+            paymentKey (str): key the payment was recorded under, e.g. "booking:<booking id>".
+
+        Returns:
+            bool: True if the ledger holds a payment with that key that has not been refunded.
+        """
+        payment = ledger.get(paymentKey)
+        return payment is not None and ledger.get(f"refund:{paymentKey}") is None
@@ -1,4 +1,5 @@
-import re
+from models.validation import (validate_abn, validate_account_number, validate_bsb, validate_card, validate_expiry,
+                               validate_security_code)
 
 class Wallet:
     """
@@ -28,8 +29,7 @@ class Wallet:
 
     @bsb.setter
     def bsb(self, bsb: str) -> None:
-        if not isinstance(bsb, str) or not re.fullmatch(r"\d{6}", bsb):
-            raise ValueError("BSB must be a 6-digit number.")
+        validate_bsb(bsb)
         self.__bsb = bsb
 
     @property
@@ -38,8 +38,7 @@ class Wallet:
 
     @account.setter
     def account(self, account: str) -> None:
-        if not isinstance(account, str) or not re.fullmatch(r"\d{6,10}", account):
-            raise ValueError("Account number must be between 6 and 10 digits.")
+        validate_account_number(account)
         self.__account = account
 
     @property
@@ -48,9 +47,7 @@ class Wallet:
 
     @abn.setter
     def abn(self, abn: str) -> None:
-        if abn:
-            if not isinstance(abn, str) or not re.fullmatch(r"\d{11}", abn):
-                raise ValueError("ABN must be an 11-digit number.")
+        validate_abn(abn)
         self.__abn = abn
 
     @property
@@ -59,9 +56,7 @@ class Wallet:
 
     @card.setter
     def card(self, card: str) -> None:
-        if card:
-            if not isinstance(card, str) or not re.fullmatch(r"\d{13,19}", card):
-                raise ValueError("Card number must be between 13 and 19 digits.") # mine has 16 so +- 3 seem appropriate?
+        validate_card(card)
         self.__card = card
 
     @property
@@ -70,9 +65,7 @@ class Wallet:
 
     @expiry.setter
     def expiry(self, expiry: str) -> None:
-        if expiry:
-            if not isinstance(expiry, str) or not re.fullmatch(r"(0[1-9]|1[0-2])\/\d{2}", expiry):
-                raise ValueError("Expiry must be in MM/YY format.")
+        validate_expiry(expiry)
         self.__expiry = expiry
 
     @property
@@ -81,9 +74,5 @@ class Wallet:
 
     @securityCode.setter
     def securityCode(self, code: int) -> None:
-        if code is not None:
-            if not isinstance(code, int):
-                raise TypeError("Security code must be an integer.")
-            if not (100 <= code <= 9999):
-                raise ValueError("Security code must be a 3 or 4-digit number.")
+        validate_security_code(code)
         self.__securityCode = code
@@ -0,0 +1,188 @@
+"""
+Running rating aggregates shared by the domain models and the API.
+
+A RatingSummary keeps count, sum and a 1-5 histogram, so adding, editing
+or deleting a review is O(1) and no read iterates over reviews.
+RatingAggregator holds one summary per reviewed account or service and a
+sorted index of Bayesian-smoothed service scores per category.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+MIN_RATING = 1
+MAX_RATING = 5
+ALL_CATEGORIES = "*"
+
+
+def check_review_rating(rating: int) -> None:
+    if not isinstance(rating, int):
+        raise TypeError("Rating must be an integer.")
+    if rating < MIN_RATING or rating > MAX_RATING:
+        raise ValueError("Rating must be between 1 and 5.")
+
+
+class RatingSummary:
+    """
+    Count, sum and histogram of the ratings one target received.
+
+    Attributes:
+        count (int): number of ratings.
+        total (int): sum of the ratings.
+        histogram (list): number of ratings per star value; index 0 is unused.
+    """
+
+    __slots__ = ("count", "total", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.histogram = [0] * (MAX_RATING + 1)
+
+    def add(self, rating: int) -> None:
+        check_review_rating(rating)
+        self.count += 1
+        self.total += rating
+        self.histogram[rating] += 1
+
+    def remove(self, rating: int) -> None:
+        check_review_rating(rating)
+        if not self.histogram[rating]:
+            raise ValueError(f"No {rating} star rating to remove.")
+        self.count -= 1
+        self.total -= rating
+        self.histogram[rating] -= 1
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def score(self, prior_mean: float, prior_weight: float) -> float:
+        """
+        Bayesian average: the mean as if `prior_weight` extra ratings of `prior_mean` had been given.
+
+        A few high ratings do not outrank many slightly lower ones, and a
+        target without ratings scores the prior mean.
+        """
+        return (prior_mean * prior_weight + self.total) / (prior_weight + self.count)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "average": round(self.mean, 2) if self.count else None,
+            "histogram": {stars: self.histogram[stars] for stars in range(MIN_RATING, MAX_RATING + 1)},
+        }
+
+
+class RatingAggregator:
+    """
+    Rating summaries per target and top-rated services per category.
+
+    Each ranked service sits in a sorted list of (-score, id) for its
+    category and one for all categories. A rating change re-scores only
+    that service and moves it with two binary searches, so top-N is a
+    slice of the list. Bulk loads call defer() first and rank() at the
+    end, which builds the lists with one sort instead of an insort per
+    service and review.
+
+    Attributes:
+        prior_mean (float): rating assumed before any reviews arrive.
+        prior_weight (float): how many ratings the prior counts as.
+        summaries (dict): target id (account or service) -> RatingSummary.
+    """
+
+    def __init__(self, prior_mean: float = 3.0, prior_weight: float = 5.0):
+        self.prior_mean = prior_mean
+        self.prior_weight = prior_weight
+        self.summaries: Dict[str, RatingSummary] = {}
+        self._categories: Dict[str, str] = {}  # ranked service id -> category key
+        self._scores: Dict[str, float] = {}
+        self._ranked: Dict[str, List[Tuple[float, str]]] = {ALL_CATEGORIES: []}
+        self._deferred = False
+
+    def summary(self, target_id: str) -> RatingSummary:
+        """The target's summary; an empty one (not stored) if it has no ratings yet."""
+        return self.summaries.get(target_id) or RatingSummary()
+
+    def _summary(self, target_id: str) -> RatingSummary:
+        summary = self.summaries.get(target_id)
+        if summary is None:
+            summary = self.summaries[target_id] = RatingSummary()
+        return summary
+
+    def score(self, target_id: str) -> float:
+        return self.summary(target_id).score(self.prior_mean, self.prior_weight)
+
+    def _unrank(self, target_id: str) -> None:
+        score = self._scores.pop(target_id, None)
+        if score is None:
+            return
+        for key in (ALL_CATEGORIES, self._categories[target_id]):
+            ranked = self._ranked[key]
+            del ranked[bisect_left(ranked, (-score, target_id))]
+
+    def _rank(self, target_id: str) -> None:
+        if self._deferred:
+            return
+        score = self.score(target_id)
+        self._scores[target_id] = score
+        for key in (ALL_CATEGORIES, self._categories[target_id]):
+            insort(self._ranked.setdefault(key, []), (-score, target_id))
+
+    def track(self, service_id: str, category: str) -> None:
+        """Ranks a service in its category; call again when the category changes."""
+        self._unrank(service_id)
+        self._categories[service_id] = category.lower()
+        self._rank(service_id)
+
+    def untrack(self, service_id: str) -> None:
+        self._unrank(service_id)
+        self._categories.pop(service_id, None)
+
+    def _changed(self, target_id: str) -> RatingSummary:
+        if target_id in self._categories and not self._deferred:
+            self._unrank(target_id)
+            self._rank(target_id)
+        return self.summaries[target_id]
+
+    def add(self, target_id: str, rating: int) -> RatingSummary:
+        self._summary(target_id).add(rating)
+        return self._changed(target_id)
+
+    def remove(self, target_id: str, rating: int) -> RatingSummary:
+        self._summary(target_id).remove(rating)
+        return self._changed(target_id)
+
+    def replace(self, target_id: str, old_rating: int, new_rating: int) -> RatingSummary:
+        """Applies an edited review's rating."""
+        check_review_rating(new_rating)
+        summary = self._summary(target_id)
+        summary.remove(old_rating)
+        summary.add(new_rating)
+        return self._changed(target_id)
+
+    def top(self, category: Optional[str] = None, n: int = 10) -> List[Tuple[str, float]]:
+        """Returns up to n (service id, score) pairs, best first; ties go to the lower id."""
+        ranked = self._ranked.get(category.lower() if category else ALL_CATEGORIES, [])
+        return [(target_id, -negative) for negative, target_id in ranked[:n]]
+
+    def set_prior(self, prior_mean: float, prior_weight: Optional[float] = None) -> None:
+        """Changes the prior, e.g. to the site-wide mean, and re-ranks every service."""
+        self.prior_mean = prior_mean
+        if prior_weight is not None:
+            self.prior_weight = prior_weight
+        self.rank()
+
+    def defer(self) -> None:
+        """Stops keeping the rankings current, e.g. during a bulk load, until rank() is called."""
+        self._deferred = True
+
+    def rank(self) -> None:
+        """Scores every tracked service and rebuilds the rankings with one sort per category."""
+        self._deferred = False
+        self._scores = {target_id: self.score(target_id) for target_id in self._categories}
+        self._ranked = {ALL_CATEGORIES: []}
+        for target_id, score in self._scores.items():
+            for key in (ALL_CATEGORIES, self._categories[target_id]):
+                self._ranked.setdefault(key, []).append((-score, target_id))
+        for ranked in self._ranked.values():
+            ranked.sort()
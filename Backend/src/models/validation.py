@@ -0,0 +1,268 @@
+"""
+Shared field validators for the domain models and the API request models.
+
+Patterns are compiled once at import. Each validator raises TypeError or
+ValueError with the message the model setters have always used, so the
+setters, Pydantic models and bulk imports report the same errors.
+"""
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping
+
+NAME_PATTERN = re.compile(r"^[A-Za-z' -]+$")
+PHONE_PATTERN = re.compile(r"^\+?[0-9\s\-]{7,15}$")
+EMAIL_PATTERN = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{3,20}$")
+PASSWORD_RULES = (
+    (re.compile(r"[A-Z]"), "Password must contain an uppercase letter."),
+    (re.compile(r"[a-z]"), "Password must contain a lowercase letter."),
+    (re.compile(r"[0-9]"), "Password must contain a number."),
+    (re.compile(r"[!@#$%^&*(),.?\":{}|<>]"), "Password must contain a special character."),
+)
+LETTERS_PATTERN = re.compile(r"[A-Za-z\s]+")
+BSB_PATTERN = re.compile(r"\d{6}")
+ACCOUNT_NUMBER_PATTERN = re.compile(r"\d{6,10}")
+ABN_PATTERN = re.compile(r"\d{11}")
+CARD_PATTERN = re.compile(r"\d{13,19}")
+EXPIRY_PATTERN = re.compile(r"(0[1-9]|1[0-2])\/\d{2}")
+MAX_SERVICE_DESCRIPTION = 300
+MAX_TITLE = 100
+MAX_TEXT = 500
+
+
+# Account
+def validate_name(name: str) -> None:
+    if not isinstance(name, str):
+        raise TypeError("Name must be a string.")
+    if not name.strip():
+        raise ValueError("Name cannot be empty.")
+    if not NAME_PATTERN.match(name):
+        raise ValueError("Name contains invalid characters.")
+
+
+def validate_dob(dob: datetime) -> None:
+    if not isinstance(dob, datetime):
+        raise TypeError("Date of birth must be a datetime object.")
+
+
+def validate_address(address: str) -> None:
+    if not isinstance(address, str) or not address.strip():
+        raise ValueError("Address must be a non-empty string.")
+
+
+def validate_phone(phone: str) -> None:
+    if not isinstance(phone, str) or not PHONE_PATTERN.match(phone):
+        raise ValueError("Invalid phone number format.")
+
+
+def validate_email(email: str) -> None:
+    if not isinstance(email, str) or not EMAIL_PATTERN.match(email):
+        raise ValueError("Invalid email format.")
+
+
+def validate_username(username: str) -> None:
+    if not isinstance(username, str) or not USERNAME_PATTERN.match(username):
+        raise ValueError("Username must be 3–20 characters and valid.")
+
+
+def validate_password(password: str) -> None:
+    if not isinstance(password, str):
+        raise TypeError("Password must be a string.")
+    if len(password) < 8:
+        raise ValueError("Password must be at least 8 characters.")
+    for pattern, message in PASSWORD_RULES:
+        if not pattern.search(password):
+            raise ValueError(message)
+
+
+# Wallet; abn, card, expiry and securityCode are optional
+def validate_bsb(bsb: str) -> None:
+    if not isinstance(bsb, str) or not BSB_PATTERN.fullmatch(bsb):
+        raise ValueError("BSB must be a 6-digit number.")
+
+
+def validate_account_number(account: str) -> None:
+    if not isinstance(account, str) or not ACCOUNT_NUMBER_PATTERN.fullmatch(account):
+        raise ValueError("Account number must be between 6 and 10 digits.")
+
+
+def validate_abn(abn: str) -> None:
+    if abn and (not isinstance(abn, str) or not ABN_PATTERN.fullmatch(abn)):
+        raise ValueError("ABN must be an 11-digit number.")
+
+
+def validate_card(card: str) -> None:
+    if card and (not isinstance(card, str) or not CARD_PATTERN.fullmatch(card)):
+        raise ValueError("Card number must be between 13 and 19 digits.")
+
+
+def validate_expiry(expiry: str) -> None:
+    if expiry and (not isinstance(expiry, str) or not EXPIRY_PATTERN.fullmatch(expiry)):
+        raise ValueError("Expiry must be in MM/YY format.")
+
+
+def validate_security_code(code: int) -> None:
+    if code is not None:
+        if not isinstance(code, int):
+            raise TypeError("Security code must be an integer.")
+        if not (100 <= code <= 9999):
+            raise ValueError("Security code must be a 3 or 4-digit number.")
+
+
+# Service
+def validate_service_type(service_type: str) -> None:
+    if not isinstance(service_type, str):
+        raise TypeError("Service type must be a string.")
+    if not service_type.strip():
+        raise ValueError("Service type cannot be empty.")
+    if not LETTERS_PATTERN.fullmatch(service_type):
+        raise ValueError("Service type must contain only letters and spaces.")
+
+
+def validate_description(description: str) -> None:
+    if not isinstance(description, str):
+        raise TypeError("Description must be a string.")
+    if not description.strip():
+        raise ValueError("Description cannot be empty.")
+    if len(description) > MAX_SERVICE_DESCRIPTION:
+        raise ValueError("Description is too long. Must be less than 300 characters.")
+
+
+def validate_price(price: float) -> None:
+    if not isinstance(price, (float, int)):
+        raise TypeError("Prices must be numeric values.")
+    if price < 0:
+        raise ValueError("Prices must be non-negative.")
+
+
+def validate_price_range(price_range: tuple) -> None:
+    min_price, max_price = price_range
+    validate_price(min_price)
+    validate_price(max_price)
+    if min_price > max_price:
+        raise ValueError("Minimum price cannot exceed maximum price.")
+
+
+def validate_rating(rating: float) -> None:
+    if rating is not None and not 0 <= rating <= 5:
+        raise ValueError("Rating must be between 0 and 5.")
+
+
+# Titles and message bodies of reviews, notifications and provider updates
+def validate_title(title: str) -> None:
+    if not isinstance(title, str):
+        raise TypeError("Title must be a string.")
+    if not title.strip():
+        raise ValueError("Title cannot be empty.")
+    if len(title) > MAX_TITLE:
+        raise ValueError("Title is too long. Must be less than 100 characters.")
+
+
+def validate_text(description: str) -> None:
+    if not isinstance(description, str):
+        raise TypeError("Description must be a string.")
+    if not description.strip():
+        raise ValueError("Description cannot be empty.")
+    if len(description) > MAX_TEXT:
+        raise ValueError("Description is too long. Must be less than 500 characters.")
+
+
+# Review; the rating is checked by ratings.check_review_rating
+validate_review_title = validate_title
+validate_review_description = validate_text
+
+
+# Report
+def validate_report_type(report_type: str) -> None:
+    if not isinstance(report_type, str):
+        raise TypeError("Report type must be a string.")
+    if not report_type.strip():
+        raise ValueError("Report type cannot be empty.")
+    if not LETTERS_PATTERN.fullmatch(report_type):
+        raise ValueError("Report type must contain only letters and spaces.")
+
+
+def validate_report_data(data: dict) -> None:
+    if not isinstance(data, dict):
+        raise TypeError("Data must be a dictionary.")
+
+
+class RecordSchema:
+    """
+    Validators for the fields of one kind of record.
+
+    Attributes:
+        fields (dict): field name -> validator raising TypeError or ValueError.
+        required (frozenset): fields that must be present.
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[Any], None]], required: Iterable[str] = ()):
+        self.fields = fields
+        self.required: FrozenSet[str] = frozenset(required)
+
+
+SCHEMAS: Dict[str, RecordSchema] = {
+    # domain models, keyed by class name and using their attribute names
+    'Account': RecordSchema({
+        'firstName': validate_name, 'lastName': validate_name, 'dob': validate_dob,
+        'address': validate_address, 'phoneNumber': validate_phone, 'email': validate_email,
+        'username': validate_username, 'password': validate_password,
+    }, required=('firstName', 'lastName', 'email', 'username')),
+    'Wallet': RecordSchema({
+        'bsb': validate_bsb, 'account': validate_account_number, 'abn': validate_abn,
+        'card': validate_card, 'expiry': validate_expiry, 'securityCode': validate_security_code,
+    }, required=('bsb', 'account')),
+    'Service': RecordSchema({
+        'serviceType': validate_service_type, 'description': validate_description, 'price': validate_price_range,
+    }, required=('serviceType', 'description', 'price')),
+    'Report': RecordSchema({
+        'reportType': validate_report_type, 'data': validate_report_data,
+    }, required=('reportType', 'data')),
+    # API records, keyed like the data files (users, services, bookings)
+    'users': RecordSchema({'email': validate_email, 'phone': validate_phone},
+                          required=('id', 'email', 'name', 'type')),
+    'services': RecordSchema({
+        'category': validate_service_type, 'description': validate_description,
+        'price': validate_price, 'rating': validate_rating,
+    }, required=('id', 'name', 'description', 'price', 'provider_id', 'category')),
+    'bookings': RecordSchema({'price': validate_price},
+                             required=('id', 'service_id', 'consumer_id', 'provider_id', 'date', 'time', 'status')),
+}
+
+
+def validate_record(record: Mapping, schema: RecordSchema) -> Dict[str, str]:
+    """Returns field -> error message for every problem in one record (empty if valid)."""
+    errors = {}
+    for field in schema.required:
+        if field not in record:
+            errors[field] = "Field is required."
+    for field, validator in schema.fields.items():
+        if field in record and field not in errors:
+            value = record[field]
+            if value is None and field not in schema.required:
+                continue
+            try:
+                validator(value)
+            except (TypeError, ValueError) as e:
+                errors[field] = str(e)
+    return errors
+
+
+def validate_many(records: Iterable[Mapping], kind: str) -> Dict[int, Dict[str, str]]:
+    """
+    Validates many records of one kind in a single pass without stopping at the first error.
+
+    Args:
+        records (Iterable[Mapping]): record dicts, e.g. parsed from an import file.
+        kind (str): a key of SCHEMAS, such as "Account", "Wallet" or "services".
+
+    Returns:
+        dict: position of each invalid record -> {field: error message}.
+    """
+    schema = SCHEMAS[kind]
+    invalid = {}
+    for position, record in enumerate(records):
+        errors = validate_record(record, schema)
+        if errors:
+            invalid[position] = errors
+    return invalid
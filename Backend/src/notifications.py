@@ -0,0 +1,219 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+INBOX_CAPACITY = 200
+FANOUT_BATCH = 1000
+
+
+class Inbox:
+    """
+    One account's most recent notifications in a fixed-size ring buffer.
+
+    Every notification gets the next sequence number of the inbox, which
+    is also its id and picks its slot (seq % capacity), so lookups and
+    deletes by id are O(1). Once full, each new notification overwrites
+    the oldest. The payload dict is shared by every recipient of a
+    fan-out; only the read flag is per inbox.
+
+    Attributes:
+        capacity (int): notifications kept before the oldest is dropped.
+        next_seq (int): sequence number the next notification will get.
+        total (int): notifications currently held.
+        unread (int): held notifications not yet marked as read.
+    """
+
+    __slots__ = ("capacity", "next_seq", "total", "unread", "_slots")
+
+    def __init__(self, capacity: int = INBOX_CAPACITY):
+        self.capacity = capacity
+        self.next_seq = 0
+        self.total = 0
+        self.unread = 0
+        self._slots: List[Optional[list]] = []  # [seq, payload, read] or None once deleted
+
+    def add(self, payload: dict) -> int:
+        seq = self.next_seq
+        self.next_seq += 1
+        entry = [seq, payload, False]
+        if len(self._slots) < self.capacity:
+            self._slots.append(entry)
+        else:
+            dropped = self._slots[seq % self.capacity]
+            if dropped is not None:
+                self.total -= 1
+                self.unread -= not dropped[2]
+            self._slots[seq % self.capacity] = entry
+        self.total += 1
+        self.unread += 1
+        return seq
+
+    def _entry(self, seq: int) -> Optional[list]:
+        if not self.next_seq - self.capacity <= seq < self.next_seq or seq < 0:
+            return None
+        entry = self._slots[seq % self.capacity]
+        return entry if entry is not None and entry[0] == seq else None
+
+    def get(self, seq: int) -> Optional[dict]:
+        entry = self._entry(seq)
+        return self._view(entry) if entry else None
+
+    def mark_read(self, seq: int) -> bool:
+        entry = self._entry(seq)
+        if entry is None:
+            return False
+        if not entry[2]:
+            entry[2] = True
+            self.unread -= 1
+        return True
+
+    def mark_all_read(self) -> None:
+        for entry in self._slots:
+            if entry is not None:
+                entry[2] = True
+        self.unread = 0
+
+    def delete(self, seq: int) -> bool:
+        entry = self._entry(seq)
+        if entry is None:
+            return False
+        self._slots[seq % self.capacity] = None
+        self.total -= 1
+        self.unread -= not entry[2]
+        return True
+
+    @staticmethod
+    def _view(entry: list) -> dict:
+        return dict(entry[1], id=str(entry[0]), read=entry[2])
+
+    def page(self, limit: int, after: Optional[int] = None,
+             unread_only: bool = False) -> Tuple[List[dict], Optional[str]]:
+        """
+        Returns notifications newest first.
+
+        Args:
+            limit (int): page size.
+            after (int): id of the last notification of the previous page.
+            unread_only (bool): skip notifications already read.
+
+        Returns:
+            tuple: the notifications and the cursor of the next page, if any.
+        """
+        seq = self.next_seq if after is None else min(after, self.next_seq)
+        oldest = max(0, self.next_seq - self.capacity)
+        items = []
+        while seq > oldest and len(items) < limit:
+            seq -= 1
+            entry = self._slots[seq % self.capacity]
+            if entry is not None and entry[0] == seq and not (unread_only and entry[2]):
+                items.append(self._view(entry))
+        return items, (items[-1]['id'] if items and seq > oldest else None)
+
+
+class InboxStore:
+    """
+    Inboxes by account id, created on first delivery.
+
+    Attributes:
+        capacity (int): ring buffer size of each inbox.
+        inboxes (dict): account id -> Inbox.
+    """
+
+    def __init__(self, capacity: int = INBOX_CAPACITY):
+        self.capacity = capacity
+        self.inboxes: Dict[str, Inbox] = {}
+
+    def inbox(self, account_id: str) -> Inbox:
+        inbox = self.inboxes.get(account_id)
+        if inbox is None:
+            inbox = self.inboxes[account_id] = Inbox(self.capacity)
+        return inbox
+
+    def peek(self, account_id: str) -> Optional[Inbox]:
+        return self.inboxes.get(account_id)
+
+    def deliver(self, account_id: str, payload: dict) -> int:
+        return self.inbox(account_id).add(payload)
+
+
+class NotificationPipeline:
+    """
+    Fans notifications out to inboxes from background writer tasks.
+
+    publish() only enqueues; writers take one notification at a time and
+    deliver it to its recipients in batches, yielding to the event loop
+    between batches, so a broadcast to many accounts never stalls request
+    handling. When the queue is full publish() waits, which slows
+    publishers down instead of buffering without bound.
+
+    Attributes:
+        store (InboxStore): where notifications are delivered.
+        batch_size (int): recipients delivered to between yields.
+        writers (int): concurrent writer tasks.
+        delivered (int): deliveries made since start.
+        on_delivered (Callable): called with (recipient ids, payload, inbox ids) after each batch.
+    """
+
+    def __init__(self, store: InboxStore, batch_size: int = FANOUT_BATCH, writers: int = 2,
+                 max_queued: int = 10_000):
+        self.store = store
+        self.batch_size = batch_size
+        self.writers = writers
+        self.max_queued = max_queued
+        self.delivered = 0
+        self.on_delivered: Optional[Callable[[List[str], dict, List[int]], None]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    def payload(title: str, description: str, kind: str = "general", related_id: Optional[str] = None) -> dict:
+        return {
+            'title': title,
+            'description': description,
+            'kind': kind,
+            'related_id': related_id,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(self.max_queued)
+        self._tasks = [asyncio.create_task(self._write()) for _ in range(self.writers)]
+
+    async def stop(self) -> None:
+        """Delivers what is already queued, then stops the writers."""
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def publish(self, recipients: Iterable[str], payload: dict) -> None:
+        recipients = list(dict.fromkeys(recipients))
+        if recipients:
+            await self._queue.put((recipients, payload))
+
+    async def flush(self) -> None:
+        """Waits until everything published so far has been delivered."""
+        await self._queue.join()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _write(self) -> None:
+        while True:
+            recipients, payload = await self._queue.get()
+            try:
+                for start in range(0, len(recipients), self.batch_size):
+                    batch = recipients[start:start + self.batch_size]
+                    ids = [self.store.deliver(account_id, payload) for account_id in batch]
+                    self.delivered += len(batch)
+                    if self.on_delivered is not None:
+                        self.on_delivered(batch, payload, ids)
+                    await asyncio.sleep(0)
+            except Exception as e:
+                print(f"Error: delivering notification '{payload.get('title')}' failed: {e}")
+            finally:
+                self._queue.task_done()
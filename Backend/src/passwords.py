@@ -0,0 +1,124 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+MAX_PASSWORD_BYTES = 72
+
+
+class HashingBusy(Exception):
+    """Raised when too many hash operations are already queued."""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:MAX_PASSWORD_BYTES]
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> str:
+    """Blocking bcrypt hash; runs inside the worker pool."""
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Blocking bcrypt check; a malformed hash never matches."""
+    try:
+        return bcrypt.checkpw(_encode(password), hashed.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Reads the cost factor out of a "$2b$12$..." hash."""
+    parts = hashed.split("$")
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a bounded worker pool.
+
+    bcrypt releases the GIL, so a thread pool already hashes on several
+    cores; a process pool can be chosen instead. At most `workers` hashes
+    run at once and at most `max_pending` more may wait, beyond which
+    calls fail fast with HashingBusy rather than queueing without bound.
+
+    Attributes:
+        rounds (int): bcrypt cost factor for new hashes.
+        workers (int): size of the worker pool.
+        max_pending (int): callers allowed to wait for a free worker.
+    """
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS, workers: Optional[int] = None,
+                 max_pending: int = 256, use_processes: bool = False):
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31.")
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._dummy_hash: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "PasswordHasher":
+        """Reads BCRYPT_ROUNDS, PASSWORD_WORKERS, PASSWORD_MAX_PENDING and PASSWORD_PROCESSES."""
+        return cls(rounds=int(os.getenv("BCRYPT_ROUNDS", DEFAULT_ROUNDS)),
+                   workers=int(os.getenv("PASSWORD_WORKERS", 0)) or None,
+                   max_pending=int(os.getenv("PASSWORD_MAX_PENDING", 256)),
+                   use_processes=os.getenv("PASSWORD_PROCESSES") == "1")
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.workers)
+            self._slots = asyncio.Semaphore(self.workers)
+        if self._slots.locked():
+            if self._waiting >= self.max_pending:
+                raise HashingBusy("Too many password operations in progress.")
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._slots.acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        """
+        Checks a password against a stored hash.
+
+        With no stored hash (unknown user) a dummy hash is checked anyway, so
+        the response time does not reveal whether an account exists.
+        """
+        if hashed is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self.hash("dummy password")
+            await self._run(verify_password, password, self._dummy_hash)
+            return False
+        return await self._run(verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a stored hash was made with a different cost factor than the current one."""
+        return hash_rounds(hashed) != self.rounds
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import os
+import random
+import uuid
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ledger import PAYOUTS, PLATFORM_FEES, Entry, Ledger, consumer_account, provider_account
+
+PAYOUT_CONCURRENCY = 10
+
+
+class PaymentDeclined(Exception):
+    """Raised when the gateway refuses a charge, refund or transfer."""
+
+
+class LocalGateway:
+    """
+    In-process stand-in for a card processor and bank transfer API.
+
+    Behaves like the real thing where it matters to the ledger: calls are
+    asynchronous and take `latency` seconds, a share of them are declined,
+    and every operation is idempotent by key, so retrying a call that
+    timed out never moves money twice. Successful operations can be
+    journalled to `log_path` (one JSON line each), which plays the part of
+    the processor's own records when reconciling.
+
+    Attributes:
+        latency (float): seconds each call takes.
+        decline_rate (float): share of charges declined, 0 to 1.
+        operations (dict): idempotency key -> operation record.
+    """
+
+    def __init__(self, latency: float = 0.0, decline_rate: float = 0.0, log_path: Optional[str] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.decline_rate = decline_rate
+        self.log_path = log_path
+        self.operations: Dict[str, dict] = {}
+        self._random = random.Random(seed)
+        if log_path and os.path.exists(log_path):
+            self.operations.update((op['key'], op) for op in read_gateway_log(log_path))
+
+    async def _call(self, key: str, kind: str, party: str, amount: int, declinable: bool) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        done = self.operations.get(key)
+        if done is not None:
+            return done
+        if amount <= 0:
+            raise PaymentDeclined(f"Invalid amount {amount}.")
+        if declinable and self.decline_rate and self._random.random() < self.decline_rate:
+            raise PaymentDeclined(f"{kind.capitalize()} of {amount / 100:.2f} for {party} was declined.")
+        op = {'id': str(uuid.uuid4()), 'key': key, 'kind': kind, 'party': party, 'amount': amount}
+        self.operations[key] = op
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(op) + "\n")
+        return op
+
+    async def charge(self, key: str, payer: str, amount: int) -> dict:
+        return await self._call(key, "charge", payer, amount, declinable=True)
+
+    async def refund(self, key: str, payee: str, amount: int) -> dict:
+        return await self._call(key, "refund", payee, amount, declinable=False)
+
+    async def transfer(self, key: str, payee: str, amount: int) -> dict:
+        return await self._call(key, "transfer", payee, amount, declinable=True)
+
+
+def read_gateway_log(path: str) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Payments:
+    """
+    Moves money through the gateway and records every movement in the ledger.
+
+    A booking or subscription payment is charged to the consumer and
+    credited to the provider, less the platform fee. Providers are not
+    paid per booking: settle() sends each provider one transfer for
+    everything credited since their last payout, so a busy provider costs
+    one bank transfer per settlement rather than one per job. Only
+    providers credited since the last settlement are visited.
+
+    The idempotency key given to the gateway is also the ledger entry's
+    key, which lets reconciliation match the two one to one. A payout's
+    key names the provider's previous payout, so it only changes once a
+    payout is in the ledger: if the process dies between the transfer and
+    the entry, the next settlement repeats the key, the gateway returns
+    the earlier transfer instead of paying again, and that transfer is
+    what gets recorded.
+
+    Attributes:
+        ledger (Ledger): where movements are recorded.
+        gateway (LocalGateway): where money actually moves.
+        fee_bps (int): platform fee in basis points of each payment.
+        payout_minimum (int): smallest balance, in cents, worth a transfer.
+        on_entry (Callable): awaited with each new entry, e.g. to persist it.
+    """
+
+    def __init__(self, ledger: Ledger, gateway: LocalGateway, fee_bps: int = 0, payout_minimum: int = 1,
+                 concurrency: int = PAYOUT_CONCURRENCY):
+        self.ledger = ledger
+        self.gateway = gateway
+        self.fee_bps = fee_bps
+        self.payout_minimum = max(1, payout_minimum)
+        self.concurrency = concurrency
+        self.on_entry: Optional[Callable[[Entry], Awaitable[None]]] = None
+        self._unsettled: Set[str] = set()  # provider accounts credited since their last payout
+        self._settling = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def restore(self, record: dict) -> None:
+        """Loads a stored ledger entry; providers it credited are settled next time."""
+        entry = self.ledger.restore(record)
+        self._track(entry)
+
+    def _track(self, entry: Entry) -> None:
+        for account, amount in entry.postings:
+            if amount > 0 and account.startswith("provider:"):
+                self._unsettled.add(account)
+
+    async def _record(self, key: str, kind: str, postings: List[Tuple[str, int]], ref: Optional[str]) -> Entry:
+        new = self.ledger.get(key) is None
+        entry = self.ledger.post(key, kind, postings, ref)
+        if new:
+            self._track(entry)
+            if self.on_entry is not None:
+                await self.on_entry(entry)
+        return entry
+
+    async def charge(self, key: str, kind: str, ref: str, consumer_id: str, provider_id: str, amount: int) -> Entry:
+        """
+        Charges a consumer and credits the provider, once per key.
+
+        Raises:
+            PaymentDeclined: if the gateway refuses the charge.
+        """
+        entry = self.ledger.get(key)
+        if entry is not None:
+            return entry
+        await self.gateway.charge(key, consumer_id, amount)
+        fee = amount * self.fee_bps // 10_000
+        postings = [(consumer_account(consumer_id), -amount), (provider_account(provider_id), amount - fee)]
+        if fee:
+            postings.append((PLATFORM_FEES, fee))
+        return await self._record(key, kind, postings, ref)
+
+    async def refund(self, payment_key: str) -> Optional[Entry]:
+        """
+        Reverses a payment in full: the consumer gets it back and the provider
+        and fee accounts give back their shares. A provider already paid out
+        goes negative, which the next settlement deducts.
+
+        Returns:
+            Entry: the refund entry, or None if there is no such payment.
+        """
+        payment = self.ledger.get(payment_key)
+        if payment is None:
+            return None
+        key = f"refund:{payment_key}"
+        refunded = self.ledger.get(key)
+        if refunded is not None:
+            return refunded
+        payer, paid = payment.postings[0]
+        await self.gateway.refund(key, payer.split(":", 1)[1], -paid)
+        return await self._record(key, "refund", [(account, -amount) for account, amount in payment.postings],
+                                  payment.ref)
+
+    async def _pay_out(self, account: str, amount: int) -> Optional[Entry]:
+        previous = self.ledger.last(account, "payout")
+        payout_id = f"{account}:{previous.seq if previous else 0}"
+        key = f"payout:{payout_id}"
+        try:
+            transfer = await self.gateway.transfer(key, account.split(":", 1)[1], amount)
+        except PaymentDeclined as e:
+            print(f"Warning: payout to {account} failed: {e}")
+            self._unsettled.add(account)
+            return None
+        if transfer['amount'] != amount:
+            # a transfer made before a crash; what was credited since is paid next time
+            amount = transfer['amount']
+            self._unsettled.add(account)
+        return await self._record(key, "payout", [(account, -amount), (PAYOUTS, amount)], payout_id)
+
+    async def _drain(self, pending: Iterator[Tuple[str, int]], paid: List[Entry]) -> None:
+        for account, amount in pending:
+            entry = await self._pay_out(account, amount)
+            if entry is not None:
+                paid.append(entry)
+
+    async def settle(self) -> dict:
+        """
+        Pays every provider credited since the last settlement their whole
+        balance, in one transfer each, with at most `concurrency` transfers
+        in flight. Balances below payout_minimum carry over to the next run.
+        """
+        async with self._settling:
+            candidates, self._unsettled = self._unsettled, set()
+            due = []
+            for account in candidates:
+                balance = self.ledger.balance(account)
+                if balance >= self.payout_minimum:
+                    due.append((account, balance))
+                elif balance > 0:
+                    self._unsettled.add(account)
+            paid: List[Entry] = []
+            pending = iter(due)
+            await asyncio.gather(*(self._drain(pending, paid) for _ in range(min(self.concurrency, len(due)))))
+        return {"providers": len(due), "paid": len(paid), "failed": len(due) - len(paid),
+                "amount": sum(entry.postings[1][1] for entry in paid) / 100}
+
+    def start(self, interval: float) -> None:
+        """Settles payouts every `interval` seconds in a background task."""
+        self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.settle()
+            except Exception as e:
+                print(f"Error: payout settlement failed: {e}")
@@ -0,0 +1,157 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from availability import MINUTES_PER_DAY, parse_slot
+
+# bookings in these statuses count as upcoming jobs once their slot is in the future
+UPCOMING_STATUSES = frozenset({'pending', 'confirmed'})
+
+
+def to_cents(price) -> int:
+    # revenue is summed in whole cents so moving a booking back and forth never drifts
+    return round(float(price) * 100)
+
+
+def current_minute() -> int:
+    """Now in the absolute minutes used by parse_slot."""
+    now = datetime.now()
+    return now.toordinal() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+
+
+class BookingEntry(NamedTuple):
+    """What a booking contributes to its provider's stats."""
+    provider_id: str
+    status: str
+    cents: int
+    start: Optional[int]
+
+
+class ProviderStats:
+    """
+    Running totals of one provider's bookings.
+
+    Attributes:
+        counts (dict): status -> number of bookings.
+        revenue (dict): status -> summed booking price in cents.
+        upcoming (list): sorted start minutes of pending and confirmed bookings.
+    """
+
+    __slots__ = ("counts", "revenue", "upcoming")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.revenue: Dict[str, int] = {}
+        self.upcoming: List[int] = []
+
+    def apply(self, entry: BookingEntry, sign: int) -> None:
+        """Adds (sign=1) or takes away (sign=-1) one booking."""
+        self.counts[entry.status] = self.counts.get(entry.status, 0) + sign
+        self.revenue[entry.status] = self.revenue.get(entry.status, 0) + sign * entry.cents
+        if not self.counts[entry.status]:
+            del self.counts[entry.status], self.revenue[entry.status]
+        if entry.status in UPCOMING_STATUSES and entry.start is not None:
+            if sign > 0:
+                insort(self.upcoming, entry.start)
+            else:
+                del self.upcoming[bisect_left(self.upcoming, entry.start)]
+
+    def upcoming_count(self, now: int) -> int:
+        return len(self.upcoming) - bisect_left(self.upcoming, now)
+
+    def to_dict(self, now: int) -> dict:
+        return {
+            "bookings": sum(self.counts.values()),
+            "by_status": dict(self.counts),
+            # earned revenue; the rest is still pending, confirmed or was cancelled
+            "revenue": self.revenue.get('completed', 0) / 100,
+            "revenue_by_status": {status: cents / 100 for status, cents in self.revenue.items()},
+            "upcoming": self.upcoming_count(now),
+        }
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, ProviderStats) and self.counts == other.counts
+                and self.revenue == other.revenue and self.upcoming == other.upcoming)
+
+
+class ProviderStatsIndex:
+    """
+    Per-provider booking stats, maintained as bookings are created and updated.
+
+    Every booking's last known status, price and slot is remembered, so an
+    update takes the old contribution out of the provider's totals and adds
+    the new one; a status change moves the count and revenue between
+    buckets. Reading a provider's stats never touches its bookings.
+
+    Attributes:
+        providers (dict): provider id -> ProviderStats.
+    """
+
+    def __init__(self):
+        self.providers: Dict[str, ProviderStats] = {}
+        self._entries: Dict[str, BookingEntry] = {}  # booking id -> contribution
+
+    @classmethod
+    def from_bookings(cls, bookings: Iterable[Mapping]) -> "ProviderStatsIndex":
+        """Builds the stats from scratch."""
+        index = cls()
+        for booking in bookings:
+            index.add_booking(booking)
+        return index
+
+    @staticmethod
+    def _entry(booking: Mapping) -> BookingEntry:
+        try:
+            start = parse_slot(booking['date'], booking['time'])
+        except ValueError:
+            start = None
+        return BookingEntry(booking['provider_id'], booking['status'], to_cents(booking['price']), start)
+
+    def _apply(self, entry: BookingEntry, sign: int) -> None:
+        stats = self.providers.get(entry.provider_id)
+        if stats is None:
+            stats = self.providers[entry.provider_id] = ProviderStats()
+        stats.apply(entry, sign)
+
+    def add_booking(self, booking: Mapping) -> None:
+        if booking['id'] in self._entries:
+            self.update_booking(booking)
+            return
+        entry = self._entry(booking)
+        self._entries[booking['id']] = entry
+        self._apply(entry, 1)
+
+    def update_booking(self, booking: Mapping) -> None:
+        """Re-counts a booking after its status (or price, date or time) changed."""
+        entry = self._entry(booking)
+        previous = self._entries.get(booking['id'])
+        if previous == entry:
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+        self._entries[booking['id']] = entry
+        self._apply(entry, 1)
+
+    def remove_booking(self, booking_id: str) -> None:
+        entry = self._entries.pop(booking_id, None)
+        if entry is not None:
+            self._apply(entry, -1)
+
+    def get(self, provider_id: str, now: Optional[int] = None) -> dict:
+        stats = self.providers.get(provider_id) or ProviderStats()
+        return stats.to_dict(current_minute() if now is None else now)
+
+    def check(self, bookings: Iterable[Mapping]) -> List[str]:
+        """
+        Compares the maintained stats with stats rebuilt from `bookings`.
+
+        Returns:
+            list: provider ids whose stats differ (empty when consistent).
+        """
+        expected = ProviderStatsIndex.from_bookings(bookings)
+        differing = []
+        for provider_id in self.providers.keys() | expected.providers.keys():
+            actual = self.providers.get(provider_id) or ProviderStats()
+            if actual != (expected.providers.get(provider_id) or ProviderStats()):
+                differing.append(provider_id)
+        return sorted(differing)
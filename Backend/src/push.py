@@ -0,0 +1,148 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+QUEUE_SIZE = 100
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+Message = Tuple[str, dict]
+
+
+class Connection:
+    """
+    One open WebSocket or SSE stream and the messages waiting to be sent to it.
+
+    Messages pushed with the same key coalesce: the newer one replaces the
+    pending one in place, so a client that falls behind gets the latest
+    state of a booking rather than every step. When `max_queued` distinct
+    messages are pending, the overflow policy applies: "drop_oldest"
+    discards the oldest and tells the client how many it missed so it can
+    reload, "disconnect" closes the connection.
+
+    Attributes:
+        user_id (str): account the connection belongs to.
+        max_queued (int): pending messages before the overflow policy applies.
+        overflow (str): "drop_oldest" or "disconnect".
+        dropped (int): messages discarded over the connection's lifetime.
+        closed (bool): set once the connection should stop.
+    """
+
+    __slots__ = ("user_id", "max_queued", "overflow", "dropped", "closed", "_pending", "_ready", "_lost", "_seq")
+
+    def __init__(self, user_id: str, max_queued: int = QUEUE_SIZE, overflow: str = DROP_OLDEST):
+        self.user_id = user_id
+        self.max_queued = max_queued
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._pending: "OrderedDict[Hashable, Message]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._lost = 0  # dropped since the client was last told
+        self._seq = 0
+
+    def push(self, event: str, data: dict, key: Optional[str] = None) -> None:
+        if self.closed:
+            return
+        if key is None:
+            # unkeyed messages never coalesce
+            key = self._seq
+            self._seq += 1
+        if key not in self._pending and len(self._pending) >= self.max_queued:
+            if self.overflow == DISCONNECT:
+                self.close()
+                return
+            self._pending.popitem(last=False)
+            self.dropped += 1
+            self._lost += 1
+        self._pending[key] = (event, data)
+        self._ready.set()
+
+    async def get(self) -> Optional[Message]:
+        """Waits for the next message; returns None once the connection is closed."""
+        while not self._pending and not self._lost and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            return None
+        if self._lost:
+            lost, self._lost = self._lost, 0
+            return "overflow", {"dropped": lost}
+        return self._pending.popitem(last=False)[1]
+
+    def close(self) -> None:
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+
+
+class PushHub:
+    """
+    In-process pub/sub of server-sent messages, keyed by user id.
+
+    Publishing to a user without open connections is a dictionary miss, so
+    producers can publish unconditionally. A user may have several
+    connections (tabs); each gets its own bounded queue, so one slow
+    client never holds up another.
+
+    Attributes:
+        max_queued (int): queue bound given to new connections.
+        overflow (str): overflow policy given to new connections.
+        connections (dict): user id -> set of open Connections.
+    """
+
+    def __init__(self, max_queued: int = QUEUE_SIZE, overflow: str = DROP_OLDEST):
+        if overflow not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown overflow policy '{overflow}'.")
+        self.max_queued = max_queued
+        self.overflow = overflow
+        self.connections: Dict[str, Set[Connection]] = {}
+        self.published = 0
+
+    def connect(self, user_id: str) -> Connection:
+        connection = Connection(user_id, self.max_queued, self.overflow)
+        self.connections.setdefault(user_id, set()).add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        connection.close()
+        connections = self.connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.connections[connection.user_id]
+
+    def publish(self, user_id: str, event: str, data: dict, key: Optional[str] = None) -> None:
+        connections = self.connections.get(user_id)
+        if not connections:
+            return
+        for connection in tuple(connections):
+            connection.push(event, data, key)
+            if connection.closed:
+                self.disconnect(connection)
+        self.published += 1
+
+    def publish_many(self, user_ids: Iterable[str], event: str, data: dict, key: Optional[str] = None) -> None:
+        for user_id in user_ids:
+            if user_id in self.connections:
+                self.publish(user_id, event, data, key)
+
+    def close_all(self) -> None:
+        """Ends every stream, e.g. on shutdown."""
+        for connections in list(self.connections.values()):
+            for connection in tuple(connections):
+                self.disconnect(connection)
+
+    def stats(self) -> dict:
+        connections = [c for group in self.connections.values() for c in group]
+        return {
+            "users": len(self.connections),
+            "connections": len(connections),
+            "published": self.published,
+            "dropped": sum(c.dropped for c in connections),
+        }
+
+
+def sse_frame(event: str, data: str) -> bytes:
+    """Formats one server-sent event; `data` must be a single line of JSON."""
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
@@ -0,0 +1,58 @@
+"""
+Reconciles the stored payment ledger against the gateway's records.
+
+Replays every ledger entry from DATABASE_URL in order, checks that each
+one balances and that the accounts sum to zero, and, when a gateway
+journal is given (GATEWAY_LOG or --gateway-log), that every gateway
+operation has exactly one ledger entry and vice versa. Prints the report
+as JSON and exits with status 1 if anything does not add up.
+
+Usage (from Backend/src):
+    python reconcile.py [--gateway-log gateway.ndjson] [--balances]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from database import ledger_table, storage_from_env
+from ledger import Ledger
+from payments import read_gateway_log
+
+
+async def load_ledger() -> Ledger:
+    storage = storage_from_env()
+    if storage is None:
+        raise SystemExit("Error: DATABASE_URL is not set; the in-memory ledger is not stored anywhere to reconcile.")
+    ledger = Ledger()
+    try:
+        async for row in storage.stream(ledger_table, order_by='seq'):
+            ledger.restore(row)
+    finally:
+        await storage.dispose()
+    return ledger
+
+
+def main() -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Reconcile the payment ledger.")
+    parser.add_argument('--gateway-log', default=os.getenv("GATEWAY_LOG"))
+    parser.add_argument('--balances', action='store_true', help="also print every account balance")
+    args = parser.parse_args()
+
+    ledger = asyncio.run(load_ledger())
+    external = None
+    if args.gateway_log:
+        external = [op['key'] for op in read_gateway_log(args.gateway_log)]
+    report = ledger.reconcile(external)
+    if args.balances:
+        report["balances"] = {account: cents / 100 for account, cents in sorted(ledger.balances.items())}
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, Iterator, Tuple, Union
+import uuid
+
+RecordKey = Union[bytes, str]
+
+
+def pack_id(value: str) -> RecordKey:
+    """
+    Returns the 16-byte form of a canonical (lowercase, hyphenated) UUID string.
+
+    Any other id is returned unchanged, so packing always round-trips
+    exactly through unpack_id.
+    """
+    if isinstance(value, str) and len(value) == 36:
+        try:
+            packed = uuid.UUID(value).bytes
+        except ValueError:
+            return value
+        if unpack_id(packed) == value:
+            return packed
+    return value
+
+
+def unpack_id(value: RecordKey) -> str:
+    if isinstance(value, bytes):
+        h = value.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    return value
+
+
+class InternPool:
+    """Hands out one shared object per distinct value, so repeated values are stored once."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: Dict[Any, Any] = {}
+
+    def __call__(self, value):
+        return self._values.setdefault(value, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class CompactRecord(Mapping):
+    """
+    A record held in `__slots__` instead of a per-item dict.
+
+    Ids are stored as 16-byte UUIDs and low-cardinality strings such as
+    category and status are shared through an InternPool. The record reads
+    like the dict it replaces (record['id'], .get(), dict(record)) and
+    serialises back to the same JSON shape with to_dict(); fields missing
+    from the source dict stay unset and are omitted again.
+
+    Attributes are the stored form, e.g. record.id is bytes; use
+    record['id'] for the string.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+    _field_set: FrozenSet[str] = frozenset()
+    ID_FIELDS: FrozenSet[str] = frozenset()
+    # ids referenced by other records, shared through the id pool
+    SHARED_ID_FIELDS: FrozenSet[str] = frozenset()
+    INTERNED_FIELDS: FrozenSet[str] = frozenset()
+
+    def __getitem__(self, key: str):
+        if key not in self._field_set:
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        return unpack_id(value) if key in self.ID_FIELDS else value
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self.FIELDS if hasattr(self, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        result = {}
+        for field in self.FIELDS:
+            try:
+                value = getattr(self, field)
+            except AttributeError:
+                continue
+            result[field] = unpack_id(value) if field in self.ID_FIELDS else value
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ServiceRecord(CompactRecord):
+    __slots__ = ('id', 'name', 'description', 'price', 'provider_id', 'category',
+                 'image_url', 'rating', 'latitude', 'longitude')
+    FIELDS = __slots__
+    _field_set = frozenset(FIELDS)
+    ID_FIELDS = frozenset({'id', 'provider_id'})
+    SHARED_ID_FIELDS = ID_FIELDS
+    INTERNED_FIELDS = frozenset({'category', 'rating'})
+
+
+class BookingRecord(CompactRecord):
+    __slots__ = ('id', 'service_id', 'consumer_id', 'provider_id', 'date', 'time',
+                 'status', 'price', 'version', 'booked_by')
+    FIELDS = __slots__
+    _field_set = frozenset(FIELDS)
+    ID_FIELDS = frozenset({'id', 'service_id', 'consumer_id', 'provider_id', 'booked_by'})
+    SHARED_ID_FIELDS = frozenset({'service_id', 'consumer_id', 'provider_id', 'booked_by'})
+    INTERNED_FIELDS = frozenset({'date', 'time', 'status'})
+
+
+class RecordStore:
+    """
+    Builds and updates compact records, owning the pools they share.
+
+    Attributes:
+        ids (InternPool): packed ids referenced from more than one record.
+        values (dict): field name -> InternPool of that field's values; kept
+            apart per field so equal values of different types (1 and 1.0)
+            never replace each other.
+    """
+
+    def __init__(self):
+        self.ids = InternPool()
+        self.values: Dict[str, InternPool] = {}
+
+    def service(self, record: Mapping) -> ServiceRecord:
+        return self._fill(ServiceRecord(), record)
+
+    def booking(self, record: Mapping) -> BookingRecord:
+        return self._fill(BookingRecord(), record)
+
+    def update(self, target: CompactRecord, changes: Mapping) -> None:
+        """
+        Sets fields of a record from their JSON values.
+
+        Raises:
+            KeyError: if a field is not part of the record shape.
+        """
+        for field, value in changes.items():
+            if field not in target._field_set:
+                raise KeyError(field)
+            setattr(target, field, self._encode(target, field, value))
+
+    def _fill(self, target: CompactRecord, record: Mapping) -> CompactRecord:
+        for field in target.FIELDS:
+            if field in record:
+                setattr(target, field, self._encode(target, field, record[field]))
+        return target
+
+    def _encode(self, target: CompactRecord, field: str, value):
+        if value is None:
+            return None
+        if field in target.ID_FIELDS:
+            packed = pack_id(value)
+            return self.ids(packed) if field in target.SHARED_ID_FIELDS else packed
+        if field in target.INTERNED_FIELDS:
+            pool = self.values.get(field)
+            if pool is None:
+                pool = self.values[field] = InternPool()
+            return pool(value)
+        return value
@@ -0,0 +1,319 @@
+"""
+Streaming report export and import.
+
+A report is a fixed list of typed columns and an iterator of row tuples.
+Writers turn the rows into byte chunks as they are pulled, and readers
+turn any binary stream back into row dicts block by block, so neither
+side ever holds more than one chunk of a report, whatever its size.
+
+Formats:
+    csv      header row of column names, then one line per row; empty
+             fields read back as None.
+    ndjson   one JSON object per row.
+    columnar compressed column blocks (see write_columnar), a fraction of
+             the size of the text formats for repetitive data such as
+             statuses, dates and provider ids.
+"""
+import csv
+import io
+import json
+import struct
+import zlib
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from ledger import Ledger, provider_account
+from responses import NDJSON, dumps
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library decoder is used instead
+    orjson = None
+
+# rows encoded per chunk of the text formats
+CHUNK_ROWS = 1000
+# rows per block of the columnar format; a block of every column is held while it is written or read
+BLOCK_ROWS = 65_536
+
+COLUMNAR_MAGIC = b"HCOL1\n"
+_COUNT = struct.Struct("<I")
+_TOTAL = struct.Struct("<Q")
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+CONVERTERS: Dict[str, Callable[[str], object]] = {'str': str, 'int': int, 'float': float}
+
+
+class Column(NamedTuple):
+    name: str
+    type: str  # 'str', 'int' or 'float'
+
+
+class ReportFormatError(ValueError):
+    """Raised when a stream is not a well-formed report of the expected format."""
+
+
+BOOKING_COLUMNS = (Column('id', 'str'), Column('service_id', 'str'), Column('consumer_id', 'str'),
+                   Column('provider_id', 'str'), Column('date', 'str'), Column('time', 'str'),
+                   Column('status', 'str'), Column('price', 'float'))
+USER_COLUMNS = (Column('id', 'str'), Column('email', 'str'), Column('name', 'str'), Column('type', 'str'),
+                Column('phone', 'str'), Column('location', 'str'))
+REVENUE_COLUMNS = (Column('provider_id', 'str'), Column('bookings', 'int'), Column('completed', 'int'),
+                   Column('cancelled', 'int'), Column('revenue', 'float'), Column('pending_revenue', 'float'),
+                   Column('balance', 'float'))
+
+REPORTS: Dict[str, Tuple[Column, ...]] = {
+    'bookings': BOOKING_COLUMNS,
+    'users': USER_COLUMNS,
+    'revenue': REVENUE_COLUMNS,
+}
+
+
+# Row sources
+def booking_rows(bookings: Iterable[Mapping]) -> Iterator[tuple]:
+    for booking in bookings:
+        yield (booking['id'], booking['service_id'], booking['consumer_id'], booking['provider_id'],
+               booking['date'], booking['time'], booking['status'], booking['price'])
+
+
+def user_rows(users: Iterable[Mapping]) -> Iterator[tuple]:
+    # never the password hash
+    for user in users:
+        yield (user['id'], user['email'], user['name'], user['type'], user.get('phone'), user.get('location'))
+
+
+def revenue_rows(providers: Iterable[Tuple[str, object]], ledger: Ledger) -> Iterator[tuple]:
+    """
+    One row per provider from the running booking stats and the ledger.
+
+    Args:
+        providers (Iterable): (provider id, ProviderStats) pairs, as in ProviderStatsIndex.providers.
+        ledger (Ledger): supplies each provider's unpaid balance.
+    """
+    for provider_id, stats in providers:
+        counts, revenue = stats.counts, stats.revenue
+        yield (provider_id, sum(counts.values()), counts.get('completed', 0), counts.get('cancelled', 0),
+               revenue.get('completed', 0) / 100,
+               (revenue.get('pending', 0) + revenue.get('confirmed', 0)) / 100,
+               ledger.balance(provider_account(provider_id)) / 100)
+
+
+# Writers
+def write_csv(columns: Sequence[Column], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([column.name for column in columns])
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_ndjson(columns: Sequence[Column], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    names = [column.name for column in columns]
+    batch: List[bytes] = []
+    for row in rows:
+        batch.append(dumps(dict(zip(names, row))))
+        if len(batch) >= CHUNK_ROWS:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+def write_columnar(columns: Sequence[Column], rows: Iterable[Sequence], block_rows: int = BLOCK_ROWS) -> Iterator[bytes]:
+    """
+    Writes rows as blocks of compressed columns.
+
+    Layout: the magic line, a JSON header line with the columns, then
+    blocks of up to `block_rows` rows. A block is its row count (uint32)
+    followed by, for each column, the compressed length (uint32) and the
+    zlib-compressed JSON array of that column's values. Storing a column's
+    values together puts repeated values next to each other, which is what
+    makes them compress well. A zero row count ends the blocks and is
+    followed by the total row count (uint64), so a truncated file is
+    detected on import.
+    """
+    yield COLUMNAR_MAGIC + dumps({'columns': [list(column) for column in columns]}) + b"\n"
+    total = 0
+    block: List[Sequence] = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= block_rows:
+            total += len(block)
+            yield _encode_block(block)
+            block = []
+    if block:
+        total += len(block)
+        yield _encode_block(block)
+    yield _COUNT.pack(0) + _TOTAL.pack(total)
+
+
+def _encode_block(block: List[Sequence]) -> bytes:
+    parts = [_COUNT.pack(len(block))]
+    for values in zip(*block):
+        data = zlib.compress(dumps(values), 6)
+        parts.append(_COUNT.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+# Readers
+class ChunkStream(io.RawIOBase):
+    """A readable binary stream over an iterable of byte chunks, e.g. a writer or a request body."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._current = b""
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._offset >= len(self._current):
+            self._current = next(self._chunks, None)
+            self._offset = 0
+            if self._current is None:
+                self._current = b""
+                return 0
+        size = min(len(buffer), len(self._current) - self._offset)
+        buffer[:size] = self._current[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+
+def stream_of(chunks: Iterable[bytes]) -> BinaryIO:
+    return io.BufferedReader(ChunkStream(chunks), 1 << 16)
+
+
+def read_csv(stream: BinaryIO, columns: Optional[Sequence[Column]] = None) -> Iterator[dict]:
+    """Rows of a CSV report; with `columns`, the header is checked and values converted to their types."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    names = next(reader, None)
+    if names is None:
+        raise ReportFormatError("The CSV report is empty; it has no header row.")
+    converters = [str] * len(names)
+    if columns is not None:
+        if names != [column.name for column in columns]:
+            raise ReportFormatError(f"Unexpected CSV columns {names}.")
+        converters = [CONVERTERS[column.type] for column in columns]
+    for line, values in enumerate(reader, 2):
+        if len(values) != len(names):
+            raise ReportFormatError(f"Line {line} has {len(values)} fields, expected {len(names)}.")
+        try:
+            yield {name: convert(value) if value != "" else None
+                   for name, convert, value in zip(names, converters, values)}
+        except ValueError as e:
+            raise ReportFormatError(f"Line {line}: {e}") from None
+
+
+def read_ndjson(stream: BinaryIO, columns: Optional[Sequence[Column]] = None) -> Iterator[dict]:
+    """Rows of an NDJSON report; with `columns`, each row's fields are checked and values converted to their types."""
+    names = [column.name for column in columns] if columns is not None else None
+    converters = [CONVERTERS[column.type] for column in columns] if columns is not None else None
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            row = _loads(text)
+        except ValueError as e:
+            raise ReportFormatError(f"Line {line}: {e}") from None
+        if names is None:
+            yield row
+            continue
+        if not isinstance(row, dict):
+            raise ReportFormatError(f"Line {line} is not a JSON object.")
+        if row.keys() != set(names):
+            raise ReportFormatError(f"Line {line} has fields {sorted(row)}, expected {names}.")
+        try:
+            row = {name: convert(row[name]) if row[name] is not None else None
+                   for name, convert in zip(names, converters)}
+        except (TypeError, ValueError) as e:
+            raise ReportFormatError(f"Line {line}: {e}") from None
+        yield row
+
+
+def read_columnar(stream: BinaryIO, columns: Optional[Sequence[Column]] = None) -> Iterator[dict]:
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ReportFormatError("Not a columnar report.")
+    try:
+        header = _loads(stream.readline())
+        stored = [Column(*column) for column in header['columns']]
+    except (ValueError, KeyError, TypeError):
+        raise ReportFormatError("The columnar report header is damaged.") from None
+    if columns is not None and stored != list(columns):
+        raise ReportFormatError(f"Unexpected columns {[column.name for column in stored]}.")
+    names = [column.name for column in stored]
+    read = 0
+    while True:
+        count = _COUNT.unpack(_read_exactly(stream, _COUNT.size))[0]
+        if not count:
+            break
+        values = []
+        for _ in names:
+            size = _COUNT.unpack(_read_exactly(stream, _COUNT.size))[0]
+            try:
+                values.append(_loads(zlib.decompress(_read_exactly(stream, size))))
+            except (zlib.error, ValueError):
+                raise ReportFormatError(f"Block at row {read} is damaged.") from None
+        if any(len(column) != count for column in values):
+            raise ReportFormatError(f"Block at row {read} has columns of different lengths.")
+        for row in zip(*values):
+            yield dict(zip(names, row))
+        read += count
+    total = _TOTAL.unpack(_read_exactly(stream, _TOTAL.size))[0]
+    if total != read:
+        raise ReportFormatError(f"The report says {total} rows but {read} were read.")
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ReportFormatError("The columnar report is truncated.")
+    return data
+
+
+class ReportFormat(NamedTuple):
+    write: Callable[[Sequence[Column], Iterable[Sequence]], Iterator[bytes]]
+    read: Callable[[BinaryIO, Optional[Sequence[Column]]], Iterator[dict]]
+    media_type: str
+    extension: str
+
+
+FORMATS: Dict[str, ReportFormat] = {
+    'csv': ReportFormat(write_csv, read_csv, "text/csv", "csv"),
+    'ndjson': ReportFormat(write_ndjson, read_ndjson, NDJSON, "ndjson"),
+    'columnar': ReportFormat(write_columnar, read_columnar, "application/octet-stream", "hcol"),
+}
+
+
+def format_for_path(path: str) -> str:
+    """The format whose extension `path` ends with."""
+    extension = path.rsplit(".", 1)[-1].lower()
+    for name, report_format in FORMATS.items():
+        if report_format.extension == extension:
+            return name
+    raise ReportFormatError(f"Unknown report file extension '.{extension}'; use one of "
+                            f"{', '.join('.' + f.extension for f in FORMATS.values())}.")
+
+
+def export_report(kind: str, rows: Iterable[Sequence], report_format: str) -> Iterator[bytes]:
+    """Encodes the rows of a report kind in a format, chunk by chunk."""
+    return FORMATS[report_format].write(REPORTS[kind], rows)
+
+
+def import_report(stream: BinaryIO, kind: str, report_format: str) -> Iterator[dict]:
+    """
+    Reads a report back one row at a time.
+
+    Raises:
+        ReportFormatError: while iterating, at the first malformed part of the stream.
+    """
+    return FORMATS[report_format].read(stream, REPORTS[kind])
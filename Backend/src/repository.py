@@ -0,0 +1,282 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from records import BookingRecord, CompactRecord, RecordKey, RecordStore, ServiceRecord, pack_id
+
+
+class IndexBucket:
+    """
+    Records sharing one index key, kept in insertion order.
+
+    Each record is stored alongside the global sequence number it was
+    inserted with, so a page after any cursor is found with a binary
+    search and the bucket size doubles as a maintained total count.
+
+    Attributes:
+        records (list): records in insertion order.
+        seqs (list): ascending sequence numbers parallel to records.
+    """
+
+    __slots__ = ("records", "seqs")
+
+    def __init__(self):
+        self.records: List[CompactRecord] = []
+        self.seqs: List[int] = []
+
+    def append(self, seq: int, record: CompactRecord) -> None:
+        self.records.append(record)
+        self.seqs.append(seq)
+
+    def insert(self, seq: int, record: CompactRecord) -> None:
+        """Adds a record at its sequence position (for records moving in from another bucket)."""
+        position = bisect_left(self.seqs, seq)
+        self.records.insert(position, record)
+        self.seqs.insert(position, seq)
+
+    def remove(self, seq: int) -> None:
+        position = bisect_left(self.seqs, seq)
+        if position < len(self.seqs) and self.seqs[position] == seq:
+            del self.records[position], self.seqs[position]
+
+    def page(self, after_seq: Optional[int], limit: int) -> Tuple[List[CompactRecord], bool]:
+        """
+        Returns up to `limit` records inserted after `after_seq`.
+
+        Args:
+            after_seq (int): sequence number of the cursor record, or None for the first page.
+            limit (int): maximum number of records to return.
+
+        Returns:
+            tuple: the page of records and whether more records follow.
+        """
+        start = 0 if after_seq is None else bisect_right(self.seqs, after_seq)
+        end = start + limit
+        return self.records[start:end], end < len(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[CompactRecord]:
+        return iter(self.records)
+
+
+EMPTY_BUCKET = IndexBucket()
+
+
+class Repository:
+    """
+    In-memory store for users, services and bookings with hash indexes.
+
+    Users are kept as plain dicts; services and bookings are converted to
+    compact slotted records (see records.py) that read like dicts and
+    serialise back to the API shape with to_dict(). Every secondary index
+    is updated when a record is added or changed, so route lookups never
+    scan the full lists.
+
+    Attributes:
+        users (dict): user id -> user record.
+        services (dict): packed service id -> ServiceRecord.
+        bookings (dict): packed booking id -> BookingRecord.
+    """
+
+    def __init__(self):
+        self.users: Dict[str, dict] = {}
+        self.services: Dict[RecordKey, ServiceRecord] = {}
+        self.bookings: Dict[RecordKey, BookingRecord] = {}
+        self._store = RecordStore()
+
+        # insertion sequence numbers used as keyset cursors
+        self._next_seq = 0
+        self._seq: Dict[RecordKey, int] = {}
+
+        # secondary indexes
+        self._users_by_email: Dict[str, dict] = {}
+        self._all_services = IndexBucket()
+        self._services_by_provider: Dict[str, IndexBucket] = {}
+        self._services_by_category: Dict[str, IndexBucket] = {}
+        self._services_by_category_provider: Dict[Tuple[str, str], IndexBucket] = {}
+        self._bookings_by_consumer: Dict[str, IndexBucket] = {}
+        self._bookings_by_provider: Dict[str, IndexBucket] = {}
+
+    @classmethod
+    def from_data(cls, users: Iterable[dict] = (), services: Iterable[dict] = (),
+                  bookings: Iterable[dict] = ()) -> "Repository":
+        """
+        Builds a repository from iterables of record dicts.
+
+        Args:
+            users (Iterable[dict]): user records.
+            services (Iterable[dict]): service records.
+            bookings (Iterable[dict]): booking records.
+        """
+        repo = cls()
+        for user in users:
+            repo.add_user(user)
+        for service in services:
+            repo.add_service(service)
+        for booking in bookings:
+            repo.add_booking(booking)
+        return repo
+
+    def _assign_seq(self, key: RecordKey) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq[key] = seq
+        return seq
+
+    def cursor_seq(self, cursor: Optional[str]) -> Optional[int]:
+        """
+        Resolves an `after` cursor (the id of the last record seen) to its sequence number.
+
+        Raises:
+            KeyError: if the cursor does not name a known record.
+        """
+        if cursor is None:
+            return None
+        return self._seq[pack_id(cursor)]
+
+    # users
+    def add_user(self, user: dict) -> dict:
+        self.users[user['id']] = user
+        self._users_by_email[user['email']] = user
+        return user
+
+    def get_user(self, user_id: str) -> Optional[dict]:
+        return self.users.get(user_id)
+
+    def get_user_by_email(self, email: str) -> Optional[dict]:
+        return self._users_by_email.get(email)
+
+    # services
+    def add_service(self, service: Mapping) -> ServiceRecord:
+        service = self._store.service(service)
+        seq = self._assign_seq(service.id)
+        category = service.category.lower()
+        provider_id = service['provider_id']
+        self.services[service.id] = service
+        self._all_services.append(seq, service)
+        self._services_by_provider.setdefault(provider_id, IndexBucket()).append(seq, service)
+        self._services_by_category.setdefault(category, IndexBucket()).append(seq, service)
+        self._services_by_category_provider.setdefault((category, provider_id), IndexBucket()).append(seq, service)
+        return service
+
+    def get_service(self, service_id: str) -> Optional[ServiceRecord]:
+        return self.services.get(pack_id(service_id))
+
+    def update_service(self, service_id: str, **changes) -> Optional[ServiceRecord]:
+        """
+        Updates fields of a service in place, moving it between category buckets if needed.
+
+        Raises:
+            ValueError: if the provider would change.
+        """
+        service = self.get_service(service_id)
+        if service is None:
+            return None
+        if 'provider_id' in changes or 'id' in changes:
+            raise ValueError("Service id and provider cannot be changed.")
+        old_category = service.category.lower()
+        self._store.update(service, changes)
+        category = service.category.lower()
+        if category != old_category:
+            seq = self._seq[service.id]
+            provider_id = service['provider_id']
+            self._services_by_category[old_category].remove(seq)
+            self._services_by_category_provider[(old_category, provider_id)].remove(seq)
+            self._services_by_category.setdefault(category, IndexBucket()).insert(seq, service)
+            self._services_by_category_provider.setdefault((category, provider_id), IndexBucket()).insert(seq, service)
+        return service
+
+    def service_bucket(self, category: Optional[str] = None, provider_id: Optional[str] = None) -> IndexBucket:
+        """
+        Returns the index bucket holding exactly the services matching the filters.
+
+        Args:
+            category (str): case-insensitive category name.
+            provider_id (str): id of the providing user.
+        """
+        if category and provider_id:
+            return self._services_by_category_provider.get((category.lower(), provider_id), EMPTY_BUCKET)
+        if category:
+            return self._services_by_category.get(category.lower(), EMPTY_BUCKET)
+        if provider_id:
+            return self._services_by_provider.get(provider_id, EMPTY_BUCKET)
+        return self._all_services
+
+    def list_services(self, category: Optional[str] = None, provider_id: Optional[str] = None) -> List[ServiceRecord]:
+        """Returns all services matching the optional category and provider filters."""
+        return list(self.service_bucket(category, provider_id))
+
+    def page_services(self, category: Optional[str] = None, provider_id: Optional[str] = None,
+                      limit: int = 50, after: Optional[str] = None) -> Tuple[List[ServiceRecord], Optional[str], int]:
+        """
+        Returns one keyset page of services.
+
+        Args:
+            category (str): case-insensitive category name.
+            provider_id (str): id of the providing user.
+            limit (int): page size.
+            after (str): id of the last service of the previous page.
+
+        Returns:
+            tuple: the page, the cursor for the next page (None on the last page)
+            and the total number of matching services.
+        """
+        return self._page(self.service_bucket(category, provider_id), limit, after)
+
+    # bookings
+    def add_booking(self, booking: Mapping) -> BookingRecord:
+        booking = self._store.booking(booking)
+        if booking.get('version') is None:
+            booking.version = 1
+        seq = self._assign_seq(booking.id)
+        self.bookings[booking.id] = booking
+        self._bookings_by_consumer.setdefault(booking['consumer_id'], IndexBucket()).append(seq, booking)
+        self._bookings_by_provider.setdefault(booking['provider_id'], IndexBucket()).append(seq, booking)
+        return booking
+
+    def get_booking(self, booking_id: str) -> Optional[BookingRecord]:
+        return self.bookings.get(pack_id(booking_id))
+
+    def update_booking(self, booking_id: str, **changes) -> Optional[BookingRecord]:
+        """
+        Updates fields of a booking in place.
+
+        Index buckets hold the same record objects as the primary map, so
+        non-key changes such as status are visible through every index.
+
+        Args:
+            booking_id (str): id of the booking to update.
+            **changes: field names and their new values.
+        """
+        booking = self.get_booking(booking_id)
+        if booking is None:
+            return None
+        if 'consumer_id' in changes or 'provider_id' in changes:
+            raise ValueError("Booking consumer and provider cannot be changed.")
+        self._store.update(booking, changes)
+        return booking
+
+    def booking_bucket(self, user_id: str, user_type: str) -> IndexBucket:
+        index = self._bookings_by_consumer if user_type == 'consumer' else self._bookings_by_provider
+        return index.get(user_id, EMPTY_BUCKET)
+
+    def bookings_for_user(self, user_id: str, user_type: str) -> List[BookingRecord]:
+        """
+        Returns the bookings of a consumer or of a business user.
+
+        Args:
+            user_id (str): id of the user.
+            user_type (str): "consumer", anything else is treated as business.
+        """
+        return list(self.booking_bucket(user_id, user_type))
+
+    def page_bookings(self, user_id: str, user_type: str, limit: int = 50,
+                      after: Optional[str] = None) -> Tuple[List[BookingRecord], Optional[str], int]:
+        """Returns one keyset page of a user's bookings, like page_services."""
+        return self._page(self.booking_bucket(user_id, user_type), limit, after)
+
+    def _page(self, bucket: IndexBucket, limit: int, after: Optional[str]) -> Tuple[List[CompactRecord], Optional[str], int]:
+        items, more = bucket.page(self.cursor_seq(after), limit)
+        next_cursor = items[-1]['id'] if more and items else None
+        return items, next_cursor, len(bucket)
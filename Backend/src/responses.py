@@ -0,0 +1,92 @@
+import json
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+NDJSON = "application/x-ndjson"
+# records encoded per chunk of a streamed response
+STREAM_CHUNK_SIZE = 1000
+
+# the same output FastAPI's JSONResponse produces
+_encode = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Encodes plain JSON data (dicts, lists, strings, numbers, booleans, None) to UTF-8.
+
+    Uses orjson when it is installed. Nothing is converted first, so the
+    payload must already be JSON-shaped, as repository records are.
+    """
+    if orjson is not None:
+        # non-string keys become strings, as with json.dumps
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return _encode(payload).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for data that is already trusted and JSON-shaped.
+
+    Returning an instance from a route skips FastAPI's jsonable_encoder
+    and response validation, which otherwise walk every value of a large
+    list of stored records.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON in accept
+
+
+async def _chunks(records: Iterable, encode: Callable[[Any], Any], ndjson: bool, chunk_size: int) -> AsyncIterator[bytes]:
+    batch = []
+    first = True
+    if not ndjson:
+        yield b"["
+    for record in records:
+        batch.append(dumps(encode(record)))
+        if len(batch) >= chunk_size:
+            yield _join(batch, ndjson, first)
+            batch = []
+            first = False
+    if batch:
+        yield _join(batch, ndjson, first)
+    if not ndjson:
+        yield b"]"
+
+
+def _join(batch: list, ndjson: bool, first: bool) -> bytes:
+    if ndjson:
+        return b"\n".join(batch) + b"\n"
+    body = b",".join(batch)
+    return body if first else b"," + body
+
+
+def stream_json(records: Iterable, encode: Callable[[Any], Any], ndjson: bool = False,
+                chunk_size: int = STREAM_CHUNK_SIZE, headers: Optional[dict] = None) -> StreamingResponse:
+    """
+    Streams records as a JSON array, or as NDJSON (one record per line).
+
+    Only `chunk_size` encoded records are held at a time, so the response
+    never exists in full in memory.
+
+    Args:
+        records (Iterable): the records to send; iterated while the response is written.
+        encode (Callable): turns one record into JSON-shaped data, e.g. a record's to_dict.
+        ndjson (bool): send application/x-ndjson instead of a JSON array.
+        chunk_size (int): records per chunk written to the socket.
+        headers (dict): extra response headers.
+    """
+    return StreamingResponse(_chunks(records, encode, ndjson, chunk_size),
+                             media_type=NDJSON if ndjson else "application/json", headers=headers)
@@ -0,0 +1,168 @@
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Tuple
+
+EDITABLE_FIELDS = frozenset({'rating', 'title', 'comment'})
+
+
+class DuplicateReview(ValueError):
+    """Raised when an author reviews the same target twice."""
+
+
+class ReviewFeed:
+    """
+    Sequence numbers of the reviews under one index key, oldest first.
+
+    Deleting a review only counts it as dead here; the list is compacted
+    once half of it is dead, so deletes are amortised O(1) and a page
+    never walks more than twice its length.
+
+    Attributes:
+        seqs (list): ascending sequence numbers, possibly of deleted reviews.
+        dead (int): how many of seqs belong to deleted reviews.
+    """
+
+    __slots__ = ("seqs", "dead")
+
+    def __init__(self):
+        self.seqs: List[int] = []
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.seqs) - self.dead
+
+
+class ReviewStore:
+    """
+    Reviews of accounts and services, indexed by target and by author.
+
+    Each review gets a stable id and an insertion sequence number. Feeds
+    are returned newest first in keyset pages; the cursor is the sequence
+    number of the last review on a page, so it stays valid when that
+    review is deleted.
+
+    Attributes:
+        reviews (dict): review id -> review record.
+    """
+
+    def __init__(self):
+        self.reviews: Dict[str, dict] = {}
+        self._by_seq: Dict[int, dict] = {}
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._by_target: Dict[str, ReviewFeed] = {}
+        self._by_author: Dict[str, ReviewFeed] = {}
+        self._by_author_target: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def new_record(author_id: str, target_type: str, target_id: str, rating: int,
+                   title: str, comment: str) -> dict:
+        return {
+            'id': str(uuid.uuid4()),
+            'author_id': author_id,
+            'target_type': target_type,
+            'target_id': target_id,
+            'rating': rating,
+            'title': title,
+            'comment': comment,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'updated_at': None,
+        }
+
+    def add(self, review: Mapping) -> dict:
+        """
+        Stores a review record (loaded, or built with new_record).
+
+        Raises:
+            DuplicateReview: if the author already reviewed this target.
+        """
+        key = (review['author_id'], review['target_id'])
+        if key in self._by_author_target:
+            raise DuplicateReview("You have already reviewed this.")
+        record = dict(review)
+        seq = self._next_seq
+        self._next_seq += 1
+        self.reviews[record['id']] = record
+        self._by_seq[seq] = record
+        self._seq[record['id']] = seq
+        self._by_author_target[key] = record['id']
+        for index, key in ((self._by_target, record['target_id']), (self._by_author, record['author_id'])):
+            feed = index.get(key)
+            if feed is None:
+                feed = index[key] = ReviewFeed()
+            feed.seqs.append(seq)
+        return record
+
+    def get(self, review_id: str) -> Optional[dict]:
+        return self.reviews.get(review_id)
+
+    def update(self, review_id: str, **changes) -> Optional[dict]:
+        """Changes the rating, title or comment of a review."""
+        record = self.reviews.get(review_id)
+        if record is None:
+            return None
+        unknown = changes.keys() - EDITABLE_FIELDS
+        if unknown:
+            raise KeyError(f"Reviews cannot change {', '.join(sorted(unknown))}.")
+        record.update(changes)
+        record['updated_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return record
+
+    def delete(self, review_id: str) -> Optional[dict]:
+        record = self.reviews.pop(review_id, None)
+        if record is None:
+            return None
+        seq = self._seq.pop(review_id)
+        del self._by_seq[seq]
+        del self._by_author_target[(record['author_id'], record['target_id'])]
+        for index, key in ((self._by_target, record['target_id']), (self._by_author, record['author_id'])):
+            feed = index[key]
+            feed.dead += 1
+            if not len(feed):
+                del index[key]
+            elif feed.dead * 2 > len(feed.seqs):
+                feed.seqs = [s for s in feed.seqs if s in self._by_seq]
+                feed.dead = 0
+        return record
+
+    def count_for_target(self, target_id: str) -> int:
+        return len(self._by_target.get(target_id, ()))
+
+    def page_for_target(self, target_id: str, limit: int = 50,
+                        after: Optional[str] = None) -> Tuple[List[dict], Optional[str], int]:
+        """Returns one page of the reviews an account or service received, newest first."""
+        return self._page(self._by_target.get(target_id), limit, after)
+
+    def page_by_author(self, author_id: str, limit: int = 50,
+                       after: Optional[str] = None) -> Tuple[List[dict], Optional[str], int]:
+        """Returns one page of the reviews a user wrote, newest first."""
+        return self._page(self._by_author.get(author_id), limit, after)
+
+    def _page(self, feed: Optional[ReviewFeed], limit: int,
+              after: Optional[str]) -> Tuple[List[dict], Optional[str], int]:
+        """
+        Walks a feed backwards from the cursor.
+
+        Returns:
+            tuple: the reviews, the cursor of the next page (None on the last
+            page) and the number of live reviews in the feed.
+
+        Raises:
+            ValueError: if the cursor is malformed.
+        """
+        if feed is None:
+            return [], None, 0
+        position = len(feed.seqs) if after is None else bisect_left(feed.seqs, int(after))
+        items = []
+        while position > 0 and len(items) < limit:
+            position -= 1
+            record = self._by_seq.get(feed.seqs[position])
+            if record is not None:
+                items.append(record)
+        has_more = any(seq in self._by_seq for seq in feed.seqs[max(0, position - feed.dead - 1):position])
+        next_cursor = str(self._seq[items[-1]['id']]) if items and has_more else None
+        return items, next_cursor, len(feed)
+
+    def __len__(self) -> int:
+        return len(self.reviews)
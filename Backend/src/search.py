@@ -0,0 +1,193 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+# BM25 parameters and field/rating weights
+K1 = 1.2
+B = 0.75
+NAME_WEIGHT = 2
+RATING_BOOST = 0.5
+MAX_PREFIX_TERMS = 32
+PENDING_TERMS_LIMIT = 1024
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cases text and splits it into alphanumeric tokens, dropping stop words."""
+    if not text:
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    Inverted index over service names and descriptions with BM25 ranking.
+
+    Postings map each term to {service id: weighted term frequency}, where
+    name occurrences count NAME_WEIGHT times. A sorted vocabulary supports
+    prefix expansion of the last query term for type-ahead; new terms go
+    into a small sorted pending list that is merged into the main list in
+    batches, so indexing stays cheap with millions of distinct terms.
+    Final scores are multiplied by a boost derived from the service rating.
+
+    Attributes:
+        postings (dict): term -> {service id: term frequency}.
+        lengths (dict): service id -> weighted document length.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._ratings: Dict[str, float] = {}
+        self._categories: Dict[str, str] = {}
+        self._vocabulary: List[str] = []
+        self._pending_terms: List[str] = []
+        self._total_length = 0
+
+    @classmethod
+    def from_services(cls, services: Iterable[dict]) -> "SearchIndex":
+        index = cls()
+        for service in services:
+            index.add(service)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, service: dict) -> None:
+        """
+        Indexes a service, replacing any previous entry with the same id.
+
+        Args:
+            service (dict): service record with id, name, description, category and rating.
+        """
+        service_id = service['id']
+        if service_id in self.lengths:
+            self.remove(service_id)
+        frequencies: Dict[str, int] = {}
+        for token in tokenize(service.get('name')):
+            frequencies[token] = frequencies.get(token, 0) + NAME_WEIGHT
+        for token in tokenize(service.get('description')):
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for term, frequency in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._add_term(term)
+            postings[service_id] = frequency
+        length = sum(frequencies.values())
+        self.lengths[service_id] = length
+        self._total_length += length
+        self._terms[service_id] = list(frequencies)
+        self._ratings[service_id] = service.get('rating') or 0.0
+        self._categories[service_id] = service.get('category', '').lower()
+
+    def remove(self, service_id: str) -> None:
+        """Removes a service from the index; unknown ids are ignored."""
+        length = self.lengths.pop(service_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(service_id):
+            postings = self.postings[term]
+            del postings[service_id]
+            if not postings:
+                del self.postings[term]
+                self._remove_term(term)
+        del self._ratings[service_id]
+        del self._categories[service_id]
+
+    def set_rating(self, service_id: str, rating: Optional[float]) -> None:
+        """Updates the rating boost of an indexed service without re-tokenizing it."""
+        if service_id in self._ratings:
+            self._ratings[service_id] = rating or 0.0
+
+    def _add_term(self, term: str) -> None:
+        insort(self._pending_terms, term)
+        if len(self._pending_terms) >= PENDING_TERMS_LIMIT:
+            self._vocabulary.extend(self._pending_terms)
+            self._vocabulary.sort()
+            self._pending_terms = []
+
+    def _remove_term(self, term: str) -> None:
+        for terms in (self._pending_terms, self._vocabulary):
+            position = bisect_left(terms, term)
+            if position < len(terms) and terms[position] == term:
+                del terms[position]
+                return
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """Returns up to MAX_PREFIX_TERMS vocabulary terms starting with prefix, most frequent first."""
+        candidates = []
+        for terms in (self._vocabulary, self._pending_terms):
+            start = bisect_left(terms, prefix)
+            end = bisect_left(terms, prefix + "\uffff", start)
+            candidates.extend(terms[start:end])
+        if len(candidates) <= MAX_PREFIX_TERMS:
+            return candidates
+        return heapq.nlargest(MAX_PREFIX_TERMS, candidates, key=lambda t: len(self.postings[t]))
+
+    def search(self, query: str, limit: int = 20, category: Optional[str] = None,
+               prefix: bool = True) -> List[Tuple[str, float]]:
+        """
+        Ranks services against a free-text query.
+
+        Args:
+            query (str): words to search for.
+            limit (int): maximum number of results.
+            category (str): optional case-insensitive category filter.
+            prefix (bool): treat the last query word as a prefix (type-ahead).
+
+        Returns:
+            list: (service id, score) pairs, best first.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.lengths:
+            return []
+        # each query word contributes its best matching expansion only
+        groups = [[t] for t in tokens[:-1]]
+        groups.append(self.expand_prefix(tokens[-1]) if prefix else [tokens[-1]])
+
+        count = len(self.lengths)
+        lengths = self.lengths
+        categories = self._categories
+        wanted = category.lower() if category else None
+        # BM25 length normalisation K1 * (1 - B + B * length / average), split
+        # into a constant and a per-length slope to keep the inner loop small
+        base = K1 * (1 - B)
+        slope = K1 * B * count / self._total_length
+        scores: Dict[str, float] = {}
+        for terms in groups:
+            best = scores if len(terms) == 1 else {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                weight = (K1 + 1) * math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                if best is scores:
+                    for service_id, frequency in postings.items():
+                        if wanted and categories[service_id] != wanted:
+                            continue
+                        scores[service_id] = scores.get(service_id, 0.0) + \
+                            weight * frequency / (frequency + base + slope * lengths[service_id])
+                    continue
+                for service_id, frequency in postings.items():
+                    if wanted and categories[service_id] != wanted:
+                        continue
+                    score = weight * frequency / (frequency + base + slope * lengths[service_id])
+                    if score > best.get(service_id, 0.0):
+                        best[service_id] = score
+            if best is not scores:
+                for service_id, score in best.items():
+                    scores[service_id] = scores.get(service_id, 0.0) + score
+
+        ratings = self._ratings
+        return heapq.nlargest(
+            limit,
+            ((sid, score * (1 + RATING_BOOST * ratings[sid] / 5)) for sid, score in scores.items()),
+            key=lambda pair: pair[1])
@@ -0,0 +1,50 @@
+"""
+Shared setup for the API tests.
+
+Run from Backend:
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, "src"))
+
+# Main reads its configuration at import: a throwaway SQLite database, so the
+# routes under test await real I/O and requests interleave as they do in production
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.pop("JOURNAL_DIR", None)
+os.environ["DATA_PATH"] = os.path.join(BACKEND, "test_data.json")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+
+@pytest.fixture
+def client():
+    """A TestClient with the app started, i.e. the data loaded."""
+    from fastapi.testclient import TestClient
+    import Main
+    with TestClient(Main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def marketplace(client):
+    """A new provider with one service and a consumer, with a bearer header for each."""
+    import Main
+    provider_id, consumer_id = str(uuid.uuid4()), str(uuid.uuid4())
+    provider = Main.repo.add_user({'id': provider_id, 'email': f"{provider_id}@test.dev", 'name': "Provider",
+                                   'type': 'business'})
+    consumer = Main.repo.add_user({'id': consumer_id, 'email': f"{consumer_id}@test.dev", 'name': "Consumer",
+                                   'type': 'consumer'})
+    service = Main.repo.add_service({'id': str(uuid.uuid4()), 'name': "Cleaning", 'description': "Test",
+                                     'price': 80.0, 'provider_id': provider_id, 'category': "Cleaning"})
+
+    def headers(user) -> dict:
+        return {"Authorization": f"Bearer {Main.tokens.issue(user)[0]}"}
+
+    return {'provider': provider, 'consumer': consumer, 'service': service,
+            'provider_headers': headers(provider), 'consumer_headers': headers(consumer)}
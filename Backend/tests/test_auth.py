@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import Main
+from auth import InvalidToken, RevocationList, TokenService
+
+CONSUMER = {"email": "zqoVOTmt@gmail.com", "password": "Password123!"}
+
+
+def test_tokens_decode_until_revoked():
+    tokens = TokenService("secret")
+    access, refresh = tokens.issue({'id': "u1", 'type': 'consumer'})
+    claims = tokens.decode(access)
+    assert claims['sub'] == "u1" and claims['type'] == "access"
+    assert tokens.decode(refresh, "refresh")['sub'] == "u1"
+    with pytest.raises(InvalidToken):
+        tokens.decode(refresh)  # a refresh token is not an access token
+    assert tokens.revoke(claims)
+    assert not tokens.revoke(claims)
+    with pytest.raises(InvalidToken):
+        tokens.decode(access)
+
+
+def test_tokens_signed_with_another_key_are_refused():
+    access, _ = TokenService("other").issue({'id': "u1", 'type': 'consumer'})
+    with pytest.raises(InvalidToken):
+        TokenService("secret").decode(access)
+
+
+def test_revocations_are_forgotten_once_expired():
+    revoked = RevocationList(rebuild_after=1)
+    now = time.time()
+    assert revoked.revoke("old", int(now) + 1)
+    assert revoked.revoke("live", int(now) + 3600)
+    assert not revoked.revoke("expired", int(now) - 1)
+    revoked.prune(now + 2)
+    assert not revoked.is_revoked("old") and revoked.is_revoked("live")
+    assert revoked.items() == [("live", int(now) + 3600)]
+
+
+def test_refresh_rotates_the_token_pair(client):
+    login = client.post("/api/auth/login", params=CONSUMER).json()
+    rotated = client.post("/api/auth/refresh", json={"refreshToken": login['refreshToken']})
+    assert rotated.status_code == 200
+    # refresh tokens are single use
+    assert client.post("/api/auth/refresh", json={"refreshToken": login['refreshToken']}).status_code == 401
+    again = client.post("/api/auth/refresh", json={"refreshToken": rotated.json()['refreshToken']})
+    assert again.status_code == 200
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {again.json()['token']}"}).status_code == 200
+
+
+def test_logout_revokes_both_tokens_across_restarts(client):
+    login = client.post("/api/auth/login", params=CONSUMER).json()
+    headers = {"Authorization": f"Bearer {login['token']}"}
+    assert client.post("/api/auth/logout", json={"refreshToken": login['refreshToken']},
+                       headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refreshToken": login['refreshToken']}).status_code == 401
+
+    # a second startup loads the stored revocations back
+    with TestClient(Main.app) as restarted:
+        assert restarted.get("/api/auth/me", headers=headers).status_code == 401
+        assert restarted.post("/api/auth/refresh", json={"refreshToken": login['refreshToken']}).status_code == 401
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+from collections import Counter
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+import Main
+from availability import SLOT_MINUTES, AvailabilityIndex, parse_slot
+
+MONDAY = "2031-03-03"
+
+
+def booking(marketplace, day=MONDAY, time="10:00") -> dict:
+    return {'id': str(uuid.uuid4()), 'service_id': marketplace['service']['id'],
+            'consumer_id': marketplace['consumer']['id'], 'provider_id': marketplace['provider']['id'],
+            'date': day, 'time': time, 'status': 'pending'}
+
+
+def test_overlapping_slots_conflict():
+    index = AvailabilityIndex()
+    index.add_booking({'id': "b1", 'provider_id': "p1", 'date': MONDAY, 'time': "10:00", 'status': 'confirmed'})
+    start = parse_slot(MONDAY, "10:00")
+    assert index.find_conflict("p1", start) == "b1"
+    assert index.find_conflict("p1", start + SLOT_MINUTES // 2) == "b1"
+    assert index.find_conflict("p1", start + SLOT_MINUTES) is None
+    assert index.find_conflict("p1", start - SLOT_MINUTES) is None
+    assert index.find_conflict("p2", start) is None
+
+
+def test_cancelled_bookings_free_their_slot():
+    index = AvailabilityIndex()
+    index.add_booking({'id': "b1", 'provider_id': "p1", 'date': MONDAY, 'time': "10:00", 'status': 'cancelled'})
+    assert index.find_conflict("p1", parse_slot(MONDAY, "10:00")) is None
+    index.add_booking({'id': "b2", 'provider_id': "p1", 'date': MONDAY, 'time': "10:00", 'status': 'pending'})
+    index.remove("b2")
+    assert index.find_conflict("p1", parse_slot(MONDAY, "10:00")) is None
+
+
+def test_free_slots_skip_bookings_and_closed_hours():
+    index = AvailabilityIndex()
+    index.set_working_hours("p1", {0: (9 * 60, 12 * 60)})
+    index.add_booking({'id': "b1", 'provider_id': "p1", 'date': MONDAY, 'time': "10:00", 'status': 'pending'})
+    assert index.free_slots("p1", date(2031, 3, 3), date(2031, 3, 4)) == {MONDAY: ["9:00", "11:00"],
+                                                                          "2031-03-04": []}
+    assert not index.is_open("p1", parse_slot(MONDAY, "12:00"))
+
+
+def test_booking_a_taken_slot_is_rejected(client, marketplace):
+    headers = marketplace['consumer_headers']
+    assert client.post("/api/bookings", json=booking(marketplace), headers=headers).status_code == 200
+    response = client.post("/api/bookings", json=booking(marketplace), headers=headers)
+    assert response.status_code == 409
+    assert client.post("/api/bookings", json=booking(marketplace, time="11:00"), headers=headers).status_code == 200
+    outside = client.post("/api/bookings", json=booking(marketplace, time="20:00"), headers=headers)
+    assert outside.status_code == 409
+
+
+def test_concurrent_bookings_take_each_slot_once(client, marketplace):
+    claims = {'sub': marketplace['consumer']['id'], 'user_type': 'consumer'}
+    times = ["9:00", "10:00", "11:00"]
+    requests = [Main.Booking(**booking(marketplace, time=times[i % len(times)])) for i in range(60)]
+
+    async def attempt(request) -> int:
+        try:
+            await Main.create_booking(request, claims=claims)
+            return 200
+        except HTTPException as e:
+            return e.status_code
+
+    async def race():
+        return Counter(await asyncio.gather(*(attempt(request) for request in requests)))
+
+    assert client.portal.call(race) == {200: len(times), 409: len(requests) - len(times)}
+    held = Counter(b['time'] for b in Main.repo.booking_bucket(marketplace['provider']['id'], 'business'))
+    assert held == {time: 1 for time in times}
+
+
+def test_stale_booking_update_is_rejected(client, marketplace):
+    created = client.post("/api/bookings", json=booking(marketplace), headers=marketplace['consumer_headers']).json()
+    headers = marketplace['provider_headers']
+    url = f"/api/bookings/{created['id']}"
+    assert client.put(url, params={'status': 'confirmed', 'version': 1}, headers=headers).status_code == 200
+    assert client.put(url, params={'status': 'cancelled', 'version': 1}, headers=headers).status_code == 412
+    assert client.put(url, params={'status': 'pending', 'version': 2}, headers=headers).status_code == 409
+
+
+@pytest.mark.parametrize("status", ["confirmed", "completed"])
+def test_only_the_provider_confirms_or_completes(client, marketplace, status):
+    created = client.post("/api/bookings", json=booking(marketplace), headers=marketplace['consumer_headers']).json()
+    response = client.put(f"/api/bookings/{created['id']}", params={'status': status},
+                          headers=marketplace['consumer_headers'])
+    assert response.status_code == 403
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from database import bookings_table
+from journal import NONE, JournalStorage, list_segments
+
+
+def booking(i: int, status: str = 'pending') -> dict:
+    return {'id': f"booking-{i}", 'service_id': "s", 'consumer_id': "c", 'provider_id': "p",
+            'date': "2031-01-01", 'time': "10:00", 'status': status, 'price': 80.0, 'version': 1}
+
+
+async def recover(directory: str) -> dict:
+    journal = JournalStorage(directory, NONE)
+    await journal.create_all()
+    records = {record['id']: record for _, record in journal.stream_records()}
+    await journal.dispose()
+    return records
+
+
+def tear_last_write(directory: str) -> None:
+    """Cuts the newest segment mid-line, as a crash during a write does."""
+    _, path = list_segments(directory)[-1]
+    size = os.path.getsize(path)
+    os.truncate(path, size - 10)
+
+
+def test_replay_after_torn_write(tmp_path):
+    directory = str(tmp_path)
+
+    async def write() -> None:
+        journal = JournalStorage(directory, NONE)
+        await journal.create_all()
+        async for _ in journal.seed_stream(('bookings', booking(i)) for i in range(3)):
+            pass
+        await journal.update_booking("booking-0", status='confirmed', version=2)
+        await journal.insert(bookings_table, booking(3))
+        await journal.update_booking("booking-1", status='cancelled', version=2)  # torn below
+        await journal.dispose()
+
+    asyncio.run(write())
+    tear_last_write(directory)
+    records = asyncio.run(recover(directory))
+    assert sorted(records) == ["booking-0", "booking-1", "booking-2", "booking-3"]
+    assert records["booking-0"]['status'] == 'confirmed' and records["booking-0"]['version'] == 2
+    assert records["booking-1"]['status'] == 'pending'
+
+
+def test_writes_after_a_torn_tail_are_recovered(tmp_path):
+    directory = str(tmp_path)
+
+    async def write(operations) -> None:
+        journal = JournalStorage(directory, NONE)
+        await journal.create_all()
+        if await journal.count(bookings_table) == 0:
+            async for _ in journal.seed_stream(('bookings', booking(i)) for i in range(2)):
+                pass
+        for operation in operations:
+            await operation(journal)
+        await journal.dispose()
+
+    asyncio.run(write([lambda j: j.insert(bookings_table, booking(2)),
+                       lambda j: j.insert(bookings_table, booking(3))]))
+    tear_last_write(directory)
+    # reopening cuts the torn line off, so new operations are not appended after garbage
+    asyncio.run(write([lambda j: j.update_booking("booking-2", status='confirmed', version=2),
+                       lambda j: j.insert(bookings_table, booking(4))]))
+    records = asyncio.run(recover(directory))
+    assert sorted(records) == ["booking-0", "booking-1", "booking-2", "booking-4"]
+    assert records["booking-2"]['status'] == 'confirmed'
+
+
+def test_snapshot_then_replay(tmp_path):
+    directory = str(tmp_path)
+
+    async def write() -> None:
+        journal = JournalStorage(directory, NONE)
+        await journal.create_all()
+        state = {}
+        async for _, record in journal.seed_stream(('bookings', booking(i)) for i in range(3)):
+            state[record['id']] = record
+        await journal.update_booking("booking-0", status='confirmed', version=2)
+        state["booking-0"] = dict(state["booking-0"], status='confirmed', version=2)
+        await journal.snapshot(('bookings', record) for record in state.values())
+        await journal.update_booking("booking-1", status='cancelled', version=2)
+        await journal.dispose()
+
+    asyncio.run(write())
+    records = asyncio.run(recover(directory))
+    assert records["booking-0"]['status'] == 'confirmed'
+    assert records["booking-1"]['status'] == 'cancelled'
+    assert records["booking-2"]['status'] == 'pending'
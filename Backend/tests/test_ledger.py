@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from ledger import PAYOUTS, PLATFORM_FEES, Ledger, UnbalancedEntry, consumer_account, provider_account
+from payments import LocalGateway, PaymentDeclined, Payments
+
+
+def test_balances_follow_postings_and_sum_to_zero():
+    ledger = Ledger()
+    ledger.post("pay:1", "booking_payment", [("consumer:c", -1000), ("provider:p", 900), (PLATFORM_FEES, 100)])
+    ledger.post("pay:2", "booking_payment", [("consumer:c", -500), ("provider:p", 500)])
+    assert ledger.balance("consumer:c") == -1500
+    assert ledger.balance("provider:p") == 1400
+    assert ledger.balance(PLATFORM_FEES) == 100
+    assert ledger.balance("provider:unknown") == 0
+    report = ledger.reconcile()
+    assert report["ok"] and report["total"] == 0
+
+
+def test_unbalanced_entries_are_refused():
+    ledger = Ledger()
+    with pytest.raises(UnbalancedEntry):
+        ledger.post("pay:1", "booking_payment", [("consumer:c", -1000), ("provider:p", 900)])
+    with pytest.raises(UnbalancedEntry):
+        ledger.post("pay:2", "booking_payment", [("consumer:c", -10.5), ("provider:p", 10.5)])
+    assert len(ledger) == 0
+
+
+def test_posting_a_key_twice_returns_the_first_entry():
+    ledger = Ledger()
+    first = ledger.post("pay:1", "booking_payment", [("consumer:c", -1000), ("provider:p", 1000)])
+    again = ledger.post("pay:1", "booking_payment", [("consumer:c", -2000), ("provider:p", 2000)])
+    assert again is first
+    assert len(ledger) == 1 and ledger.balance("provider:p") == 1000
+
+
+def test_charges_and_refunds_happen_once_per_key():
+    async def run():
+        gateway = LocalGateway()
+        payments = Payments(Ledger(), gateway, fee_bps=1000)
+        await payments.charge("booking:b1", "booking_payment", "b1", "c", "p", 1000)
+        await payments.charge("booking:b1", "booking_payment", "b1", "c", "p", 1000)
+        await payments.refund("booking:b1")
+        await payments.refund("booking:b1")
+        return payments.ledger, gateway
+
+    ledger, gateway = asyncio.run(run())
+    assert [entry.kind for entry in ledger.entries] == ["booking_payment", "refund"]
+    assert ledger.balance(consumer_account("c")) == 0 and ledger.balance(provider_account("p")) == 0
+    assert ledger.reconcile(gateway.operations)["ok"]
+
+
+def test_settlement_pays_each_provider_once():
+    async def run():
+        payments = Payments(Ledger(), LocalGateway())
+        for i in range(5):
+            await payments.charge(f"booking:{i}", "booking_payment", str(i), "c", f"p{i % 2}", 1000)
+        first = await payments.settle()
+        second = await payments.settle()
+        return payments, first, second
+
+    payments, first, second = asyncio.run(run())
+    assert first["paid"] == 2 and first["amount"] == 50.0
+    assert second["providers"] == 0
+    assert payments.ledger.balance(provider_account("p0")) == 0
+    assert payments.ledger.balance(PAYOUTS) == 5000
+    assert payments.ledger.reconcile(payments.gateway.operations)["ok"]
+
+
+def test_declined_payout_is_retried_next_settlement():
+    async def run():
+        payments = Payments(Ledger(), LocalGateway())
+        await payments.charge("booking:1", "booking_payment", "1", "c", "p", 1000)
+        payments.gateway.decline_rate = 1.0
+        declined = await payments.settle()
+        payments.gateway.decline_rate = 0.0
+        return payments, declined, await payments.settle()
+
+    payments, declined, paid = asyncio.run(run())
+    assert declined["failed"] == 1 and paid["paid"] == 1
+    assert payments.ledger.balance(provider_account("p")) == 0
+
+
+def test_payout_interrupted_after_transfer_is_not_paid_twice():
+    async def crash(*args):
+        raise RuntimeError("process died before the payout was recorded")
+
+    async def run():
+        gateway = LocalGateway()
+        payments = Payments(Ledger(), gateway)
+        await payments.charge("booking:1", "booking_payment", "1", "c", "p", 1000)
+        payments._record = crash
+        with pytest.raises(RuntimeError):
+            await payments.settle()
+        # restart from the stored ledger; the provider earned more in the meantime
+        restarted = Payments(Ledger(), gateway)
+        for entry in payments.ledger.entries:
+            restarted.restore(entry.to_dict())
+        await restarted.charge("booking:2", "booking_payment", "2", "c", "p", 500)
+        return restarted, gateway, [await restarted.settle(), await restarted.settle()]
+
+    payments, gateway, settlements = asyncio.run(run())
+    assert [s["amount"] for s in settlements] == [10.0, 5.0]
+    transfers = [op for op in gateway.operations.values() if op['kind'] == "transfer"]
+    assert sum(op['amount'] for op in transfers) == 1500
+    assert payments.ledger.balance(provider_account("p")) == 0
+    assert payments.ledger.reconcile(gateway.operations)["ok"]
+
+
+def test_declined_charge_records_nothing():
+    async def run():
+        payments = Payments(Ledger(), LocalGateway(decline_rate=1.0))
+        with pytest.raises(PaymentDeclined):
+            await payments.charge("booking:1", "booking_payment", "1", "c", "p", 1000)
+        return payments.ledger
+
+    assert len(asyncio.run(run())) == 0